@@ -0,0 +1,35 @@
+"""
+서버 수명 동안 도는 백그라운드 작업의 공통 시작/중지.
+
+투표 큐(vote_queue.py), 대결 풀(matchup_pool.py), rating period(rating_period.py),
+Bradley–Terry 재적합(bt_refit.py)이 상속해 _run()만 구현합니다.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class BackgroundTask(ABC):
+    """_run()을 asyncio 작업 하나로 실행합니다 (main.py lifespan에서 start/stop)."""
+
+    _task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> bool:
+        """작업을 취소하고 끝날 때까지 기다립니다. 실행 중이었으면 True."""
+        if self._task is None:
+            return False
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        return True
+
+    @abstractmethod
+    async def _run(self) -> None:
+        """stop()으로 취소될 때까지 반복하는 본문"""
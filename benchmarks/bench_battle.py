@@ -0,0 +1,160 @@
+"""
+/battle 지연 시간 벤치마크 (1k / 10k / 100k 작품).
+
+같은 DB와 같은 대결 풀 설정에서 전체 요청(매치메이킹 + 확률/등수 + 템플릿 렌더링)을
+비교합니다.
+- GET /battle: 현재 구현 (대결 풀 -> 메모리 인덱스 매치메이킹/등수)
+- legacy /battle: 인덱스 도입 이전의 ORDER BY random() 쿼리 3회 + COUNT 등수 쿼리 4회
+대결 풀을 끈 경우(매 요청 직접 생성)와 켠 경우(MATCH_POOL_ENABLED)를 따로 출력합니다.
+
+    python -m benchmarks.bench_battle [--requests 300]
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Annotated
+
+from benchmarks.common import AUTH, setup_env, seed_animes, summarize, format_row
+
+setup_env()
+
+import httpx  # noqa: E402
+from fastapi import Depends, Request  # noqa: E402
+from fastapi.responses import HTMLResponse  # noqa: E402
+from sqlalchemy import select, and_  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.sql.expression import func as sql_func  # noqa: E402
+
+from main import app  # noqa: E402
+from models import Anime  # noqa: E402
+from database import engine, get_db, AsyncSessionLocal  # noqa: E402
+from rating_index import rating_index  # noqa: E402
+from matchup_pool import matchup_pool  # noqa: E402
+from routers.battle import templates  # noqa: E402
+from services import (  # noqa: E402
+    CATEGORIES,
+    expected_information_gain,
+    get_match_probabilities,
+)
+from config import settings  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+LEGACY_PATH = "/bench/legacy-battle"
+
+
+async def legacy_match_pair(db):
+    """비교용: 인덱스 도입 이전의 ORDER BY random() 매치메이킹."""
+    result = await db.execute(select(Anime).order_by(sql_func.random()).limit(1))
+    anime1 = result.scalar()
+    target = anime1.rating_fun
+    query = (
+        select(Anime)
+        .where(
+            and_(
+                Anime.id != anime1.id,
+                Anime.rating_fun >= target - settings.MATCH_SCORE_RANGE,
+                Anime.rating_fun <= target + settings.MATCH_SCORE_RANGE,
+            )
+        )
+        .order_by(sql_func.random())
+        .limit(1)
+    )
+    anime2 = (await db.execute(query)).scalar()
+    if anime2 is None:
+        query = (
+            select(Anime)
+            .where(Anime.id != anime1.id)
+            .order_by(sql_func.random())
+            .limit(1)
+        )
+        anime2 = (await db.execute(query)).scalar()
+    return anime1, anime2
+
+
+async def legacy_rank_info(db, category: str, score: float):
+    """비교용: 인덱스 도입 이전의 COUNT 쿼리 2회 등수 계산."""
+    total = (await db.execute(select(sql_func.count(Anime.id)))).scalar() or 1
+    column = getattr(Anime, f"rating_{category}")
+    higher = (
+        await db.execute(select(sql_func.count(Anime.id)).where(column > score))
+    ).scalar()
+    rank = higher + 1
+    return {"rank": rank, "total": total, "top_percent": round(rank / total * 100, 1)}
+
+
+async def legacy_battle(
+    request: Request, db: Annotated[AsyncSession, Depends(get_db)]
+) -> HTMLResponse:
+    """비교용: 기존 GET /battle 핸들러와 같은 순서로 DB를 조회해 같은 템플릿을 렌더링."""
+    anime1, anime2 = await legacy_match_pair(db)
+    category, category_name = random.choice(CATEGORIES)
+    r1 = getattr(anime1, f"rating_{category}")
+    r2 = getattr(anime2, f"rating_{category}")
+    return templates.TemplateResponse(
+        "battle.html",
+        {
+            "request": request,
+            "prefetch_size": settings.BATTLE_PREFETCH_SIZE,
+            "category": category,
+            "category_name": category_name,
+            "anime1": {"id": anime1.id, "name": anime1.name, "rating": round(r1)},
+            "anime2": {"id": anime2.id, "name": anime2.name, "rating": round(r2)},
+            "probs": get_match_probabilities(r1, r2),
+            "rank1": await legacy_rank_info(db, category, r1),
+            "rank2": await legacy_rank_info(db, category, r2),
+            "info_gain": expected_information_gain(r1, r2),
+        },
+    )
+
+
+app.add_api_route(LEGACY_PATH, legacy_battle, response_class=HTMLResponse)
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(path)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200
+        assert 'id="prob-a"' in response.text
+    return summarize(samples)
+
+
+async def set_pool(enabled: bool) -> None:
+    """대결 풀을 켜고 가득 채우거나, 끄고 비웁니다."""
+    await matchup_pool.stop()
+    matchup_pool.clear()
+    if enabled:
+        await matchup_pool.refill()
+        matchup_pool.start()
+
+
+async def run(requests: int) -> None:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", auth=AUTH
+        ) as client:
+            for size in SIZES:
+                await seed_animes(engine, size)
+                async with AsyncSessionLocal() as db:
+                    await rating_index.load(db)
+
+                print(f"--- {size:,} titles ---")
+                for enabled in (False, True):
+                    await set_pool(enabled)
+                    label = "on" if enabled else "off"
+                    for name, path in (
+                        ("GET /battle", "/battle"),
+                        ("legacy /battle", LEGACY_PATH),
+                    ):
+                        stats = await measure(client, path, requests)
+                        print(format_row(f"pool {label:<3} {name}", stats))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    asyncio.run(run(parser.parse_args().requests))
@@ -0,0 +1,115 @@
+"""
+Bradley–Terry(Davidson) 일괄 적합과 순차 Elo 비교.
+
+가상의 "진짜" 실력으로 만든 투표 로그(get_match_probabilities의 승/무/패 확률)에 대해
+1) 순위 정확도: 진짜 순위와의 Spearman 상관계수
+2) 순서 의존성: 같은 투표를 섞은 순서로 다시 계산했을 때 순위가 얼마나 달라지는지
+3) 증분 비용: 투표가 --increment 비율만큼 늘었을 때 처음부터(cold) vs 이전 해에서(warm)
+   다시 적합하는 데 필요한 반복 횟수와 시간
+을 비교합니다.
+
+    python -m benchmarks.bench_bt_refit [--animes 500] [--votes 50000] \\
+        [--increment 0.01] [--seed 0]
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_env
+
+setup_env()
+
+import numpy as np  # noqa: E402
+
+from bradley_terry import PairCounts, davidson_tie, fit  # noqa: E402
+from benchmarks.simulate_matchmaking import spearman  # noqa: E402
+from config import settings  # noqa: E402
+from services import (  # noqa: E402
+    calculate_elo_update,
+    get_match_probabilities_batch,
+)
+
+
+def simulate_votes(truth: np.ndarray, votes: int, rng: np.random.Generator):
+    n = len(truth)
+    anime1 = rng.integers(0, n, votes)
+    anime2 = (anime1 + rng.integers(1, n, votes)) % n
+    probs = get_match_probabilities_batch(truth[anime1], truth[anime2])
+    u = rng.random(votes) * 100.0
+    outcome = np.where(
+        u < probs["win_a"], 2, np.where(u < probs["win_a"] + probs["draw"], 1, 0)
+    )
+    return anime1, anime2, outcome
+
+
+def sequential_elo(n: int, anime1, anime2, outcome) -> np.ndarray:
+    ratings = [settings.NORMALIZE_TARGET_MEAN] * n
+    matches = [0] * n
+    for a, b, s in zip(anime1.tolist(), anime2.tolist(), (outcome / 2.0).tolist()):
+        ratings[a], ratings[b] = calculate_elo_update(
+            ratings[a], ratings[b], s, matches[a], matches[b]
+        )
+        matches[a] += 1
+        matches[b] += 1
+    return np.array(ratings)
+
+
+def bradley_terry(n: int, pairs: PairCounts, initial=None):
+    start = time.perf_counter()
+    result = fit(
+        n,
+        *pairs,
+        tie=davidson_tie(settings.ELO_DRAW_MAX),
+        prior=settings.BT_PRIOR_GAMES,
+        initial=initial,
+        max_iterations=100_000,
+        tolerance=settings.BT_TOLERANCE,
+        center=settings.NORMALIZE_TARGET_MEAN,
+    )
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animes", type=int, default=500)
+    parser.add_argument("--votes", type=int, default=50_000)
+    parser.add_argument("--increment", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    n = args.animes
+    truth = rng.normal(settings.NORMALIZE_TARGET_MEAN, 200.0, n)
+    anime1, anime2, outcome = simulate_votes(truth, args.votes, rng)
+    pairs = PairCounts.from_votes(anime1, anime2, outcome)
+    print(f"{n} animes, {args.votes:,} votes, {len(pairs.first):,} distinct pairs")
+
+    elo = sequential_elo(n, anime1, anime2, outcome)
+    order = rng.permutation(args.votes)
+    elo_shuffled = sequential_elo(n, anime1[order], anime2[order], outcome[order])
+    fitted, seconds = bradley_terry(n, pairs)
+
+    print("\nSpearman vs truth / vs same votes in shuffled order")
+    print(
+        f"  {'sequential elo':<16} {spearman(elo, truth):.4f} / "
+        f"{spearman(elo, elo_shuffled):.4f}"
+    )
+    print(f"  {'bradley-terry':<16} {spearman(fitted.ratings, truth):.4f} / 1.0000")
+    print(
+        f"  bt fit: {fitted.iterations} iterations, {seconds * 1000:.1f} ms "
+        f"(converged={fitted.converged})"
+    )
+
+    extra = max(1, int(args.votes * args.increment))
+    pairs = pairs.merge(PairCounts.from_votes(*simulate_votes(truth, extra, rng)))
+    cold, cold_seconds = bradley_terry(n, pairs)
+    warm, warm_seconds = bradley_terry(n, pairs, initial=fitted.ratings)
+    print(f"\nrefit after +{extra:,} votes (tolerance {settings.BT_TOLERANCE} pts)")
+    print(f"  cold  {cold.iterations:>5} iterations  {cold_seconds * 1000:8.1f} ms")
+    print(f"  warm  {warm.iterations:>5} iterations  {warm_seconds * 1000:8.1f} ms")
+    print(
+        f"  max |cold - warm| = {np.max(np.abs(cold.ratings - warm.ratings)):.3f} pts"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+SQLite 연결 프로필 벤치마크: 읽기/쓰기 혼합 처리량 비교.
+
+기존 기본값(rollback journal, 단일 풀)과 현재 프로필(WAL + PRAGMA + 읽기/쓰기
+풀 분리)을 각각 별도 프로세스에서 실행합니다. 쓰기 작업은 투표와 같은
+2행 UPDATE + COMMIT, 읽기 작업은 랭킹 상위 50개 조회입니다.
+
+    python -m benchmarks.bench_db_profile [--seconds 5] [--readers 4] [--writers 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    "before (default aiosqlite)": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_TEMP_STORE": "DEFAULT",
+        "SQLITE_BUSY_TIMEOUT": "5000",
+        "SQLITE_READ_POOL_SIZE": "0",
+    },
+    "after (config.Settings)": {},
+}
+
+
+async def worker_main(seconds: float, readers: int, writers: int, size: int) -> dict:
+    from benchmarks.common import setup_env, seed_animes
+
+    setup_env()
+
+    from sqlalchemy import select, update
+    from database import engine, Base, AsyncSessionLocal, ReadSessionLocal
+    from models import Anime
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await seed_animes(engine, size)
+
+    deadline = time.perf_counter() + seconds
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            async with ReadSessionLocal() as db:
+                query = select(Anime).order_by(Anime.rating_fun.desc()).limit(50)
+                (await db.execute(query)).scalars().all()
+            counts["reads"] += 1
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            a, b = random.sample(range(1, size + 1), 2)
+            try:
+                async with AsyncSessionLocal() as db:
+                    for anime_id, delta in ((a, 10.0), (b, -10.0)):
+                        await db.execute(
+                            update(Anime)
+                            .where(Anime.id == anime_id)
+                            .values(
+                                rating_fun=Anime.rating_fun + delta,
+                                matches_played=Anime.matches_played + 1,
+                            )
+                        )
+                    await db.commit()
+                counts["writes"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    await asyncio.gather(
+        *(reader() for _ in range(readers)), *(writer() for _ in range(writers))
+    )
+    return {k: v / seconds if k != "errors" else v for k, v in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(
+            worker_main(args.seconds, args.readers, args.writers, args.size)
+        )
+        print(json.dumps(result))
+        return
+
+    print(
+        f"{args.size:,} titles, {args.readers} readers + {args.writers} writers, "
+        f"{args.seconds:g}s per profile"
+    )
+    for label, overrides in PROFILES.items():
+        env = {**os.environ, **overrides}
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_profile", "--worker"]
+            + [f"--{k}={getattr(args, k)}" for k in ("seconds", "readers", "writers", "size")],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{label:<28} reads/s={result['reads']:8.1f}  "
+            f"writes/s={result['writes']:8.1f}  errors={result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
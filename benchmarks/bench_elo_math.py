@@ -0,0 +1,94 @@
+"""
+투표 1건당 Elo 계산 비용 마이크로 벤치마크 (DB/HTTP 제외).
+
+- legacy: 조회표 도입 이전 방식 (math.exp로 매번 K 계산, settings 매번 조회)
+- scalar: services.calculate_elo_update (K 조회표, 기대 승률 인라인 계산)
+- batch: services.calculate_elo_update_batch (배열, 투표당 환산)
+
+    python -m benchmarks.bench_elo_math [--votes 200000]
+"""
+import argparse
+import math
+import time
+
+from benchmarks.common import setup_env
+
+setup_env()
+
+import numpy as np  # noqa: E402
+
+from config import settings  # noqa: E402
+from services import (  # noqa: E402
+    calculate_elo_update,
+    calculate_elo_update_batch,
+    get_dynamic_k_factor,
+)
+
+
+def legacy_k_factor(matches_played: int) -> float:
+    k_diff = settings.ELO_K_MAX - settings.ELO_K_MIN
+    decay = math.exp(-matches_played / settings.ELO_DECAY_FACTOR)
+    return settings.ELO_K_MIN + k_diff * decay
+
+
+def legacy_expected(rating_a: float, rating_b: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
+
+
+def legacy_update(rating_a, rating_b, actual_score, matches_a, matches_b):
+    expected_a = legacy_expected(rating_a, rating_b)
+    expected_b = legacy_expected(rating_b, rating_a)
+    k_a = legacy_k_factor(matches_a)
+    k_b = legacy_k_factor(matches_b)
+    return (
+        rating_a + k_a * (actual_score - expected_a),
+        rating_b + k_b * ((1.0 - actual_score) - expected_b),
+    )
+
+
+def per_call_ns(func, args) -> float:
+    start = time.perf_counter()
+    for item in args:
+        func(*item)
+    return (time.perf_counter() - start) * 1e9 / len(args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--votes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rating_a = rng.normal(1200.0, 150.0, args.votes)
+    rating_b = rng.normal(1200.0, 150.0, args.votes)
+    outcome = rng.choice([0.0, 0.5, 1.0], args.votes)
+    matches_a = rng.integers(0, 300, args.votes)
+    matches_b = rng.integers(0, 300, args.votes)
+    votes = list(
+        zip(
+            rating_a.tolist(),
+            rating_b.tolist(),
+            outcome.tolist(),
+            matches_a.tolist(),
+            matches_b.tolist(),
+        )
+    )
+    matches = [(m,) for m in matches_a.tolist()]
+
+    start = time.perf_counter()
+    calculate_elo_update_batch(rating_a, rating_b, outcome, matches_a, matches_b)
+    batch = (time.perf_counter() - start) * 1e9 / args.votes
+
+    print(f"{args.votes:,} votes, ns per call")
+    for label, ns in (
+        ("K legacy (math.exp)", per_call_ns(legacy_k_factor, matches)),
+        ("K table", per_call_ns(get_dynamic_k_factor, matches)),
+        ("update legacy", per_call_ns(legacy_update, votes)),
+        ("update scalar", per_call_ns(calculate_elo_update, votes)),
+        ("update batch (per vote)", batch),
+    ):
+        print(f"  {label:<26} {ns:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+쌍별 집계 저장소(pairwise_store) 비용 측정.
+
+무작위 투표 로그에 대해
+1) 투표 1건 반영(record) 비용
+2) 상대 전적 조회: pairwise_store(O(1)) vs votes 테이블 조회(작품별 인덱스)
+3) 일괄 계산용 내보내기: pairs()(COO) / matrix()(CSR) vs 투표 로그 전체 재집계
+를 비교합니다.
+
+    python -m benchmarks.bench_pairwise [--animes 2000] [--votes 200000] \\
+        [--lookups 2000] [--seed 0]
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+from benchmarks.common import setup_env, summarize, format_row
+
+setup_env()
+
+import numpy as np  # noqa: E402
+
+from bradley_terry import PairCounts  # noqa: E402
+from models import RATING_CATEGORIES  # noqa: E402
+from pairwise import PairwiseStore  # noqa: E402
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def votes_table(rows) -> sqlite3.Connection:
+    """votes 테이블과 같은 (anime_id, id) 인덱스를 가진 메모리 DB"""
+    con = sqlite3.connect(":memory:")
+    con.execute(
+        "CREATE TABLE votes (id INTEGER PRIMARY KEY, anime1_id INTEGER, "
+        "anime2_id INTEGER, category SMALLINT, outcome SMALLINT)"
+    )
+    con.execute("CREATE INDEX ix_votes_anime1_id_id ON votes (anime1_id, id)")
+    con.execute("CREATE INDEX ix_votes_anime2_id_id ON votes (anime2_id, id)")
+    con.executemany(
+        "INSERT INTO votes (anime1_id, anime2_id, category, outcome) "
+        "VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    return con
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animes", type=int, default=2000)
+    parser.add_argument("--votes", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+    n = args.animes
+    anime1 = rng.integers(1, n + 1, args.votes)
+    anime2 = (anime1 + rng.integers(0, n - 1, args.votes)) % n + 1
+    category = rng.integers(0, len(RATING_CATEGORIES), args.votes)
+    outcome = rng.integers(0, 3, args.votes)
+    log_rows = [
+        {"anime1_id": a, "anime2_id": b, "category": c, "outcome": o}
+        for a, b, c, o in zip(
+            anime1.tolist(), anime2.tolist(), category.tolist(), outcome.tolist()
+        )
+    ]
+
+    store = PairwiseStore()
+    start = time.perf_counter()
+    for row in log_rows:
+        store.record(row)
+    seconds = time.perf_counter() - start
+    print(f"{n} animes, {args.votes:,} votes, {len(store):,} distinct pairs")
+    print(f"record: {seconds / args.votes * 1e6:.2f} us/vote\n")
+
+    cat = RATING_CATEGORIES[0]
+    # 절반은 실제로 대결한 쌍, 절반은 무작위 쌍
+    lookups = [
+        (row["anime1_id"], row["anime2_id"])
+        for row in random.sample(log_rows, args.lookups // 2)
+    ]
+    lookups += [
+        (random.randint(1, n), random.randint(1, n))
+        for _ in range(args.lookups - len(lookups))
+    ]
+    con = votes_table(
+        zip(anime1.tolist(), anime2.tolist(), category.tolist(), outcome.tolist())
+    )
+    query = (
+        "SELECT outcome, anime1_id = ? FROM votes "
+        "WHERE category = 0 AND ((anime1_id = ? AND anime2_id = ?) "
+        "OR (anime1_id = ? AND anime2_id = ?))"
+    )
+
+    def sql_lookup(a: int, b: int):
+        wins = draws = losses = 0
+        for out, is_a in con.execute(query, (a, a, b, b, a)):
+            score = out if is_a else 2 - out
+            wins += score == 2
+            draws += score == 1
+            losses += score == 0
+        return wins, draws, losses
+
+    for a, b in lookups[:50]:
+        assert store.head_to_head(a, b, cat) == sql_lookup(a, b)
+
+    print("head-to-head lookup")
+    for label, lookup in (
+        ("  pairwise_store", lambda a, b: store.head_to_head(a, b, cat)),
+        ("  votes table (indexed)", sql_lookup),
+    ):
+        it = iter(lookups)
+        print(format_row(label, timed(lambda: lookup(*next(it)), len(lookups))))
+
+    played = category == 0
+    expected = PairCounts.from_votes(anime1[played], anime2[played], outcome[played])
+    assert all(np.array_equal(x, y) for x, y in zip(store.pairs(cat), expected))
+
+    # 투표가 반영되면 해당 카테고리 배열을 다시 만듭니다.
+    vote = next(row for row in log_rows if row["category"] == 0)
+
+    def pairs_after_vote():
+        store.record(vote)
+        store.pairs(cat)
+
+    print(f"\nexport ({cat}, {int(played.sum()):,} votes)")
+    for label, export in (
+        ("  pairs() COO after a vote", pairs_after_vote),
+        ("  pairs() COO cached", lambda: store.pairs(cat)),
+        ("  matrix() CSR", lambda: store.matrix(cat)),
+        (
+            "  re-aggregate vote log",
+            lambda: PairCounts.from_votes(
+                anime1[played], anime2[played], outcome[played]
+            ),
+        ),
+    ):
+        print(format_row(label, timed(export, 20)))
+
+
+if __name__ == "__main__":
+    main()
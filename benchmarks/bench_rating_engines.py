@@ -0,0 +1,192 @@
+"""
+레이팅 엔진(services.RATING_ENGINES) 비교: 투표당 계산 비용과 순위 정확도.
+
+1) 투표당 비용
+   - elo: 투표마다 calculate_elo_update 1회 (요청 경로에서 실행)
+   - glicko2: period 하나(--period-sizes 투표)를 모든 작품에 대해 한 번에 계산한
+     시간을 투표 수로 나눈 값 (백그라운드 작업에서 실행, 요청 경로 비용은 0)
+2) 순위 정확도
+   simulate_matchmaking과 같은 가상 작품/투표(smart 전략)로, 체크포인트마다
+   점수 순위와 진짜 순위의 Spearman 상관계수(카테고리 평균)를 비교합니다.
+   glicko2는 --period 투표마다 점수가 갱신됩니다.
+
+    python -m benchmarks.bench_rating_engines [--animes 1000] \\
+        [--period-sizes 100 1000 10000] [--votes 30000] [--period 500] [--seeds 3]
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List
+
+from benchmarks.common import setup_env
+
+setup_env()
+
+import numpy as np  # noqa: E402
+
+from benchmarks.simulate_matchmaking import rank_accuracy  # noqa: E402
+from models import Anime, RATING_CATEGORIES  # noqa: E402
+from rating_index import RatingIndex  # noqa: E402
+from services import (  # noqa: E402
+    EloEngine,
+    Glicko2Engine,
+    SmartRandomStrategy,
+    get_match_probabilities,
+    pick_category,
+)
+
+
+def bench_elo(votes: int) -> float:
+    """투표 1건당 Elo 계산 시간 (초)"""
+    engine = EloEngine()
+    rng = np.random.default_rng(0)
+    inputs = list(
+        zip(
+            rng.normal(1200.0, 150.0, votes).tolist(),
+            rng.normal(1200.0, 150.0, votes).tolist(),
+            rng.choice([0.0, 0.5, 1.0], votes).tolist(),
+            rng.integers(0, 500, votes).tolist(),
+            rng.integers(0, 500, votes).tolist(),
+        )
+    )
+    start = time.perf_counter()
+    for args in inputs:
+        engine.update(*args)
+    return (time.perf_counter() - start) / votes
+
+
+def bench_glicko(animes: int, votes: int, repeat: int = 5) -> float:
+    """votes개 투표로 된 period 1회(1개 카테고리)의 투표당 계산 시간 (초)"""
+    engine = Glicko2Engine()
+    rng = np.random.default_rng(0)
+    rating = rng.normal(1200.0, 150.0, animes)
+    rd = rng.uniform(50.0, 350.0, animes)
+    volatility = np.full(animes, 0.06)
+    player_a = rng.integers(0, animes, votes)
+    player_b = (player_a + rng.integers(1, animes, votes)) % animes
+    score_a = rng.choice([0.0, 0.5, 1.0], votes)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.rate_period(rating, rd, volatility, player_a, player_b, score_a)
+        best = min(best, time.perf_counter() - start)
+    return best / votes
+
+
+def simulate(
+    engine_name: str,
+    animes: int,
+    votes: int,
+    period: int,
+    checkpoints: List[int],
+    seed: int,
+) -> Dict[int, float]:
+    """체크포인트(투표 수)별 Spearman 상관계수"""
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    truth = {cat: rng.normal(1200.0, 200.0, animes) for cat in RATING_CATEGORIES}
+
+    index = RatingIndex()
+    for i in range(1, animes + 1):
+        index.add(
+            Anime(
+                id=i,
+                matches_played=0,
+                **{f"rating_{cat}": 1200.0 for cat in RATING_CATEGORIES},
+            )
+        )
+    strategy = SmartRandomStrategy(index)
+    elo = EloEngine()
+    glicko = Glicko2Engine()
+    rd = {cat: np.full(animes, 350.0) for cat in RATING_CATEGORIES}
+    volatility = {cat: np.full(animes, 0.06) for cat in RATING_CATEGORIES}
+    pending: Dict[str, List] = {cat: [] for cat in RATING_CATEGORIES}
+
+    def close_period() -> None:
+        for cat in RATING_CATEGORIES:
+            played = np.array(pending[cat], dtype=np.float64).reshape(-1, 3)
+            rating = np.array([index.get(i, cat) for i in range(1, animes + 1)])
+            rating, rd[cat], volatility[cat] = glicko.rate_period(
+                rating,
+                rd[cat],
+                volatility[cat],
+                played[:, 0].astype(np.int64),
+                played[:, 1].astype(np.int64),
+                played[:, 2],
+            )
+            index.replace(cat, dict(zip(range(1, animes + 1), rating.tolist())))
+            pending[cat] = []
+
+    accuracy = {}
+    for vote in range(1, votes + 1):
+        category = pick_category()
+        anime1_id = strategy.pick_anime()
+        anime2_id = strategy.pick_rival(anime1_id, category)
+
+        probs = get_match_probabilities(
+            truth[category][anime1_id - 1], truth[category][anime2_id - 1]
+        )
+        actual_score = random.choices(
+            (1.0, 0.5, 0.0), weights=(probs["win_a"], probs["draw"], probs["win_b"])
+        )[0]
+
+        if engine_name == "elo":
+            new_r1, new_r2 = elo.update(
+                index.get(anime1_id, category),
+                index.get(anime2_id, category),
+                actual_score,
+                index.matches(anime1_id),
+                index.matches(anime2_id),
+            )
+            index.update(anime1_id, category, new_r1)
+            index.update(anime2_id, category, new_r2)
+        else:
+            pending[category].append((anime1_id - 1, anime2_id - 1, actual_score))
+            if vote % period == 0:
+                close_period()
+        index.record_match(anime1_id)
+        index.record_match(anime2_id)
+
+        if vote in checkpoints:
+            accuracy[vote] = rank_accuracy(index, truth)
+    return accuracy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animes", type=int, default=1000)
+    parser.add_argument(
+        "--period-sizes", type=int, nargs="+", default=[100, 1_000, 10_000]
+    )
+    parser.add_argument("--sim-animes", type=int, default=300)
+    parser.add_argument("--votes", type=int, default=30_000)
+    parser.add_argument("--period", type=int, default=500)
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"per-vote cost ({args.animes:,} animes)")
+    print(f"  {'elo':<22} {bench_elo(100_000) * 1e6:8.3f} us (request path)")
+    for size in args.period_sizes:
+        label = f"glicko2 period={size:,}"
+        cost = bench_glicko(args.animes, size) * 1e6
+        print(f"  {label:<22} {cost:8.3f} us (background, per category period)")
+
+    checkpoints = [args.votes * i // 6 for i in range(1, 7)]
+    print(
+        f"\nranking accuracy ({args.sim_animes} animes, Spearman, "
+        f"mean of {args.seeds} seeds, glicko2 period={args.period})"
+    )
+    print(f"  {'votes':>8} " + " ".join(f"{c:>8,}" for c in checkpoints))
+    for name in ("elo", "glicko2"):
+        runs = [
+            simulate(name, args.sim_animes, args.votes, args.period, checkpoints, seed)
+            for seed in range(args.seeds)
+        ]
+        row = [statistics.fmean(run[c] for run in runs) for c in checkpoints]
+        print(f"  {name:>8} " + " ".join(f"{rho:8.3f}" for rho in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+투표 로그 재계산(replay.py) 벤치마크.
+
+무작위 투표 로그를 votes 테이블에 채운 뒤 읽기/재계산 시간을 측정합니다.
+(로그 생성 시간은 측정에서 제외)
+
+    python -m benchmarks.bench_replay [--votes 10000000] [--animes 2000]
+"""
+import argparse
+import sqlite3
+import time
+
+from benchmarks.common import setup_env
+
+db_path = setup_env()
+
+import numpy as np  # noqa: E402
+
+from models import RATING_CATEGORIES  # noqa: E402
+from migrations import create_schema  # noqa: E402
+from replay import VoteLog, read_animes, replay  # noqa: E402
+
+
+def seed_log(animes: int, votes: int, chunk_size: int = 500_000) -> None:
+    from sqlalchemy import create_engine
+
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    with sync_engine.begin() as conn:
+        create_schema(conn)
+    sync_engine.dispose()
+
+    rng = np.random.default_rng(0)
+    columns = ", ".join(f"rating_{cat}" for cat in RATING_CATEGORIES)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO animes (name, matches_played, version, total_score, {columns}) "
+            f"VALUES (?, 0, 0, 1200.0, {', '.join('?' * len(RATING_CATEGORIES))})",
+            [(f"Anime {i}", *([1200.0] * len(RATING_CATEGORIES))) for i in range(animes)],
+        )
+
+    for lo in range(0, votes, chunk_size):
+        n = min(chunk_size, votes - lo)
+        a = rng.integers(1, animes + 1, n)
+        b = (a + rng.integers(1, animes, n) - 1) % animes + 1  # a != b
+        rows = zip(
+            a.tolist(),
+            b.tolist(),
+            rng.integers(0, len(RATING_CATEGORIES), n).tolist(),
+            rng.integers(0, 3, n).tolist(),
+            [1200.0] * n,
+            [1200.0] * n,
+            [0] * n,
+            [0] * n,
+            [0] * n,
+        )
+        with conn:
+            conn.executemany(
+                "INSERT INTO votes (anime1_id, anime2_id, category, outcome, "
+                "rating1_before, rating2_before, matches1_before, matches2_before, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--votes", type=int, default=10_000_000)
+    parser.add_argument("--animes", type=int, default=2_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed_log(args.animes, args.votes)
+    print(f"seeded {args.votes:,} votes in {time.perf_counter() - start:.1f}s")
+
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    log = VoteLog.read(conn)
+    ids, ratings, matches = read_animes(conn)
+    loaded = time.perf_counter()
+    result = replay(log, ids, ratings, matches)
+    done = time.perf_counter()
+    conn.close()
+
+    print(
+        f"{args.votes:,} votes, {args.animes:,} animes: read {loaded - start:.2f}s, "
+        f"replay {done - loaded:.2f}s ({args.votes / (done - loaded):,.0f} votes/s)"
+    )
+    print(f"matches_played total={int(result.matches.sum()):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+투표 처리량 벤치마크 (단일 코어, votes/sec).
+
+- legacy: 도입 이전 방식 (db.get 2회 + COUNT 8회 + ORM 변경 + commit)
+- apply_vote: services.apply_vote (SELECT 1회 + UPDATE ... RETURNING 1회 + commit)
+- POST /battle/vote: 라우터/폼 파싱을 포함한 전체 경로
+
+    python -m benchmarks.bench_vote [--size 10000] [--votes 2000]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import AUTH, setup_env, seed_animes
+
+setup_env()
+
+import httpx  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.sql.expression import func as sql_func  # noqa: E402
+
+from main import app  # noqa: E402
+from database import engine, AsyncSessionLocal  # noqa: E402
+from models import Anime  # noqa: E402
+from rating_index import rating_index  # noqa: E402
+from services import apply_vote, calculate_elo_update  # noqa: E402
+
+
+async def legacy_vote(db, anime1_id, anime2_id, category, actual_score):
+    """비교용: 인덱스/단일 UPDATE 도입 이전의 투표 처리."""
+
+    async def rank(score):
+        await db.execute(select(sql_func.count(Anime.id)))
+        col = getattr(Anime, f"rating_{category}")
+        await db.execute(select(sql_func.count(Anime.id)).where(col > score))
+
+    a1 = await db.get(Anime, anime1_id)
+    a2 = await db.get(Anime, anime2_id)
+    attr = f"rating_{category}"
+    old_r1, old_r2 = getattr(a1, attr), getattr(a2, attr)
+    await rank(old_r1)
+    await rank(old_r2)
+    new_r1, new_r2 = calculate_elo_update(
+        old_r1, old_r2, actual_score, a1.matches_played, a2.matches_played
+    )
+    setattr(a1, attr, new_r1)
+    setattr(a2, attr, new_r2)
+    a1.matches_played += 1
+    a2.matches_played += 1
+    await db.commit()
+    await rank(new_r1)
+    await rank(new_r2)
+
+
+def random_votes(size, count):
+    for _ in range(count):
+        a, b = random.sample(range(1, size + 1), 2)
+        yield a, b, random.choice(("story", "fun", "ost")), random.choice((1.0, 0.5, 0.0))
+
+
+async def run(size: int, votes: int) -> None:
+    async with app.router.lifespan_context(app):
+        await seed_animes(engine, size)
+        async with AsyncSessionLocal() as db:
+            await rating_index.load(db)
+
+        print(f"{size:,} titles, {votes:,} votes per mode")
+
+        for label, fn in (("legacy", legacy_vote), ("apply_vote", apply_vote)):
+            start = time.perf_counter()
+            for a, b, cat, score in random_votes(size, votes):
+                async with AsyncSessionLocal() as db:
+                    await fn(db, a, b, cat, score)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<20} {votes / elapsed:8.1f} votes/s")
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", auth=AUTH
+        ) as client:
+            winners = {1.0: "1", 0.5: "draw", 0.0: "2"}
+            start = time.perf_counter()
+            for a, b, cat, score in random_votes(size, votes):
+                response = await client.post(
+                    "/battle/vote",
+                    data={
+                        "anime1_id": a,
+                        "anime2_id": b,
+                        "category": cat,
+                        "winner": winners[score],
+                    },
+                    headers={"X-Requested-With": "XMLHttpRequest"},
+                )
+                assert response.status_code == 200
+            elapsed = time.perf_counter() - start
+            print(f"{'POST /battle/vote':<20} {votes / elapsed:8.1f} votes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--votes", type=int, default=2_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.size, args.votes))
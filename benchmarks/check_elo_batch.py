@@ -0,0 +1,155 @@
+"""
+스칼라 Elo 함수와 배열(_batch) 버전의 동치성 검사 (property check).
+
+무작위 입력(일반 점수, 극단적인 점수 차, 같은 점수, 0~수천만 매치, 무작위 상수)에
+대해 두 경로의 결과가 비트 단위로 같은지 확인합니다 (확률은 반올림 전 퍼센트).
+하나라도 다르면 exit code 1.
+(처리 속도 비교는 benchmarks/bench_elo_math.py)
+
+    python -m benchmarks.check_elo_batch [--trials 200] [--size 2000]
+"""
+import argparse
+import math
+import os
+import sys
+
+from benchmarks.common import setup_env
+
+setup_env()
+
+import numpy as np  # noqa: E402
+
+import services  # noqa: E402
+from config import settings, reload_settings  # noqa: E402
+from services import (  # noqa: E402
+    calculate_expected_score,
+    calculate_expected_score_batch,
+    get_dynamic_k_factor,
+    get_dynamic_k_factor_batch,
+    get_match_probabilities_batch,
+    calculate_elo_update,
+    calculate_elo_update_batch,
+)
+
+
+def random_inputs(rng: np.random.Generator, size: int):
+    """일반적인 분포와 경계값을 섞은 입력"""
+    rating_a = rng.normal(1200.0, 300.0, size)
+    rating_b = rng.normal(1200.0, 300.0, size)
+
+    edge = rng.random(size)
+    rating_b = np.where(edge < 0.05, rating_a, rating_b)  # 같은 점수
+    rating_b = np.where((edge >= 0.05) & (edge < 0.1), rating_a + 1e5, rating_b)
+    rating_b = np.where((edge >= 0.1) & (edge < 0.15), rating_a - 1e5, rating_b)
+
+    matches_a = rng.integers(0, 500, size)
+    matches_b = np.where(rng.random(size) < 0.1, rng.integers(0, 10**7, size), 0)
+    matches_b = matches_b + rng.integers(0, 50, size)
+    outcome = rng.choice([0.0, 0.5, 1.0], size)
+    return rating_a, rating_b, matches_a, matches_b, outcome
+
+
+def random_constants(rng: np.random.Generator):
+    k_min = float(rng.uniform(1.0, 40.0))
+    return {
+        "k_max": k_min + float(rng.uniform(0.0, 100.0)),
+        "k_min": k_min,
+        "decay": float(rng.uniform(1.0, 500.0)),
+    }
+
+
+def same_bits(batch: np.ndarray, scalar) -> bool:
+    return np.array_equal(
+        np.asarray(batch, dtype=np.float64).view(np.int64),
+        np.array(scalar, dtype=np.float64).view(np.int64),
+    )
+
+
+def check(trials: int, size: int) -> int:
+    rng = np.random.default_rng(20240601)
+    failures = 0
+
+    for trial in range(trials):
+        rating_a, rating_b, matches_a, matches_b, outcome = random_inputs(rng, size)
+        k_params = random_constants(rng) if trial % 2 else {}
+        ra, rb = rating_a.tolist(), rating_b.tolist()
+        ma, mb, s = matches_a.tolist(), matches_b.tolist(), outcome.tolist()
+
+        checks = {
+            "expected": same_bits(
+                calculate_expected_score_batch(rating_a, rating_b),
+                [calculate_expected_score(x, y) for x, y in zip(ra, rb)],
+            ),
+            "k_factor": same_bits(
+                get_dynamic_k_factor_batch(matches_b, **k_params),
+                [get_dynamic_k_factor(m, **k_params) for m in mb],
+            ),
+        }
+
+        new_a, new_b = calculate_elo_update_batch(
+            rating_a, rating_b, outcome, matches_a, matches_b, **k_params
+        )
+        scalar = [
+            calculate_elo_update(*args, **k_params) for args in zip(ra, rb, s, ma, mb)
+        ]
+        checks["update"] = same_bits(new_a, [x for x, _ in scalar]) and same_bits(
+            new_b, [y for _, y in scalar]
+        )
+
+        probs = get_match_probabilities_batch(rating_a, rating_b)
+        scalar_probs = np.array(
+            [services._match_probabilities(x, y) for x, y in zip(ra, rb)]
+        )
+        checks["probabilities"] = same_bits(
+            np.stack([probs["win_a"], probs["draw"], probs["win_b"]], axis=1),
+            scalar_probs * 100,
+        )
+
+        for name, ok in checks.items():
+            if not ok:
+                failures += 1
+                print(f"trial {trial}: {name} mismatch (k_params={k_params})")
+
+    return failures
+
+
+def check_k_table() -> int:
+    """조회표 값이 수식과 같은지, 설정을 다시 읽으면 새 조회표를 쓰는지 확인합니다."""
+    failures = 0
+    matches = list(range(0, 50_000, 7))
+
+    def direct(m: int) -> float:
+        k_diff = settings.ELO_K_MAX - settings.ELO_K_MIN
+        decay = math.exp(-m / settings.ELO_DECAY_FACTOR)
+        return settings.ELO_K_MIN + k_diff * decay
+
+    original = os.environ.get("ELO_K_MAX")
+    try:
+        for k_max in (None, str(settings.ELO_K_MAX + 17)):
+            if k_max is not None:
+                os.environ["ELO_K_MAX"] = k_max
+                reload_settings()
+            expected = [direct(m) for m in matches]
+            batch = get_dynamic_k_factor_batch(np.array(matches))
+            scalar = [get_dynamic_k_factor(m) for m in matches]
+            if not same_bits(batch, expected) or scalar != expected:
+                failures += 1
+                print(f"k table mismatch (ELO_K_MAX={settings.ELO_K_MAX})")
+    finally:
+        if original is None:
+            os.environ.pop("ELO_K_MAX", None)
+        else:
+            os.environ["ELO_K_MAX"] = original
+        reload_settings()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--size", type=int, default=2_000)
+    args = parser.parse_args()
+
+    failures = check(args.trials, args.size) + check_k_table()
+    print(f"{args.trials} trials x {args.size:,} inputs: {failures} mismatches")
+    sys.exit(1 if failures else 0)
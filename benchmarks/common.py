@@ -0,0 +1,59 @@
+"""
+벤치마크 공용 헬퍼.
+
+앱 모듈은 import 시점에 설정(DB_PATH)을 읽으므로, 반드시 setup_env()를
+먼저 호출한 뒤 앱 모듈을 import 해야 합니다.
+"""
+import os
+import sys
+import random
+import statistics
+import tempfile
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTH = ("admin", "password")
+
+
+def setup_env() -> str:
+    """임시 DB 경로를 설정하고 프로젝트 루트를 import 경로에 추가합니다."""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="anime-bench-"), "bench.db")
+    os.environ["DB_PATH"] = db_path
+    os.environ["AUTH_USERNAME"], os.environ["AUTH_PASSWORD"] = AUTH
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)  # templates/ 상대 경로
+    return db_path
+
+
+async def seed_animes(engine, target_count: int) -> None:
+    """animes 테이블이 target_count 행이 될 때까지 무작위 점수로 채웁니다."""
+    from sqlalchemy import insert, select, func
+    from models import Anime, RATING_CATEGORIES
+
+    async with engine.begin() as conn:
+        current = (await conn.execute(select(func.count(Anime.id)))).scalar()
+        rows = []
+        for i in range(current, target_count):
+            row = {"name": f"Anime {i}", "matches_played": random.randint(0, 200)}
+            for cat in RATING_CATEGORIES:
+                row[f"rating_{cat}"] = random.gauss(1200.0, 150.0)
+            rows.append(row)
+        if rows:
+            await conn.execute(insert(Anime), rows)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """초 단위 샘플을 ms 단위 p50/p99/mean 으로 요약합니다."""
+    ordered = sorted(samples)
+    return {
+        "p50": ordered[len(ordered) // 2] * 1000,
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "mean": statistics.fmean(ordered) * 1000,
+    }
+
+
+def format_row(label: str, stats: Dict[str, float]) -> str:
+    return (
+        f"{label:<28} p50={stats['p50']:8.3f}ms  "
+        f"p99={stats['p99']:8.3f}ms  mean={stats['mean']:8.3f}ms"
+    )
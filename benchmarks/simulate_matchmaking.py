@@ -0,0 +1,144 @@
+"""
+매치메이킹 전략 시뮬레이션.
+
+카테고리별 "진짜" 실력을 가진 가상의 작품들을 1200점/0매치에서 시작시키고,
+각 전략(services.MATCHMAKING_STRATEGIES)이 고른 대결의 결과를 진짜 실력 기준
+승/무/패 확률로 뽑아 Elo를 갱신합니다. --check-every 투표마다 현재 점수 순위와
+진짜 순위의 Spearman 상관계수(카테고리 평균)를 구해, --target에 처음 도달한
+투표 수를 비교합니다 (시드별 중앙값).
+
+    python -m benchmarks.simulate_matchmaking [--animes 300] [--target 0.9] \\
+        [--max-votes 60000] [--seeds 3] [--strategies random smart active]
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import setup_env
+
+setup_env()
+
+import numpy as np  # noqa: E402
+
+from models import Anime, RATING_CATEGORIES  # noqa: E402
+from rating_index import RatingIndex  # noqa: E402
+from services import (  # noqa: E402
+    MATCHMAKING_STRATEGIES,
+    calculate_elo_update,
+    get_match_probabilities,
+    pick_category,
+)
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    rank_a = np.argsort(np.argsort(a))
+    rank_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def rank_accuracy(index: RatingIndex, truth: Dict[str, np.ndarray]) -> float:
+    """현재 점수 순위와 진짜 순위의 Spearman 상관계수 (카테고리 평균)"""
+    ids = range(1, len(index) + 1)
+    return statistics.fmean(
+        spearman(np.array([index.get(i, cat) for i in ids]), truth[cat])
+        for cat in RATING_CATEGORIES
+    )
+
+
+def simulate(
+    strategy_name: str,
+    animes: int,
+    target: float,
+    max_votes: int,
+    check_every: int,
+    seed: int,
+) -> Tuple[Optional[int], float]:
+    """target에 도달한 투표 수(미도달 시 None)와 마지막 상관계수를 반환합니다."""
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    truth = {cat: rng.normal(1200.0, 200.0, animes) for cat in RATING_CATEGORIES}
+
+    index = RatingIndex()
+    for i in range(1, animes + 1):
+        index.add(
+            Anime(
+                id=i,
+                matches_played=0,
+                **{f"rating_{cat}": 1200.0 for cat in RATING_CATEGORIES},
+            )
+        )
+    strategy = MATCHMAKING_STRATEGIES[strategy_name](index)
+
+    accuracy = 0.0
+    for vote in range(1, max_votes + 1):
+        category = pick_category()
+        anime1_id = strategy.pick_anime()
+        anime2_id = strategy.pick_rival(anime1_id, category)
+
+        probs = get_match_probabilities(
+            truth[category][anime1_id - 1], truth[category][anime2_id - 1]
+        )
+        actual_score = random.choices(
+            (1.0, 0.5, 0.0), weights=(probs["win_a"], probs["draw"], probs["win_b"])
+        )[0]
+
+        new_r1, new_r2 = calculate_elo_update(
+            index.get(anime1_id, category),
+            index.get(anime2_id, category),
+            actual_score,
+            index.matches(anime1_id),
+            index.matches(anime2_id),
+        )
+        index.update(anime1_id, category, new_r1)
+        index.update(anime2_id, category, new_r2)
+        index.record_match(anime1_id)
+        index.record_match(anime2_id)
+
+        if vote % check_every == 0:
+            accuracy = rank_accuracy(index, truth)
+            if accuracy >= target:
+                return vote, accuracy
+    return None, accuracy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--animes", type=int, default=300)
+    parser.add_argument("--target", type=float, default=0.9)
+    parser.add_argument("--max-votes", type=int, default=60_000)
+    parser.add_argument("--check-every", type=int, default=100)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument(
+        "--strategies", nargs="+", default=list(MATCHMAKING_STRATEGIES)
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.animes} animes, target Spearman >= {args.target} "
+        f"(max {args.max_votes:,} votes, {args.seeds} seeds)"
+    )
+    for name in args.strategies:
+        start = time.perf_counter()
+        runs = [
+            simulate(
+                name, args.animes, args.target, args.max_votes, args.check_every, seed
+            )
+            for seed in range(args.seeds)
+        ]
+        reached: List[int] = [votes for votes, _ in runs if votes is not None]
+        if len(reached) == len(runs):
+            votes = statistics.median(reached)
+            result = f"{votes:>9,.0f} votes ({votes / args.animes:5.1f}/anime)"
+        else:
+            result = f"not reached in {len(runs) - len(reached)}/{len(runs)} runs"
+        rho = statistics.fmean(accuracy for _, accuracy in runs)
+        print(
+            f"  {name:<8} {result}  final rho={rho:.3f}  "
+            f"({time.perf_counter() - start:.1f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+동시 투표 스트레스 테스트.
+
+소수의 작품에 수천 건의 투표를 동시에 보내고, 모든 투표가 반영되었는지
+(matches_played 증가량 합계 == 투표 수 x 2) 확인합니다.
+서버 재시도 한도를 넘겨 409로 거절된 투표는 실제 클라이언트처럼 잠시 기다렸다가
+다시 보내며(--max-retries), 그래도 반영되지 않은 투표나 200으로 응답하고
+기록되지 않은 투표, 그 밖의 상태 코드는 실패입니다 (exit code 1).
+
+쓰기 경합을 최대로 만들기 위해 기본값으로 읽기/쓰기 풀 분리를 끄고
+(SQLITE_READ_POOL_SIZE=0) 여러 쓰기 커넥션이 동시에 동작하게 합니다.
+
+    python -m benchmarks.stress_vote_concurrency [--votes 3000] [--animes 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from benchmarks.common import AUTH, setup_env, seed_animes
+
+os.environ.setdefault("SQLITE_READ_POOL_SIZE", "0")
+# 정규화는 점수만 옮기므로 매치 수 검증과 무관하지만, 충돌을 늘리기 위해 그대로 둡니다.
+setup_env()
+
+import httpx  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.sql.expression import func as sql_func  # noqa: E402
+
+from main import app  # noqa: E402
+from database import engine, AsyncSessionLocal  # noqa: E402
+from models import Anime  # noqa: E402
+from rating_index import rating_index  # noqa: E402
+
+
+async def total_matches() -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(sql_func.sum(Anime.matches_played)))
+        return result.scalar() or 0
+
+
+async def run(votes: int, animes: int, concurrency: int, max_retries: int) -> bool:
+    async with app.router.lifespan_context(app):
+        await seed_animes(engine, animes)
+        async with AsyncSessionLocal() as db:
+            await rating_index.load(db)
+
+        before = await total_matches()
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = {}
+        retries = 0
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://stress", auth=AUTH, timeout=60
+        ) as client:
+
+            async def fire():
+                nonlocal retries
+                a, b = random.sample(range(1, animes + 1), 2)
+                data = {
+                    "anime1_id": a,
+                    "anime2_id": b,
+                    "category": random.choice(("story", "fun")),
+                    "winner": random.choice(("1", "2", "draw")),
+                }
+                for attempt in range(max_retries + 1):
+                    if attempt:
+                        retries += 1
+                        await asyncio.sleep(random.uniform(0, 0.01 * attempt))
+                    async with semaphore:
+                        response = await client.post(
+                            "/battle/vote",
+                            data=data,
+                            headers={"X-Requested-With": "XMLHttpRequest"},
+                        )
+                    if response.status_code != 409:
+                        break
+                status = response.status_code
+                statuses[status] = statuses.get(status, 0) + 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(fire() for _ in range(votes)))
+            elapsed = time.perf_counter() - start
+
+        # 쓰기 큐를 쓰는 경우 종료 전에 남은 투표를 모두 기록
+        from vote_queue import vote_queue
+
+        await vote_queue.flush()
+        increments = await total_matches() - before
+
+    accepted = statuses.get(200, 0)
+    print(f"{votes:,} votes on {animes} titles in {elapsed:.2f}s, statuses={statuses}")
+    print(f"client retries after 409: {retries:,}")
+    print(f"matches_played increments={increments:,} expected={votes * 2:,}")
+
+    ok = accepted == votes and increments == votes * 2
+    print("OK" if ok else "FAILED: votes were lost or not applied")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--votes", type=int, default=3_000)
+    parser.add_argument("--animes", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-retries", type=int, default=20)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.votes, args.animes, args.concurrency, args.max_retries))
+    sys.exit(0 if ok else 1)
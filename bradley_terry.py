@@ -0,0 +1,156 @@
+"""
+Bradley–Terry / Davidson 최대우도 적합 (NumPy, 모든 작품을 한 번에).
+
+P(i 승) = γi / (γi + γj + ν√(γiγj)),  P(무승부) = ν√(γiγj) / (같은 분모)
+ν = 0이면 무승부가 없는 Bradley–Terry와 같습니다.
+
+순차 Elo와 달리 결과가 투표 순서에 의존하지 않습니다. 대결 쌍별 집계(COO 배열:
+쌍 목록 + 승/무/패 수)를 희소 행렬로 보고, Hunter(2004)의 MM 반복에서
+행렬-벡터 곱을 np.bincount로 계산합니다 (반복 1회 O(쌍 수)).
+점수는 Elo와 같은 척도(400 * log10 γ)로, 평균이 center가 되도록 맞춥니다.
+"""
+import math
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+# log γ <-> Elo 척도 변환 계수 (400 / ln 10)
+SCALE = 400.0 / math.log(10.0)
+
+
+class PairCounts(NamedTuple):
+    """대결 쌍별 집계. first < second (작품 id 또는 위치), 쌍마다 1행"""
+
+    first: np.ndarray
+    second: np.ndarray
+    first_wins: np.ndarray
+    second_wins: np.ndarray
+    draws: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "PairCounts":
+        ids = np.zeros(0, dtype=np.int64)
+        return cls(ids, ids, ids, ids, ids)
+
+    @classmethod
+    def from_votes(
+        cls, anime1: np.ndarray, anime2: np.ndarray, outcome: np.ndarray
+    ) -> "PairCounts":
+        """votes 로그 배열(outcome: anime1 기준 점수 x 2)을 쌍별로 집계합니다."""
+        swap = anime1 > anime2
+        first = np.where(swap, anime2, anime1)
+        second = np.where(swap, anime1, anime2)
+        # first 기준 결과 (2: first 승, 1: 무승부, 0: second 승)
+        result = np.where(swap, 2 - outcome, outcome)
+        return cls._aggregate(first, second, result == 2, result == 0, result == 1)
+
+    def merge(self, other: "PairCounts") -> "PairCounts":
+        return self._aggregate(*(np.concatenate([a, b]) for a, b in zip(self, other)))
+
+    @classmethod
+    def _aggregate(cls, first, second, first_wins, second_wins, draws):
+        if not len(first):
+            return cls.empty()
+        pairs, inverse = np.unique(
+            np.stack([first, second], axis=1), axis=0, return_inverse=True
+        )
+        inverse = inverse.ravel()
+        size = len(pairs)
+        return cls(
+            pairs[:, 0].astype(np.int64),
+            pairs[:, 1].astype(np.int64),
+            *(
+                np.bincount(inverse, weights=counts, minlength=size).astype(np.int64)
+                for counts in (first_wins, second_wins, draws)
+            ),
+        )
+
+
+class FitResult(NamedTuple):
+    ratings: np.ndarray
+    iterations: int
+    converged: bool
+
+
+def davidson_tie(draw_max: float) -> float:
+    """동점일 때 무승부 확률 draw_max(ELO_DRAW_MAX)에 해당하는 ν = 2d / (1 - d)"""
+    return 2.0 * draw_max / (1.0 - draw_max)
+
+
+def fit(
+    n: int,
+    player_a: np.ndarray,
+    player_b: np.ndarray,
+    wins_a: np.ndarray,
+    wins_b: np.ndarray,
+    draws: np.ndarray,
+    tie: float,
+    prior: float,
+    initial: Optional[np.ndarray] = None,
+    max_iterations: int = 100,
+    tolerance: float = 0.01,
+    deadline: Optional[float] = None,
+    center: float = 1200.0,
+) -> FitResult:
+    """
+    n명의 점수를 MM 반복으로 적합합니다.
+
+    player_a/player_b: 쌍별 선수 위치 (0..n-1), wins_*/draws: 쌍별 결과 수
+    prior: 선수마다 평균 실력(γ=1)의 가상 상대와 비긴 횟수 (정규화).
+           한 번도 이기지 못한 작품의 점수가 -∞로 발산하지 않게 합니다 (> 0).
+    initial: 이전 해(Elo 척도)로 warm start. 없으면 모두 center에서 시작합니다.
+    최대 max_iterations회 또는 deadline(time.perf_counter 기준)까지 반복하며,
+    반복 1회의 최대 점수 변화가 tolerance(Elo 척도) 미만이면 수렴한 것으로 봅니다.
+    """
+    wins_a = np.asarray(wins_a, dtype=np.float64)
+    wins_b = np.asarray(wins_b, dtype=np.float64)
+    draws = np.asarray(draws, dtype=np.float64)
+    games = wins_a + wins_b + draws
+
+    # 분자 (승 + 무승부/2)는 반복 중 변하지 않습니다.
+    numerator = (
+        np.bincount(player_a, wins_a + 0.5 * draws, minlength=n)
+        + np.bincount(player_b, wins_b + 0.5 * draws, minlength=n)
+        + 0.5 * prior
+    )
+
+    if initial is None:
+        log_gamma = np.zeros(n)
+    else:
+        log_gamma = (np.asarray(initial, dtype=np.float64) - center) / SCALE
+
+    iterations = 0
+    converged = False
+    while iterations < max_iterations:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        iterations += 1
+
+        gamma = np.exp(log_gamma)
+        g_a, g_b = gamma[player_a], gamma[player_b]
+        root = np.sqrt(g_a * g_b)
+        weight = games / (g_a + g_b + tie * root)
+        # 가상 상대(γ=1)와의 prior 대결
+        root_prior = np.sqrt(gamma)
+        share_a = weight * (1.0 + 0.5 * tie * root / g_a)
+        share_b = weight * (1.0 + 0.5 * tie * root / g_b)
+        denominator = (
+            np.bincount(player_a, share_a, minlength=n)
+            + np.bincount(player_b, share_b, minlength=n)
+            + prior
+            * (1.0 + 0.5 * tie / root_prior)
+            / (gamma + 1.0 + tie * root_prior)
+        )
+
+        new_log_gamma = np.log(numerator / denominator)
+        # 척도 고정: 평균 점수 = center
+        new_log_gamma -= new_log_gamma.mean()
+        change = np.max(np.abs(new_log_gamma - log_gamma), initial=0.0)
+        log_gamma = new_log_gamma
+        if change * SCALE < tolerance:
+            converged = True
+            break
+
+    return FitResult(log_gamma * SCALE + center, iterations, converged)
+
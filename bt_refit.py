@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from background import BackgroundTask
+from bradley_terry import PairCounts, davidson_tie, fit
+from config import settings
+from database import AsyncSessionLocal, ReadSessionLocal
+from models import Anime, RATING_CATEGORIES
+from pairwise import pairwise_store
+from rating_index import rating_index
+from services import anime_bulk_update
+
+BT_STATEMENT = anime_bulk_update(
+    [f"bt_{cat}" for cat in RATING_CATEGORIES] + ["bt_total"]
+)
+
+
+class BradleyTerryRefit(BackgroundTask):
+    """
+    카테고리별 Davidson(무승부 포함 Bradley–Terry) 모델 주기적 재적합.
+
+    쌍별 집계는 투표마다 갱신되는 pairwise_store에서 COO 배열로 꺼내므로
+    투표 로그를 다시 읽지 않습니다. 적합은 DB에 저장된 이전 해
+    (bt_* 컬럼)에서 시작하고, BT_MAX_ITERATIONS / BT_TIME_BUDGET_MS 안에
+    수렴하지 않으면 다음 실행이 새 투표가 없어도 이어서 반복합니다.
+    결과는 바뀐 행의 bt_* 컬럼에만 청크 단위로 기록하므로
+    단일 쓰기 연결을 쓰는 투표 경로를 오래 막지 않습니다.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        # 마지막으로 적합한 쌍별 집계의 버전 (pairwise_store.version)
+        self._version: Optional[int] = None
+        self._converged = True
+        # 마지막 적합 요약 (쌍 수, 반복 횟수, 수렴 여부, 소요 시간)
+        self.last_run: Dict[str, Any] = {}
+
+    def _fit(
+        self,
+        ids: np.ndarray,
+        pairs: Dict[str, PairCounts],
+        initial: np.ndarray,
+        deadline: float,
+    ) -> Tuple[np.ndarray, int, bool]:
+        """카테고리별 적합 (CPU 작업, 스레드에서 실행). 남은 시간은 카테고리별로 나눕니다."""
+        ratings = initial.copy()
+        iterations = 0
+        converged = True
+        tie = davidson_tie(settings.ELO_DRAW_MAX)
+
+        for c, cat in enumerate(RATING_CATEGORIES):
+            # 삭제된 작품이 포함된 쌍은 건너뜁니다.
+            valid = np.isin(pairs[cat].first, ids) & np.isin(pairs[cat].second, ids)
+            first, second, first_wins, second_wins, draws = (
+                column[valid] for column in pairs[cat]
+            )
+            now = time.perf_counter()
+            result = fit(
+                len(ids),
+                np.searchsorted(ids, first),
+                np.searchsorted(ids, second),
+                first_wins,
+                second_wins,
+                draws,
+                tie=tie,
+                prior=settings.BT_PRIOR_GAMES,
+                initial=initial[:, c],
+                max_iterations=settings.BT_MAX_ITERATIONS,
+                tolerance=settings.BT_TOLERANCE,
+                deadline=now + (deadline - now) / (len(RATING_CATEGORIES) - c),
+                center=settings.NORMALIZE_TARGET_MEAN,
+            )
+            ratings[:, c] = result.ratings
+            iterations += result.iterations
+            converged &= result.converged
+
+        return ratings, iterations, converged
+
+    async def refit(self) -> bool:
+        """
+        새 투표가 있거나 이전 적합이 수렴하지 않았으면 다시 적합해 기록합니다.
+        적합했으면 True를 반환합니다.
+        """
+        start = time.perf_counter()
+        columns = [getattr(Anime, f"bt_{cat}") for cat in RATING_CATEGORIES]
+
+        version = pairwise_store.version
+        if version != self._version:
+            # 기록 전에 실패해도 다음 실행이 다시 적합하도록 표시합니다.
+            self._converged = False
+        elif self._converged:
+            return False
+        # 스레드에서 읽는 동안 투표가 반영되지 않도록 먼저 배열로 꺼내 둡니다.
+        pairs = {cat: pairwise_store.pairs(cat) for cat in RATING_CATEGORIES}
+        self._version = version
+
+        # 읽기 전용 연결에서 읽어, 적합하는 동안 쓰기 연결을 잡고 있지 않습니다.
+        async with ReadSessionLocal() as db:
+            result = await db.execute(select(Anime.id, *columns).order_by(Anime.id))
+            rows = result.all()
+        if not rows:
+            return False
+
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        initial = np.array([row[1:] for row in rows], dtype=np.float64)
+        deadline = start + settings.BT_TIME_BUDGET_MS / 1000.0
+        ratings, iterations, converged = await asyncio.to_thread(
+            self._fit, ids, pairs, initial, deadline
+        )
+        written = await self._write(ids, initial, ratings)
+        # 모든 청크를 기록한 뒤에만 수렴으로 표시합니다 (중간 실패 시 다음 실행이 재적합).
+        self._converged = converged
+
+        # 랭킹 캐시 무효화
+        rating_index.bump_version()
+        self.last_run = {
+            "pairs": sum(len(p.first) for p in pairs.values()),
+            "games": int(
+                sum(
+                    p.first_wins.sum() + p.second_wins.sum() + p.draws.sum()
+                    for p in pairs.values()
+                )
+            ),
+            "iterations": iterations,
+            "written": written,
+            "converged": self._converged,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        return True
+
+    @staticmethod
+    async def _write(ids: np.ndarray, initial: np.ndarray, ratings: np.ndarray) -> int:
+        """
+        BT_TOLERANCE 이상 바뀐 행만 BT_WRITE_CHUNK_SIZE개씩 나눠 기록합니다.
+        청크마다 커밋하고 쓰기 연결을 반환하므로, 그 사이에 투표가 기록될 수 있습니다.
+        """
+        changed = np.abs(ratings - initial).max(axis=1) >= settings.BT_TOLERANCE
+        if not changed.any():
+            return 0
+
+        ids, ratings = ids[changed], ratings[changed]
+        weights = np.array(
+            [settings.TOTAL_SCORE_WEIGHTS[cat] for cat in RATING_CATEGORIES]
+        )
+        totals = ratings @ weights / len(RATING_CATEGORIES)
+        names = [f"bt_{cat}" for cat in RATING_CATEGORIES]
+        params = [
+            {"b_id": anime_id, **dict(zip(names, values)), "bt_total": total}
+            for anime_id, values, total in zip(
+                ids.tolist(), ratings.tolist(), totals.tolist()
+            )
+        ]
+        size = settings.BT_WRITE_CHUNK_SIZE
+        for lo in range(0, len(params), size):
+            async with AsyncSessionLocal() as db:
+                await db.execute(BT_STATEMENT, params[lo : lo + size])
+                await db.commit()
+            await asyncio.sleep(0)
+        return len(params)
+
+    async def _run(self) -> None:
+        # 시작하자마자 한 번 적합한 뒤 interval마다 반복합니다.
+        while True:
+            try:
+                await self.refit()
+            except Exception as e:
+                print(f"Bradley–Terry 재적합 중 오류 발생: {e}")
+            await asyncio.sleep(self.interval)
+
+
+bt_refit = BradleyTerryRefit(interval=settings.BT_REFIT_INTERVAL_SECONDS)
@@ -1,13 +1,38 @@
 # config.py
+import math
+from typing import Callable, Dict, List
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
+# 종합 점수 가중치 기본값 (키는 models.RATING_CATEGORIES와 같아야 합니다)
+DEFAULT_TOTAL_SCORE_WEIGHTS: Dict[str, float] = {
+    "story": 1.2,
+    "visual": 1.0,
+    "ost": 0.8,
+    "voice": 0.8,
+    "char": 1.0,
+    "fun": 1.2,
+}
+
 
 class Settings(BaseSettings):
     DB_PATH: str = "./anime_rank.db"
     AUTH_USERNAME: str = "admin"
     AUTH_PASSWORD: str = "password"
 
+    # --- SQLite Connection Profile ---
+    # 모든 커넥션 생성 시 PRAGMA로 적용됩니다 (database.py)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # 읽기가 쓰기를 막지 않도록 WAL 사용
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL에서는 NORMAL로도 손상 없이 안전
+    SQLITE_MMAP_SIZE: int = 64 * 1024 * 1024  # bytes
+    SQLITE_CACHE_SIZE: int = -8000  # 음수는 KiB 단위 (약 8MB, 커넥션당)
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT: int = 5000  # ms
+    # 읽기 전용 커넥션 풀 크기 (쓰기는 항상 단일 커넥션으로 직렬화)
+    # 0이면 읽기/쓰기가 하나의 기본 풀을 공유합니다 (이전 동작).
+    SQLITE_READ_POOL_SIZE: int = 4
+
     # --- Elo Rating Constants ---
     # 초기 진입 시 변동폭 (배치고사 느낌)
     ELO_K_MAX: int = 100
@@ -16,9 +41,86 @@ class Settings(BaseSettings):
     # K-Factor가 줄어드는 속도 (높을수록 천천히 줄어듦)
     ELO_DECAY_FACTOR: int = 50
 
+    # --- Total Score Weights ---
+    # 종합 점수 = Σ(rating_<category> * weight) / 6
+    # 변경 후 서버를 재시작하면 total_score 컬럼이 한 번 일괄 재계산됩니다.
+    # 환경변수 예: TOTAL_SCORE_WEIGHTS='{"story": 1.5, "visual": 1.0, ...}'
+    # 일부만 지정하면 나머지 카테고리는 1.0입니다.
+    TOTAL_SCORE_WEIGHTS: Dict[str, float] = DEFAULT_TOTAL_SCORE_WEIGHTS
+
+    # --- Normalization (Mean Reversion) ---
+    # 카테고리 평균이 기준점에서 이 값 이상 벗어났을 때만 전체 보정을 수행
+    NORMALIZE_TARGET_MEAN: float = 1200.0
+    NORMALIZE_DRIFT_THRESHOLD: float = 1.0
+
+    # --- Vote Concurrency ---
+    # 동시 투표로 version 비교(CAS)가 실패했을 때 재시도 횟수
+    VOTE_MAX_RETRIES: int = 5
+
+    # --- Write-behind Vote Queue ---
+    # 활성화 시 투표는 메모리에서 즉시(순차 Elo) 적용/응답하고,
+    # DB 기록은 짧은 주기 또는 일정 건수마다 하나의 트랜잭션으로 묶어 처리합니다.
+    VOTE_QUEUE_ENABLED: bool = False
+    VOTE_QUEUE_FLUSH_INTERVAL_MS: int = 50
+    VOTE_QUEUE_BATCH_SIZE: int = 256
+
+    # --- Ranking Pagination ---
+    RANKING_PAGE_SIZE: int = 50
+    RANKING_MAX_PAGE_SIZE: int = 200
+    # /ranking/distribution 응답의 브라우저 캐시 시간 (초)
+    RANKING_DISTRIBUTION_MAX_AGE: int = 30
+
     # --- Matchmaking Constants ---
+    # 상대 선정 전략 (services.MATCHMAKING_STRATEGIES)
+    # - "smart": MATCH_SMART_RATE 확률로 점수가 비슷한 상대, 그 외 무작위
+    # - "active": 매치 수가 적은(불확실한) 작품과 결과 예측이 어려운 상대 우선
+    # - "random": 완전 무작위
+    MATCH_STRATEGY: str = "smart"
     MATCH_SMART_RATE: float = 0.8
     MATCH_SCORE_RANGE: int = 300
+    # active 전략이 비교하는 상대 후보 수
+    MATCH_ACTIVE_CANDIDATES: int = 8
+    # /battle/next로 한 번에 받아 두는 대결 수 (기본값/최대값)
+    BATTLE_PREFETCH_SIZE: int = 10
+    BATTLE_PREFETCH_MAX_SIZE: int = 50
+
+    # --- Matchup Pool ---
+    # 미리 만들어 둔 대결을 꺼내 쓰고, MATCH_POOL_LOW_WATERMARK 아래로 줄면
+    # 백그라운드에서 MATCH_POOL_SIZE까지 다시 채웁니다.
+    MATCH_POOL_ENABLED: bool = True
+    MATCH_POOL_SIZE: int = 256
+    MATCH_POOL_LOW_WATERMARK: int = 64
+    # 생성 이후 두 작품 중 하나라도 점수가 이 이상 움직이면 폐기
+    MATCH_POOL_MAX_DRIFT: float = 25.0
+    # 집중 모드: 최근 요청된 작품 수 / 작품당 대결 수
+    MATCH_POOL_FOCUS_SLOTS: int = 32
+    MATCH_POOL_FOCUS_SIZE: int = 16
+
+    # --- Rating Engine ---
+    # "elo": 투표마다 동적 K-Factor Elo로 즉시 갱신
+    # "glicko2": 투표는 기록만 하고, GLICKO_PERIOD_SECONDS마다 그 사이의 투표를
+    #            모든 작품에 대해 한 번에(벡터화) 반영하는 Glicko-2 rating period
+    RATING_ENGINE: str = "elo"
+    GLICKO_PERIOD_SECONDS: int = 600
+    # 변동성 제약(τ)과 rd 상한 (초기 rd/volatility는 models.Anime의 기본값 350/0.06)
+    GLICKO_TAU: float = 0.5
+    GLICKO_MAX_RD: float = 350.0
+
+    # --- Bradley–Terry Refit ---
+    # 전체 투표 로그로 카테고리별 Davidson(무승부 포함 Bradley–Terry) 모델을 주기적으로
+    # 다시 적합해 bt_* 컬럼(대안 랭킹, /ranking?model=bt)에 기록합니다.
+    # 이전 해에서 시작(warm start)하며, 1회 실행은 반복 횟수/시간 상한으로 제한됩니다.
+    BT_REFIT_ENABLED: bool = True
+    BT_REFIT_INTERVAL_SECONDS: int = 300
+    BT_MAX_ITERATIONS: int = 500
+    BT_TIME_BUDGET_MS: int = 2000
+    # 반복 1회의 최대 점수 변화가 이 값(점) 미만이면 수렴
+    BT_TOLERANCE: float = 0.01
+    # 작품마다 평균 실력의 가상 상대와 비긴 횟수 (전승/전패 작품의 발산 방지, > 0)
+    BT_PRIOR_GAMES: float = 1.0
+    # 결과 기록 시 한 트랜잭션에 쓰는 최대 행 수 (BT_TOLERANCE 이상 바뀐 행만 기록).
+    # 청크 사이에 쓰기 연결을 반환해 투표 기록이 오래 기다리지 않게 합니다.
+    BT_WRITE_CHUNK_SIZE: int = 500
 
     # --- Probability Calculation Constants (New) ---
     # 두 상대의 점수가 같을 때의 최대 무승부 확률 (0.0 ~ 1.0)
@@ -30,6 +132,18 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
+    @field_validator("TOTAL_SCORE_WEIGHTS")
+    @classmethod
+    def _check_total_score_weights(cls, weights: Dict[str, float]) -> Dict[str, float]:
+        """알 수 없는 카테고리와 음수/무한대 가중치는 시작 시점에 거부합니다."""
+        unknown = set(weights) - set(DEFAULT_TOTAL_SCORE_WEIGHTS)
+        if unknown:
+            raise ValueError(f"알 수 없는 카테고리: {sorted(unknown)}")
+        invalid = {k: w for k, w in weights.items() if not math.isfinite(w) or w < 0}
+        if invalid:
+            raise ValueError(f"가중치는 0 이상의 유한한 값이어야 합니다: {invalid}")
+        return {cat: weights.get(cat, 1.0) for cat in DEFAULT_TOTAL_SCORE_WEIGHTS}
+
 
 @lru_cache
 def get_settings():
@@ -37,3 +151,25 @@ def get_settings():
 
 
 settings = get_settings()
+
+# 설정을 다시 읽은 뒤 호출할 콜백 (설정값으로 미리 계산해 둔 캐시 무효화 등)
+_reload_callbacks: List[Callable[[], None]] = []
+
+
+def on_settings_reload(callback: Callable[[], None]) -> Callable[[], None]:
+    """reload_settings() 이후 호출될 콜백을 등록합니다 (데코레이터로도 사용)."""
+    _reload_callbacks.append(callback)
+    return callback
+
+
+def reload_settings() -> Settings:
+    """
+    환경변수/.env를 다시 읽어 전역 settings 객체를 제자리에서 갱신합니다.
+    각 모듈은 같은 settings 객체를 import해 쓰므로 새 객체로 바꾸지 않습니다.
+    """
+    fresh = Settings()
+    for name in Settings.model_fields:
+        setattr(settings, name, getattr(fresh, name))
+    for callback in _reload_callbacks:
+        callback()
+    return settings
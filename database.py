@@ -1,4 +1,4 @@
-# database.py
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from config import settings
@@ -6,12 +6,68 @@ from config import settings
 DATABASE_URL = f"sqlite+aiosqlite:///{settings.DB_PATH}"
 
 # check_same_thread=False is needed for SQLite with asyncio
-engine = create_async_engine(
-    DATABASE_URL, echo=False, connect_args={"check_same_thread": False}
-)
+CONNECT_ARGS = {"check_same_thread": False}
+
+SQLITE_PRAGMAS = {
+    "journal_mode": settings.SQLITE_JOURNAL_MODE,
+    "synchronous": settings.SQLITE_SYNCHRONOUS,
+    "mmap_size": settings.SQLITE_MMAP_SIZE,
+    "cache_size": settings.SQLITE_CACHE_SIZE,
+    "temp_store": settings.SQLITE_TEMP_STORE,
+    "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+}
+
+
+def _apply_pragmas(dbapi_connection, connection_record) -> None:
+    """커넥션이 새로 열릴 때마다 연결 프로필(PRAGMA)을 적용합니다."""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _apply_read_only(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+if settings.SQLITE_READ_POOL_SIZE > 0:
+    # SQLite는 동시에 하나의 쓰기만 허용하므로 쓰기 커넥션은 1개로 직렬화하고,
+    # WAL 모드에서 쓰기와 동시에 진행 가능한 읽기는 별도 풀로 분리합니다.
+    write_engine = create_async_engine(
+        DATABASE_URL,
+        echo=False,
+        connect_args=CONNECT_ARGS,
+        pool_size=1,
+        max_overflow=0,
+    )
+    read_engine = create_async_engine(
+        DATABASE_URL,
+        echo=False,
+        connect_args=CONNECT_ARGS,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    event.listen(read_engine.sync_engine, "connect", _apply_pragmas)
+    event.listen(read_engine.sync_engine, "connect", _apply_read_only)
+else:
+    write_engine = create_async_engine(
+        DATABASE_URL, echo=False, connect_args=CONNECT_ARGS
+    )
+    read_engine = write_engine
+
+event.listen(write_engine.sync_engine, "connect", _apply_pragmas)
+
+# 스키마 생성/마이그레이션 등 기존 코드와의 호환을 위한 기본 엔진 (쓰기용)
+engine = write_engine
 
 AsyncSessionLocal = async_sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    bind=write_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+)
+
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
 )
 
 
@@ -20,5 +76,18 @@ class Base(DeclarativeBase):
 
 
 async def get_db():
+    """쓰기용 세션 (투표, 관리 기능)"""
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db():
+    """읽기 전용 세션 (랭킹, 대결 화면 조회)"""
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    await write_engine.dispose()
+    if read_engine is not write_engine:
+        await read_engine.dispose()
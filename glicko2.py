@@ -0,0 +1,124 @@
+"""
+Glicko-2 rating period 계산 (NumPy, 모든 작품을 한 번에).
+
+Glickman, "Example of the Glicko-2 system" 의 절차를 그대로 따르되,
+선수별 반복 대신 투표 배열 전체에 대해 벡터화했습니다.
+점수 척도는 Elo와 같으며(400 / ln 10), 중심만 center(기본 1200)로 옮깁니다.
+"""
+from typing import Tuple
+
+import numpy as np
+
+# Glicko 척도 <-> Glicko-2 내부 척도 변환 계수 (400 / ln 10)
+SCALE = 173.7178
+
+# 변동성(volatility) 반복 계산의 수렴 기준과 최대 반복 횟수
+CONVERGENCE = 1e-6
+MAX_ITERATIONS = 100
+
+
+def _g(phi: np.ndarray) -> np.ndarray:
+    return 1.0 / np.sqrt(1.0 + 3.0 * phi * phi / (np.pi * np.pi))
+
+
+def _new_volatility(
+    sigma: np.ndarray,
+    phi: np.ndarray,
+    v: np.ndarray,
+    delta: np.ndarray,
+    tau: float,
+) -> np.ndarray:
+    """새 변동성 σ' (Illinois 알고리즘, 모든 선수를 함께 반복)"""
+    a = np.log(sigma * sigma)
+    phi2 = phi * phi
+    delta2 = delta * delta
+
+    def f(x: np.ndarray) -> np.ndarray:
+        ex = np.exp(x)
+        return (ex * (delta2 - phi2 - v - ex)) / (
+            2.0 * (phi2 + v + ex) ** 2
+        ) - (x - a) / (tau * tau)
+
+    # 초기 구간 [A, B]
+    big = delta2 > phi2 + v
+    upper = np.log(np.where(big, delta2 - phi2 - v, 1.0))
+    b = np.where(big, upper, a - tau)
+    need = ~big & (f(b) < 0)
+    k = 1
+    while need.any():
+        k += 1
+        b = np.where(need, a - k * tau, b)
+        need &= f(b) < 0
+
+    lo, hi = a.copy(), b
+    f_lo, f_hi = f(lo), f(hi)
+    for _ in range(MAX_ITERATIONS):
+        active = np.abs(hi - lo) > CONVERGENCE
+        if not active.any():
+            break
+        c = lo + (lo - hi) * f_lo / (f_hi - f_lo)
+        f_c = f(c)
+        swap = f_c * f_hi <= 0
+        lo = np.where(active, np.where(swap, hi, lo), lo)
+        f_lo = np.where(active, np.where(swap, f_hi, f_lo / 2.0), f_lo)
+        hi = np.where(active, c, hi)
+        f_hi = np.where(active, f_c, f_hi)
+
+    return np.exp(lo / 2.0)
+
+
+def rate_period(
+    rating: np.ndarray,
+    rd: np.ndarray,
+    volatility: np.ndarray,
+    player_a: np.ndarray,
+    player_b: np.ndarray,
+    score_a: np.ndarray,
+    tau: float,
+    max_rd: float,
+    center: float = 1200.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    한 rating period의 모든 대결을 반영한 (rating, rd, volatility)를 반환합니다.
+
+    rating/rd/volatility: 선수별 period 시작 시점 값 (길이 n)
+    player_a/player_b: 대결별 선수 위치 (0..n-1), score_a: a 기준 실제 점수 (1/0.5/0)
+    대결이 없던 선수는 점수/변동성은 그대로, rd만 시간 경과만큼 커집니다.
+    rd는 max_rd를 넘지 않습니다.
+    """
+    n = len(rating)
+    mu = (np.asarray(rating, dtype=np.float64) - center) / SCALE
+    phi = np.asarray(rd, dtype=np.float64) / SCALE
+    sigma = np.asarray(volatility, dtype=np.float64)
+
+    # 대결마다 양쪽 시점의 행을 하나씩 만듭니다.
+    player = np.concatenate([player_a, player_b])
+    opponent = np.concatenate([player_b, player_a])
+    score = np.concatenate([score_a, 1.0 - np.asarray(score_a, dtype=np.float64)])
+
+    g = _g(phi[opponent])
+    expected = 1.0 / (1.0 + np.exp(-g * (mu[player] - mu[opponent])))
+    v_inv = np.bincount(player, g * g * expected * (1.0 - expected), minlength=n)
+    improvement = np.bincount(player, g * (score - expected), minlength=n)
+
+    played = v_inv > 0
+    new_mu = mu.copy()
+    new_sigma = sigma.copy()
+    # 대결이 없던 선수: φ' = sqrt(φ² + σ²)
+    new_phi = np.sqrt(phi * phi + sigma * sigma)
+
+    if played.any():
+        p_phi, p_sigma = phi[played], sigma[played]
+        v = 1.0 / v_inv[played]
+        delta = v * improvement[played]
+
+        p_sigma = _new_volatility(p_sigma, p_phi, v, delta, tau)
+        phi_star = np.sqrt(p_phi * p_phi + p_sigma * p_sigma)
+        p_phi = 1.0 / np.sqrt(1.0 / (phi_star * phi_star) + 1.0 / v)
+
+        new_mu[played] = mu[played] + p_phi * p_phi * improvement[played]
+        new_phi[played] = p_phi
+        new_sigma[played] = p_sigma
+
+    new_phi = np.minimum(new_phi, max_rd / SCALE)
+    return new_mu * SCALE + center, new_phi * SCALE, new_sigma
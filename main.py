@@ -10,8 +10,15 @@ from fastapi.exception_handlers import (
 )
 
 from config import settings
-from database import engine, Base, AsyncSessionLocal
-from services import load_initial_data
+from database import engine, AsyncSessionLocal, dispose_engines
+from services import load_initial_data, get_rating_engine
+from migrations import create_schema
+from rating_index import rating_index
+from pairwise import pairwise_store
+from vote_queue import vote_queue
+from matchup_pool import matchup_pool
+from rating_period import rating_period_runner, sync_rating_period_cursor
+from bt_refit import bt_refit
 from routers import battle, ranking, manage
 
 # --- Security ---
@@ -47,15 +54,32 @@ def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)):
 async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_schema)
 
     async with AsyncSessionLocal() as session:
         await load_initial_data(session)
+        await sync_rating_period_cursor(session)
+        await rating_index.load(session)
+        await pairwise_store.load(session)
+
+    if settings.VOTE_QUEUE_ENABLED:
+        vote_queue.start()
+    if settings.MATCH_POOL_ENABLED:
+        matchup_pool.start()
+    if get_rating_engine().periodic:
+        rating_period_runner.start()
+    if settings.BT_REFIT_ENABLED:
+        bt_refit.start()
 
     yield
 
     # Shutdown
-    await engine.dispose()
+    await matchup_pool.stop()
+    await bt_refit.stop()
+    # 큐에 남은 투표를 먼저 기록하고, 마지막 rating period까지 반영한 뒤 엔진을 닫습니다.
+    await vote_queue.stop()
+    await rating_period_runner.stop()
+    await dispose_engines()
 
 
 # --- App Init ---
@@ -0,0 +1,181 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from background import BackgroundTask
+from config import settings
+from database import ReadSessionLocal
+from models import Anime
+from rating_index import rating_index
+from services import build_matchup, sample_match_ids
+
+# (대결 데이터, 생성 시점의 anime1 점수, anime2 점수)
+Entry = Tuple[Dict[str, Any], float, float]
+
+
+class MatchupPool(BackgroundTask):
+    """
+    미리 만들어 둔 대결(카테고리, 확률, 등수 포함) 풀.
+
+    pop()은 풀에서 꺼내기만 하므로 O(1)이며 DB를 거치지 않습니다.
+    남은 수가 low_watermark 아래로 내려가면 백그라운드 작업이 size까지 다시 채우고,
+    생성 이후 두 작품 중 하나라도 점수가 max_drift보다 많이 움직인 대결은
+    꺼낼 때/채울 때 폐기합니다.
+    집중 모드는 최근 요청된 작품(focus_slots개)마다 작은 풀을 따로 둡니다.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        low_watermark: int,
+        max_drift: float,
+        focus_slots: int,
+        focus_size: int,
+    ) -> None:
+        self.size = size
+        self.low_watermark = low_watermark
+        self.max_drift = max_drift
+        self.focus_slots = focus_slots
+        self.focus_size = focus_size
+        self._entries: Deque[Entry] = deque()
+        self._focus: "OrderedDict[int, Deque[Entry]]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, focus_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """대결 1개를 꺼냅니다. 풀이 비었으면 None (호출 측에서 직접 생성)."""
+        if focus_id is None:
+            entries = self._entries
+            low_watermark = self.low_watermark
+        else:
+            if focus_id not in rating_index:
+                return None
+            entries = self._focus_entries(focus_id)
+            low_watermark = self.focus_size // 2
+
+        matchup = None
+        while entries:
+            entry = entries.popleft()
+            if self._is_fresh(entry):
+                matchup = entry[0]
+                break
+
+        if len(entries) < low_watermark:
+            self._wakeup.set()
+        return matchup
+
+    def pop_many(
+        self, n: int, focus_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        matchups = []
+        while len(matchups) < n:
+            matchup = self.pop(focus_id)
+            if matchup is None:
+                break
+            matchups.append(matchup)
+        return matchups
+
+    def clear(self) -> None:
+        """이름 변경 등 점수 외 표시 정보가 바뀌었을 때 모든 대결을 버립니다."""
+        self._entries.clear()
+        for entries in self._focus.values():
+            entries.clear()
+        self._wakeup.set()
+
+    def _focus_entries(self, focus_id: int) -> Deque[Entry]:
+        entries = self._focus.get(focus_id)
+        if entries is None:
+            entries = self._focus[focus_id] = deque()
+            if len(self._focus) > self.focus_slots:
+                self._focus.popitem(last=False)
+        else:
+            self._focus.move_to_end(focus_id)
+        return entries
+
+    def _is_fresh(self, entry: Entry) -> bool:
+        matchup, r1, r2 = entry
+        anime1_id = matchup["anime1"]["id"]
+        anime2_id = matchup["anime2"]["id"]
+        if anime1_id not in rating_index or anime2_id not in rating_index:
+            return False
+
+        category = matchup["category"]
+        return (
+            abs(rating_index.get(anime1_id, category) - r1) <= self.max_drift
+            and abs(rating_index.get(anime2_id, category) - r2) <= self.max_drift
+        )
+
+    async def refill(self) -> None:
+        """오래된 대결을 걸러 낸 뒤, 모든 풀의 빈 자리를 한 번의 SELECT로 채웁니다."""
+        targets: Dict[Optional[int], int] = {}
+
+        self._entries = deque(e for e in self._entries if self._is_fresh(e))
+        targets[None] = self.size - len(self._entries)
+        for focus_id, entries in list(self._focus.items()):
+            entries = self._focus[focus_id] = deque(
+                e for e in entries if self._is_fresh(e)
+            )
+            targets[focus_id] = self.focus_size - len(entries)
+
+        # 후보 선정은 메모리 인덱스에서, 이름만 DB에서 읽습니다.
+        sampled = {
+            focus_id: sample_match_ids(n, focus_id)
+            for focus_id, n in targets.items()
+            if n > 0
+        }
+        ids = {i for matches in sampled.values() for a, b, _ in matches for i in (a, b)}
+        if not ids:
+            return
+
+        async with ReadSessionLocal() as db:
+            result = await db.execute(
+                select(Anime.id, Anime.name).where(Anime.id.in_(ids))
+            )
+            names = dict(result.all())
+
+        # 조회하는 동안 삭제되었거나 밀려난 집중 모드 풀은 건너뜁니다.
+        for focus_id, matches in sampled.items():
+            entries = self._entries if focus_id is None else self._focus.get(focus_id)
+            if entries is None:
+                continue
+            for anime1_id, anime2_id, category in matches:
+                if not all(
+                    i in names and i in rating_index for i in (anime1_id, anime2_id)
+                ):
+                    continue
+                matchup = build_matchup(
+                    anime1_id, names[anime1_id], anime2_id, names[anime2_id], category
+                )
+                entries.append(
+                    (
+                        matchup,
+                        rating_index.get(anime1_id, category),
+                        rating_index.get(anime2_id, category),
+                    )
+                )
+
+    def start(self) -> None:
+        self._wakeup.set()  # 시작하자마자 한 번 채웁니다.
+        super().start()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                await self.refill()
+            except Exception as e:
+                print(f"대결 풀 채우기 중 오류 발생: {e}")
+
+
+matchup_pool = MatchupPool(
+    size=settings.MATCH_POOL_SIZE,
+    low_watermark=settings.MATCH_POOL_LOW_WATERMARK,
+    max_drift=settings.MATCH_POOL_MAX_DRIFT,
+    focus_slots=settings.MATCH_POOL_FOCUS_SLOTS,
+    focus_size=settings.MATCH_POOL_FOCUS_SIZE,
+)
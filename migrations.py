@@ -0,0 +1,167 @@
+"""
+경량 스키마 마이그레이션.
+
+Base.metadata.create_all()은 새 테이블만 만들고 기존 테이블에 컬럼/인덱스를
+추가하지 않으므로, 이미 운영 중인 DB 파일(/data/anime_rank.db)을 재생성 없이
+현재 모델에 맞추기 위해 서버 시작 시 실행합니다. 모든 단계는 멱등입니다.
+"""
+from sqlalchemy import inspect, text, Table
+from sqlalchemy.engine import Connection
+
+from config import settings
+from database import Base
+from models import Anime, RATING_CATEGORIES
+
+TOTAL_SCORE_TRIGGERS = (
+    "trg_animes_total_score_insert",
+    "trg_animes_total_score_update",
+)
+
+
+def total_score_sql(prefix: str = "") -> str:
+    """종합 점수 가중 평균 SQL 식 (트리거/일괄 재계산 공용)"""
+    terms = " + ".join(
+        f"{prefix}rating_{cat} * {float(settings.TOTAL_SCORE_WEIGHTS[cat])!r}"
+        for cat in RATING_CATEGORIES
+    )
+    return f"({terms}) / {float(len(RATING_CATEGORIES))!r}"
+
+
+def _add_missing_columns(conn: Connection, table: Table) -> list:
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    added = []
+
+    for column in table.columns:
+        if column.name in existing:
+            continue
+
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+        ddl += column.type.compile(dialect=conn.dialect)
+        if column.default is not None and column.default.is_scalar:
+            ddl += f" NOT NULL DEFAULT {column.default.arg!r}"
+
+        conn.execute(text(ddl))
+        added.append(column.name)
+
+    return added
+
+
+def _fill_null_defaults(conn: Connection, table: Table) -> int:
+    """
+    server_default 없이 만들어진 컬럼에 들어간 NULL을 기본값으로 채웁니다.
+    (NULL version은 compare-and-swap이 항상 실패해 해당 작품 투표가 409가 됩니다.)
+    """
+    columns = [
+        c for c in table.columns if c.default is not None and c.default.is_scalar
+    ]
+    assignments = ", ".join(
+        f"{c.name} = COALESCE({c.name}, {c.default.arg!r})" for c in columns
+    )
+    condition = " OR ".join(f"{c.name} IS NULL" for c in columns)
+    return conn.execute(
+        text(f"UPDATE {table.name} SET {assignments} WHERE {condition}")
+    ).rowcount
+
+
+def _total_score_trigger_ddl() -> dict:
+    rating_columns = ", ".join(f"rating_{cat}" for cat in RATING_CATEGORIES)
+    body = (
+        f"BEGIN UPDATE animes SET total_score = {total_score_sql('NEW.')} "
+        f"WHERE id = NEW.id; END"
+    )
+    insert_name, update_name = TOTAL_SCORE_TRIGGERS
+    return {
+        insert_name: f"CREATE TRIGGER {insert_name} AFTER INSERT ON animes {body}",
+        update_name: (
+            f"CREATE TRIGGER {update_name} "
+            f"AFTER UPDATE OF {rating_columns} ON animes {body}"
+        ),
+    }
+
+
+def _sync_total_score_triggers(conn: Connection) -> bool:
+    """
+    종합 점수 트리거를 현재 가중치로 맞춥니다.
+    트리거 SQL에 가중치가 들어 있으므로, 저장된 SQL과 다르면 가중치가 바뀐 것입니다.
+    기존 트리거의 가중치가 달라 다시 만들었으면 True를 반환합니다.
+    """
+    existing = dict(
+        conn.execute(
+            text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")
+        ).all()
+    )
+
+    changed = False
+    for name, ddl in _total_score_trigger_ddl().items():
+        if existing.get(name) == ddl:
+            continue
+        if name in existing:
+            conn.execute(text(f"DROP TRIGGER {name}"))
+            changed = True
+        conn.execute(text(ddl))
+
+    return changed
+
+
+def recompute_total_scores(conn: Connection) -> None:
+    """total_score 컬럼 일괄 재계산 (한 번의 UPDATE)"""
+    conn.execute(text(f"UPDATE animes SET total_score = {total_score_sql()}"))
+
+
+def backfill_pair_counts(conn: Connection) -> bool:
+    """
+    pair_counts가 비어 있고 투표 로그가 있으면 votes를 쌍별로 집계해 채웁니다
+    (pair_counts 도입 이전 DB). 삭제된 작품의 투표는 제외합니다.
+    채웠으면 True를 반환합니다.
+    """
+    if conn.execute(text("SELECT 1 FROM pair_counts LIMIT 1")).first():
+        return False
+    if not conn.execute(text("SELECT 1 FROM votes LIMIT 1")).first():
+        return False
+
+    # first 기준 결과: anime1이 first면 outcome, 아니면 2 - outcome
+    first_outcome = (
+        "CASE WHEN anime1_id < anime2_id THEN outcome ELSE 2 - outcome END"
+    )
+    conn.execute(
+        text(
+            "INSERT INTO pair_counts "
+            "(category, first_id, second_id, first_wins, second_wins, draws) "
+            "SELECT category, MIN(anime1_id, anime2_id), MAX(anime1_id, anime2_id), "
+            f"SUM({first_outcome} = 2), SUM({first_outcome} = 0), "
+            f"SUM({first_outcome} = 1) "
+            "FROM votes WHERE anime1_id IN (SELECT id FROM animes) "
+            "AND anime2_id IN (SELECT id FROM animes) GROUP BY 1, 2, 3"
+        )
+    )
+    return True
+
+
+def upgrade_schema(conn: Connection) -> None:
+    """
+    create_all() 이후 실행: 누락된 컬럼, 인덱스, 트리거를 추가하고
+    NULL로 남은 기본값 컬럼과 비어 있는 pair_counts를 채웁니다.
+    """
+    table = Anime.__table__
+    added = _add_missing_columns(conn, table)
+
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+    filled = _fill_null_defaults(conn, table)
+    if filled:
+        print(f"마이그레이션: 기본값이 비어 있던 작품 {filled}개를 채웠습니다.")
+
+    weights_changed = _sync_total_score_triggers(conn)
+
+    if "total_score" in added or weights_changed:
+        recompute_total_scores(conn)
+        print("마이그레이션: 현재 가중치로 total_score를 다시 계산했습니다.")
+
+    if backfill_pair_counts(conn):
+        print("마이그레이션: 투표 로그로 pair_counts를 채웠습니다.")
+
+
+def create_schema(conn: Connection) -> None:
+    Base.metadata.create_all(conn)
+    upgrade_schema(conn)
@@ -1,37 +1,161 @@
-# models.py
-from sqlalchemy import Integer, String, Float
+from sqlalchemy import Integer, SmallInteger, String, Float, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from database import Base
 
+# 평가 항목 (rating_<category> 컬럼과 1:1 대응)
+RATING_CATEGORIES = ("story", "visual", "ost", "voice", "char", "fun")
+
+
+def _float_column(default: float) -> Mapped[float]:
+    """
+    DB 기본값(server_default)도 함께 두는 실수 컬럼.
+    create_all로 만든 스키마가 마이그레이션(ADD COLUMN ... NOT NULL DEFAULT)으로
+    추가한 것과 같아지므로, 컬럼을 생략한 INSERT도 양쪽에서 동작합니다.
+    """
+    return mapped_column(Float, default=default, server_default=text(repr(default)))
+
+
+def _int_column(default: int) -> Mapped[int]:
+    """DB 기본값(server_default)도 함께 두는 정수 컬럼 (_float_column 참고)."""
+    return mapped_column(Integer, default=default, server_default=text(repr(default)))
+
 
 class Anime(Base):
     __tablename__ = "animes"
 
+    # 카테고리별 등수/구간 조회와 정렬을 인덱스 범위 스캔으로 처리하기 위한 복합 인덱스.
+    # id를 함께 두어 (점수, id) 순서의 키셋 페이지네이션도 인덱스만으로 처리됩니다.
+    __table_args__ = (
+        tuple(
+            Index(f"ix_animes_{prefix}_{cat}_id", f"{prefix}_{cat}", "id")
+            for prefix in ("rating", "bt")
+            for cat in RATING_CATEGORIES
+        )
+        + (Index("ix_animes_total_score_id", "total_score", "id"),)
+        + (Index("ix_animes_bt_total_id", "bt_total", "id"),)
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, index=True)
 
     # Elo Ratings (기본값 1200.0)
-    rating_story: Mapped[float] = mapped_column(Float, default=1200.0)
-    rating_visual: Mapped[float] = mapped_column(Float, default=1200.0)
-    rating_ost: Mapped[float] = mapped_column(Float, default=1200.0)
-    rating_voice: Mapped[float] = mapped_column(Float, default=1200.0)
-    rating_char: Mapped[float] = mapped_column(Float, default=1200.0)
-    rating_fun: Mapped[float] = mapped_column(Float, default=1200.0)  # 종합적인 재미
+    rating_story: Mapped[float] = _float_column(1200.0)
+    rating_visual: Mapped[float] = _float_column(1200.0)
+    rating_ost: Mapped[float] = _float_column(1200.0)
+    rating_voice: Mapped[float] = _float_column(1200.0)
+    rating_char: Mapped[float] = _float_column(1200.0)
+    rating_fun: Mapped[float] = _float_column(1200.0)  # 종합적인 재미
+
+    # Glicko-2 rating deviation / volatility (RATING_ENGINE="glicko2"일 때만 갱신)
+    rd_story: Mapped[float] = _float_column(350.0)
+    rd_visual: Mapped[float] = _float_column(350.0)
+    rd_ost: Mapped[float] = _float_column(350.0)
+    rd_voice: Mapped[float] = _float_column(350.0)
+    rd_char: Mapped[float] = _float_column(350.0)
+    rd_fun: Mapped[float] = _float_column(350.0)
+    volatility_story: Mapped[float] = _float_column(0.06)
+    volatility_visual: Mapped[float] = _float_column(0.06)
+    volatility_ost: Mapped[float] = _float_column(0.06)
+    volatility_voice: Mapped[float] = _float_column(0.06)
+    volatility_char: Mapped[float] = _float_column(0.06)
+    volatility_fun: Mapped[float] = _float_column(0.06)
+
+    # 가중치(config.TOTAL_SCORE_WEIGHTS)가 적용된 종합 점수
+    # DB 트리거가 rating_* 변경 시 자동 갱신합니다 (migrations.py)
+    total_score: Mapped[float] = _float_column(1200.0)
+
+    # Bradley–Terry(Davidson) 일괄 적합 점수 (bt_refit.py, Elo와 같은 척도)
+    # 투표 순서와 무관한 대안 랭킹이며 bt_total은 total_score와 같은 가중 평균입니다.
+    bt_story: Mapped[float] = _float_column(1200.0)
+    bt_visual: Mapped[float] = _float_column(1200.0)
+    bt_ost: Mapped[float] = _float_column(1200.0)
+    bt_voice: Mapped[float] = _float_column(1200.0)
+    bt_char: Mapped[float] = _float_column(1200.0)
+    bt_fun: Mapped[float] = _float_column(1200.0)
+    bt_total: Mapped[float] = _float_column(1200.0)
 
     # 신뢰도 지표
-    matches_played: Mapped[int] = mapped_column(Integer, default=0)
+    matches_played: Mapped[int] = _int_column(0)
+
+    # 낙관적 동시성 제어용 버전 (점수가 바뀔 때마다 +1, compare-and-swap)
+    version: Mapped[int] = _int_column(0)
 
     # 레거시 데이터 참고용
     original_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
-    @property
-    def total_score(self) -> float:
-        """가중치가 적용된 종합 점수 계산 (읽기 전용 프로퍼티)"""
-        return (
-            self.rating_story * 1.2
-            + self.rating_visual * 1.0
-            + self.rating_ost * 0.8
-            + self.rating_voice * 0.8
-            + self.rating_char * 1.0
-            + self.rating_fun * 1.2
-        ) / 6.0
+
+class Vote(Base):
+    """
+    투표 이벤트 로그 (append-only).
+
+    Elo 파라미터(ELO_K_MAX 등)를 바꾼 뒤 처음부터 다시 계산하거나 점수 변동을
+    감사할 수 있도록, 투표 직전 상태와 결과를 투표와 같은 트랜잭션에 남깁니다.
+    행이 계속 쌓이므로 문자열 없이 정수/실수 컬럼만 사용합니다.
+    """
+
+    __tablename__ = "votes"
+
+    # 작품별 이력을 적용 순서대로 전체 스캔 없이 읽기 위한 (anime_id, id) 인덱스
+    __table_args__ = (
+        Index("ix_votes_anime1_id_id", "anime1_id", "id"),
+        Index("ix_votes_anime2_id_id", "anime2_id", "id"),
+    )
+
+    # 삽입 순서 = 적용 순서 (rowid)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    anime1_id: Mapped[int] = mapped_column(Integer)
+    anime2_id: Mapped[int] = mapped_column(Integer)
+
+    # RATING_CATEGORIES 내 위치
+    category: Mapped[int] = mapped_column(SmallInteger)
+    # anime1 기준 실제 점수 x 2 (2: 1 승, 1: 무승부, 0: 2 승)
+    outcome: Mapped[int] = mapped_column(SmallInteger)
+
+    # 투표 직전 상태 (해당 카테고리 점수, 매치 수)
+    rating1_before: Mapped[float] = mapped_column(Float)
+    rating2_before: Mapped[float] = mapped_column(Float)
+    matches1_before: Mapped[int] = mapped_column(Integer)
+    matches2_before: Mapped[int] = mapped_column(Integer)
+
+    # Unix epoch (밀리초)
+    created_at: Mapped[int] = mapped_column(Integer)
+
+
+class RatingPeriod(Base):
+    """
+    Glicko-2 rating period 실행 기록 (append-only).
+    가장 최근 행의 last_vote_id 이후의 투표가 다음 period에 반영됩니다.
+    """
+
+    __tablename__ = "rating_periods"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # 이 행을 기록한 엔진 (config.RATING_ENGINE)
+    engine: Mapped[str] = mapped_column(String)
+    # 이 period까지 반영한 마지막 votes.id
+    last_vote_id: Mapped[int] = mapped_column(Integer)
+    # 반영한 투표 수 (0이면 서버 시작/엔진 전환 시점의 기준점)
+    votes: Mapped[int] = mapped_column(Integer)
+    # Unix epoch (밀리초)
+    created_at: Mapped[int] = mapped_column(Integer)
+
+
+class PairCount(Base):
+    """
+    대결 쌍별 누적 결과. (카테고리, 작은 id, 큰 id)마다 1행이며,
+    투표 로그(votes)와 같은 트랜잭션에서 UPSERT로 증가시킵니다.
+    삭제된 작품의 쌍은 지우므로, 남아 있는 작품끼리의 votes 쌍별 집계와 같습니다
+    (pairwise.py).
+    """
+
+    __tablename__ = "pair_counts"
+
+    # RATING_CATEGORIES 내 위치
+    category: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    # first_id < second_id
+    first_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    second_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    first_wins: Mapped[int] = mapped_column(Integer, default=0)
+    second_wins: Mapped[int] = mapped_column(Integer, default=0)
+    draws: Mapped[int] = mapped_column(Integer, default=0)
@@ -0,0 +1,219 @@
+"""
+대결 쌍별 승/무/패 집계 (희소 행렬).
+
+덮어쓰이는 점수와 달리 (카테고리, 작품 쌍)마다 실제 결과 수를 보존합니다.
+DB(pair_counts)는 투표 로그와 같은 트랜잭션에서 UPSERT로 증가시키고,
+메모리(pairwise_store)는 rating_index와 같은 시점에 갱신합니다.
+상대 전적 조회는 O(1)이며, 일괄 계산(Bradley–Terry 등)용으로
+COO(bradley_terry.PairCounts) / CSR(PairMatrix) 배열로 내보냅니다.
+"""
+from itertools import chain
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bradley_terry import PairCounts
+from models import PairCount, RATING_CATEGORIES
+
+# 투표 로그 outcome(anime1 기준 점수 x 2, first 기준으로 뒤집은 값) -> 집계 위치
+# [first 승, second 승, 무승부]
+_SLOTS = (1, 2, 0)
+_COUNT_COLUMNS = ("first_wins", "second_wins", "draws")
+
+_pair_counts = PairCount.__table__
+_insert = sqlite_insert(_pair_counts)
+PAIR_COUNT_UPSERT = _insert.on_conflict_do_update(
+    index_elements=["category", "first_id", "second_id"],
+    set_={
+        col: _pair_counts.c[col] + _insert.excluded[col] for col in _COUNT_COLUMNS
+    },
+)
+
+
+def _oriented(anime1_id: int, anime2_id: int, outcome: int) -> Tuple[int, int, int]:
+    """(first_id, second_id, 집계 위치). first_id < second_id"""
+    if anime1_id < anime2_id:
+        return anime1_id, anime2_id, _SLOTS[outcome]
+    return anime2_id, anime1_id, _SLOTS[2 - outcome]
+
+
+def pair_count_rows(log_rows: Iterable[Dict[str, Any]]) -> List[Dict[str, int]]:
+    """투표 로그 행(services.vote_log_row)들을 PAIR_COUNT_UPSERT 파라미터로 묶습니다."""
+    totals: Dict[Tuple[int, int, int], List[int]] = {}
+    for row in log_rows:
+        first, second, slot = _oriented(
+            row["anime1_id"], row["anime2_id"], row["outcome"]
+        )
+        totals.setdefault((row["category"], first, second), [0, 0, 0])[slot] += 1
+
+    return [
+        {
+            "category": category,
+            "first_id": first,
+            "second_id": second,
+            **dict(zip(_COUNT_COLUMNS, counts)),
+        }
+        for (category, first, second), counts in totals.items()
+    ]
+
+
+class PairMatrix(NamedTuple):
+    """
+    한 카테고리의 대칭 CSR 행렬. 행/열은 ids(정렬된 작품 id) 내 위치이고,
+    (i, j) 값은 i 기준 j에 대한 승/무/패 수입니다.
+    """
+
+    ids: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    wins: np.ndarray
+    draws: np.ndarray
+    losses: np.ndarray
+
+    def to_scipy(self, values: str = "wins"):
+        """scipy.sparse.csr_matrix로 변환합니다 (SciPy는 필요할 때만 import)."""
+        from scipy.sparse import csr_matrix
+
+        n = len(self.ids)
+        return csr_matrix(
+            (getattr(self, values), self.indices, self.indptr), shape=(n, n)
+        )
+
+
+class PairwiseStore:
+    """
+    카테고리별 {(first_id, second_id): [first 승, second 승, 무승부]} 해시 맵.
+    투표 반영과 상대 전적 조회가 O(1)입니다.
+    반영할 때마다 version을 올리므로, 일괄 계산 작업은 이 값으로 변경 여부를 확인합니다.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._counts: List[Dict[Tuple[int, int], List[int]]] = [
+            {} for _ in RATING_CATEGORIES
+        ]
+        # 카테고리별 pairs() 결과 (해당 카테고리에 투표가 반영되면 버립니다)
+        self._arrays: List[Optional[PairCounts]] = [None] * len(RATING_CATEGORIES)
+
+    def __len__(self) -> int:
+        return sum(len(counts) for counts in self._counts)
+
+    def clear(self) -> None:
+        self._counts = [{} for _ in RATING_CATEGORIES]
+        self._arrays = [None] * len(RATING_CATEGORIES)
+        self.version += 1
+
+    async def load(self, db: AsyncSession) -> None:
+        """DB의 모든 쌍을 읽습니다 (서버 시작 시 1회)."""
+        result = await db.execute(
+            select(
+                PairCount.category,
+                PairCount.first_id,
+                PairCount.second_id,
+                PairCount.first_wins,
+                PairCount.second_wins,
+                PairCount.draws,
+            )
+        )
+        self.clear()
+        for category, first, second, *counts in result:
+            self._counts[category][(first, second)] = counts
+
+    def record(self, row: Dict[str, Any]) -> None:
+        """투표 로그 1행(services.vote_log_row)을 반영합니다."""
+        first, second, slot = _oriented(
+            row["anime1_id"], row["anime2_id"], row["outcome"]
+        )
+        category = row["category"]
+        self._counts[category].setdefault((first, second), [0, 0, 0])[slot] += 1
+        self._arrays[category] = None
+        self.version += 1
+
+    def remove(self, anime_id: int) -> None:
+        """삭제된 작품이 포함된 쌍을 모두 지웁니다 (쌍 수에 비례, 작품 삭제 시에만)."""
+        for c, counts in enumerate(self._counts):
+            stale = [pair for pair in counts if anime_id in pair]
+            for pair in stale:
+                del counts[pair]
+            if stale:
+                self._arrays[c] = None
+        self.version += 1
+
+    def head_to_head(
+        self, anime_a: int, anime_b: int, category: str
+    ) -> Tuple[int, int, int]:
+        """anime_a 기준 (승, 무승부, 패). O(1)"""
+        counts = self._counts[RATING_CATEGORIES.index(category)].get(
+            (min(anime_a, anime_b), max(anime_a, anime_b))
+        )
+        if counts is None:
+            return 0, 0, 0
+        first_wins, second_wins, draws = counts
+        if anime_a < anime_b:
+            return first_wins, draws, second_wins
+        return second_wins, draws, first_wins
+
+    def pairs(self, category: str) -> PairCounts:
+        """
+        COO 배열 ((first_id, second_id) 오름차순).
+        카테고리에 새 투표가 없으면 이전에 만든 배열을 그대로 반환하므로 수정하지 마세요.
+        """
+        c = RATING_CATEGORIES.index(category)
+        if self._arrays[c] is None:
+            self._arrays[c] = self._to_arrays(self._counts[c])
+        return self._arrays[c]
+
+    @staticmethod
+    def _to_arrays(counts: Dict[Tuple[int, int], List[int]]) -> PairCounts:
+        if not counts:
+            return PairCounts.empty()
+
+        size = len(counts)
+        keys = np.fromiter(
+            chain.from_iterable(counts), dtype=np.int64, count=2 * size
+        ).reshape(size, 2)
+        values = np.fromiter(
+            chain.from_iterable(counts.values()), dtype=np.int64, count=3 * size
+        ).reshape(size, 3)
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        keys, values = keys[order], values[order]
+        return PairCounts(
+            keys[:, 0], keys[:, 1], values[:, 0], values[:, 1], values[:, 2]
+        )
+
+    def matrix(self, category: str, ids: Optional[np.ndarray] = None) -> PairMatrix:
+        """
+        대칭 CSR 행렬. ids(정렬된 작품 id)를 주면 그 순서로 행/열을 만들고
+        목록에 없는 작품이 포함된 쌍은 제외합니다. 없으면 대결이 있었던 작품만 씁니다.
+        """
+        pairs = self.pairs(category)
+        if ids is None:
+            ids = np.union1d(pairs.first, pairs.second)
+        else:
+            ids = np.asarray(ids, dtype=np.int64)
+            keep = np.isin(pairs.first, ids) & np.isin(pairs.second, ids)
+            pairs = PairCounts(*(column[keep] for column in pairs))
+
+        first = np.searchsorted(ids, pairs.first)
+        second = np.searchsorted(ids, pairs.second)
+        rows = np.concatenate([first, second])
+        cols = np.concatenate([second, first])
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(ids)), out=indptr[1:])
+
+        return PairMatrix(
+            ids,
+            indptr,
+            cols[order],
+            np.concatenate([pairs.first_wins, pairs.second_wins])[order],
+            np.concatenate([pairs.draws, pairs.draws])[order],
+            np.concatenate([pairs.second_wins, pairs.first_wins])[order],
+        )
+
+
+# 프로세스 전역 저장소 (uvicorn 단일 워커 기준)
+pairwise_store = PairwiseStore()
@@ -0,0 +1,58 @@
+import asyncio
+import secrets
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from rating_index import rating_index
+
+# 재시작 후 version이 0부터 다시 시작해도 이전 ETag와 겹치지 않도록 하는 토큰
+_BOOT_ID = secrets.token_hex(4)
+
+
+class RankingCache:
+    """
+    랭킹 스냅샷 read-through 캐시.
+
+    항목은 rating_index.version 기준으로 저장되며, version이 바뀌면 전부 버립니다.
+    같은 키를 동시에 요청하면 계산 중인 Task를 공유하므로,
+    한 version 안에서 키마다 최대 한 번만 계산됩니다.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._version = -1
+        self._entries: "OrderedDict[Hashable, asyncio.Future]" = OrderedDict()
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{_BOOT_ID}-{rating_index.version}"'
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if self._version != rating_index.version:
+            self._entries.clear()
+            self._version = rating_index.version
+
+        future = self._entries.get(key)
+        if future is None:
+            future = asyncio.ensure_future(compute())
+            self._entries[key] = future
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        try:
+            # 요청이 취소되어도 공유 중인 계산은 계속되도록 보호
+            return await asyncio.shield(future)
+        except Exception:
+            if self._entries.get(key) is future:
+                del self._entries[key]
+            raise
+
+
+ranking_cache = RankingCache()
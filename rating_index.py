@@ -0,0 +1,352 @@
+import bisect
+import math
+import random
+from typing import Dict, List, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from models import Anime, RATING_CATEGORIES
+
+
+class FenwickSampler:
+    """
+    위치별 가중치의 누적합 트리 (Fenwick tree).
+    가중치 변경과 가중치에 비례한 추출이 모두 O(log n)입니다.
+    위치는 끝에 추가하고, 삭제는 swap-pop(pop 후 set)으로 관리합니다.
+    """
+
+    def __init__(self) -> None:
+        self._weights: List[float] = []
+        self._tree: List[float] = [0.0]  # 1-based
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def _prefix(self, i: int) -> float:
+        total = 0.0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def total(self) -> float:
+        return self._prefix(len(self._weights))
+
+    def append(self, weight: float) -> None:
+        self._weights.append(weight)
+        i = len(self._weights)
+        # tree[i]는 (i - lowbit(i), i] 구간의 합
+        node = weight + self._prefix(i - 1) - self._prefix(i - (i & -i))
+        if i < len(self._tree):
+            self._tree[i] = node
+        else:
+            self._tree.append(node)
+
+    def set(self, pos: int, weight: float) -> None:
+        delta = weight - self._weights[pos]
+        self._weights[pos] = weight
+        i = pos + 1
+        while i <= len(self._weights):
+            self._tree[i] += delta
+            i += i & -i
+
+    def pop(self) -> float:
+        """마지막 위치를 제거하고 그 가중치를 반환합니다."""
+        weight = self._weights[-1]
+        self.set(len(self._weights) - 1, 0.0)
+        self._weights.pop()
+        return weight
+
+    def sample(self) -> Optional[int]:
+        """가중치에 비례해 위치 하나를 뽑습니다. 가중치 합이 0이면 None."""
+        n = len(self._weights)
+        total = self.total()
+        if n == 0 or total <= 0.0:
+            return None
+
+        target = random.random() * total
+        pos = 0
+        step = 1 << (n.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= n and self._tree[nxt] <= target:
+                target -= self._tree[nxt]
+                pos = nxt
+            step >>= 1
+        # 부동소수점 오차로 끝을 넘지 않도록 보정
+        return min(pos, n - 1)
+
+
+def rating_uncertainty(matches_played: int) -> float:
+    """
+    점수 불확실도의 추정치. m번의 대결로 정한 점수의 표준오차처럼 1/sqrt(m+1)로 줄어듭니다.
+    """
+    return 1.0 / math.sqrt(matches_played + 1)
+
+
+class RatingIndex:
+    """
+    카테고리별 점수를 정렬된 배열로 프로세스 메모리에 유지하는 순위 인덱스.
+    bisect를 이용해 등수/퍼센트 조회와 매치메이킹 후보 선정을
+    DB 왕복 없이 O(log n)에 처리합니다.
+
+    투표, 추가, 삭제, 정규화 시 DB 커밋 직후 함께 갱신해야 합니다.
+    모든 갱신은 version을 올리며, 랭킹 캐시는 이 값으로 무효화됩니다.
+    """
+
+    def __init__(self) -> None:
+        # 점수/목록이 바뀔 때마다 단조 증가하는 "ratings version"
+        self.version = 0
+
+        # 카테고리별 정렬된 점수 배열과 같은 위치의 anime id 배열
+        self._sorted: Dict[str, List[float]] = {c: [] for c in RATING_CATEGORIES}
+        self._sorted_ids: Dict[str, List[int]] = {c: [] for c in RATING_CATEGORIES}
+        self._ratings: Dict[int, Dict[str, float]] = {}
+        self._matches: Dict[int, int] = {}
+
+        # 카테고리별 점수 합계 (평균 드리프트를 O(1)로 확인)
+        self._sums: Dict[str, float] = {c: 0.0 for c in RATING_CATEGORIES}
+
+        # 균등 추출용 id 배열 (삭제는 swap-pop으로 O(1))
+        self._ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+
+        # 불확실도 가중 추출용 트리 (_ids와 같은 위치, 투표마다 O(log n) 갱신)
+        self._uncertainty = FenwickSampler()
+
+    def __len__(self) -> int:
+        return len(self._ratings)
+
+    def __contains__(self, anime_id: int) -> bool:
+        return anime_id in self._ratings
+
+    def bump_version(self) -> None:
+        """점수 외 표시 정보(이름 등)가 바뀌었을 때 캐시 무효화용으로 호출합니다."""
+        self.version += 1
+
+    def clear(self) -> None:
+        self.version += 1
+        for cat in RATING_CATEGORIES:
+            self._sorted[cat] = []
+            self._sorted_ids[cat] = []
+            self._sums[cat] = 0.0
+        self._ratings = {}
+        self._matches = {}
+        self._ids = []
+        self._positions = {}
+        self._uncertainty = FenwickSampler()
+
+    async def load(self, db: AsyncSession) -> None:
+        """DB의 모든 점수를 읽어 인덱스를 재구성합니다 (서버 시작 시 1회)."""
+        columns = [getattr(Anime, f"rating_{cat}") for cat in RATING_CATEGORIES]
+        result = await db.execute(select(Anime.id, Anime.matches_played, *columns))
+
+        self.clear()
+        for row in result:
+            self._matches[row[0]] = row[1]
+            self._ratings[row[0]] = dict(zip(RATING_CATEGORIES, row[2:]))
+
+        self._ids = list(self._ratings)
+        self._positions = {anime_id: i for i, anime_id in enumerate(self._ids)}
+        for anime_id in self._ids:
+            self._uncertainty.append(rating_uncertainty(self._matches[anime_id]))
+
+        for cat in RATING_CATEGORIES:
+            self._rebuild(cat)
+
+    def get(self, anime_id: int, category: str) -> float:
+        return self._ratings[anime_id][category]
+
+    def matches(self, anime_id: int) -> int:
+        return self._matches[anime_id]
+
+    def uncertainty(self, anime_id: int) -> float:
+        return rating_uncertainty(self._matches[anime_id])
+
+    def snapshot(self, anime_id: int) -> Dict[str, Any]:
+        """DB에 그대로 기록할 수 있는 형태의 현재 상태 (id, rating_*, matches_played)"""
+        row: Dict[str, Any] = {"id": anime_id}
+        for cat, score in self._ratings[anime_id].items():
+            row[f"rating_{cat}"] = score
+        row["matches_played"] = self._matches[anime_id]
+        return row
+
+    def add(self, anime: Anime) -> None:
+        """새로 추가된 애니메이션의 점수를 인덱스에 삽입합니다."""
+        if anime.id in self._ratings:
+            self.remove(anime.id)
+
+        ratings = {cat: getattr(anime, f"rating_{cat}") for cat in RATING_CATEGORIES}
+        self._ratings[anime.id] = ratings
+        self._matches[anime.id] = anime.matches_played or 0
+        for cat, score in ratings.items():
+            self._insert(cat, anime.id, score)
+            self._sums[cat] += score
+
+        self._positions[anime.id] = len(self._ids)
+        self._ids.append(anime.id)
+        self._uncertainty.append(rating_uncertainty(self._matches[anime.id]))
+        self.version += 1
+
+    def remove(self, anime_id: int) -> None:
+        """삭제된 애니메이션의 점수를 인덱스에서 제거합니다."""
+        ratings = self._ratings.pop(anime_id, None)
+        if ratings is None:
+            return
+        del self._matches[anime_id]
+
+        for cat, score in ratings.items():
+            self._discard(cat, anime_id, score)
+            self._sums[cat] -= score
+
+        pos = self._positions.pop(anime_id)
+        last_id = self._ids.pop()
+        last_weight = self._uncertainty.pop()
+        if last_id != anime_id:
+            self._ids[pos] = last_id
+            self._positions[last_id] = pos
+            self._uncertainty.set(pos, last_weight)
+        self.version += 1
+
+    def update(self, anime_id: int, category: str, new_score: float) -> None:
+        """투표로 변경된 단일 카테고리 점수를 반영합니다."""
+        ratings = self._ratings.get(anime_id)
+        if ratings is None:
+            return
+
+        self._discard(category, anime_id, ratings[category])
+        self._insert(category, anime_id, new_score)
+        self._sums[category] += new_score - ratings[category]
+        ratings[category] = new_score
+        self.version += 1
+
+    def record_match(self, anime_id: int) -> None:
+        if anime_id in self._matches:
+            self._matches[anime_id] += 1
+            self._uncertainty.set(
+                self._positions[anime_id], self.uncertainty(anime_id)
+            )
+
+    def shift(self, category: str, delta: float) -> None:
+        """
+        카테고리 전체 점수를 delta만큼 이동합니다 (정규화).
+        모든 점수가 같은 값만큼 이동하므로 정렬 순서는 유지됩니다.
+        """
+        self._sorted[category] = [s + delta for s in self._sorted[category]]
+        for ratings in self._ratings.values():
+            ratings[category] = ratings[category] + delta
+        # 누적 오차를 없애기 위해 어차피 O(n)인 이 시점에 합계를 다시 계산합니다.
+        self._sums[category] = math.fsum(self._sorted[category])
+        self.version += 1
+
+    def replace(self, category: str, scores: Dict[int, float]) -> None:
+        """
+        여러 작품의 점수를 한 번에 바꿉니다 (Glicko-2 rating period).
+        하나씩 update()하면 O(n²)이므로 정렬 배열을 통째로 다시 만듭니다. O(n log n)
+        """
+        for anime_id, score in scores.items():
+            ratings = self._ratings.get(anime_id)
+            if ratings is not None:
+                ratings[category] = score
+        self._rebuild(category)
+        self.version += 1
+
+    def mean(self, category: str) -> float:
+        """카테고리 평균 점수. O(1)"""
+        if not self._ratings:
+            return 0.0
+        return self._sums[category] / len(self._ratings)
+
+    def rank_info(self, category: str, score: float) -> Dict[str, Any]:
+        """
+        점수의 등수와 상위 퍼센트를 계산합니다.
+        (Standard Competition Ranking: 1 2 2 4...)
+        """
+        scores = self._sorted[category]
+        total_count = len(scores) or 1  # 0 나누기 방지
+
+        higher_rank_count = len(scores) - bisect.bisect_right(scores, score)
+        current_rank = higher_rank_count + 1
+        percentile = (current_rank / total_count) * 100.0
+
+        return {
+            "rank": current_rank,
+            "total": total_count,
+            "top_percent": round(percentile, 1),
+        }
+
+    # --- Matchmaking ---
+
+    def random_id(self) -> Optional[int]:
+        """전체에서 균등하게 하나를 뽑습니다. O(1)"""
+        if not self._ids:
+            return None
+        return random.choice(self._ids)
+
+    def random_uncertain_id(self) -> Optional[int]:
+        """불확실도(rating_uncertainty)에 비례해 하나를 뽑습니다. O(log n)"""
+        pos = self._uncertainty.sample()
+        return None if pos is None else self._ids[pos]
+
+    def random_other(self, anime_id: int) -> Optional[int]:
+        """자기 자신을 제외한 전체에서 균등하게 하나를 뽑습니다. O(1)"""
+        return self._pick_excluding(self._ids, 0, len(self._ids), anime_id)
+
+    def random_rival(
+        self, anime_id: int, category: str, score_range: float
+    ) -> Optional[int]:
+        """
+        category 점수가 ±score_range 이내인 상대를 균등하게 뽑습니다. O(log n)
+        후보가 없으면 None을 반환합니다.
+        """
+        ratings = self._ratings.get(anime_id)
+        if ratings is None:
+            return None
+
+        scores = self._sorted[category]
+        target = ratings[category]
+        lo = bisect.bisect_left(scores, target - score_range)
+        hi = bisect.bisect_right(scores, target + score_range)
+        return self._pick_excluding(self._sorted_ids[category], lo, hi, anime_id)
+
+    @staticmethod
+    def _pick_excluding(
+        ids: List[int], lo: int, hi: int, anime_id: int
+    ) -> Optional[int]:
+        # [lo, hi-1) 구간에서 뽑고, 자기 자신이 뽑히면 마지막 칸(hi-1)으로 대체합니다.
+        # 자기 자신이 구간 안에 있으면 나머지 후보들 사이에서 균등 추출이 됩니다.
+        if hi - lo < 2:
+            if hi - lo == 1 and ids[lo] != anime_id:
+                return ids[lo]
+            return None
+
+        picked = ids[random.randrange(lo, hi - 1)]
+        if picked == anime_id:
+            picked = ids[hi - 1]
+        return picked
+
+    def _rebuild(self, category: str) -> None:
+        pairs = sorted((r[category], anime_id) for anime_id, r in self._ratings.items())
+        self._sorted[category] = [score for score, _ in pairs]
+        self._sorted_ids[category] = [anime_id for _, anime_id in pairs]
+        self._sums[category] = math.fsum(self._sorted[category])
+
+    def _insert(self, category: str, anime_id: int, score: float) -> None:
+        i = bisect.bisect_right(self._sorted[category], score)
+        self._sorted[category].insert(i, score)
+        self._sorted_ids[category].insert(i, anime_id)
+
+    def _discard(self, category: str, anime_id: int, score: float) -> None:
+        scores = self._sorted[category]
+        ids = self._sorted_ids[category]
+        i = bisect.bisect_left(scores, score)
+        while i < len(scores) and scores[i] == score:
+            if ids[i] == anime_id:
+                del scores[i]
+                del ids[i]
+                return
+            i += 1
+
+
+# 프로세스 전역 인덱스 (uvicorn 단일 워커 기준)
+rating_index = RatingIndex()
@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import func as sql_func
+
+from background import BackgroundTask
+from config import settings
+from database import AsyncSessionLocal
+from models import Anime, Vote, RatingPeriod, RATING_CATEGORIES
+from rating_index import rating_index
+from services import anime_bulk_update, get_rating_engine, rating_write_lock
+
+RATING_PERIOD_STATEMENT = anime_bulk_update(
+    (
+        f"{prefix}_{cat}"
+        for prefix in ("rating", "rd", "volatility")
+        for cat in RATING_CATEGORIES
+    ),
+    bump_version=True,
+)
+
+
+async def sync_rating_period_cursor(db: AsyncSession) -> None:
+    """
+    서버 시작 시 rating period 기준점을 맞춥니다.
+    기록이 없거나 마지막 기록이 다른 엔진의 것이면, 지금까지의 투표는 이미
+    점수에 반영된 것으로 보고 최신 투표 id에 기준점(votes=0)을 남깁니다.
+    (엔진을 바꿔도 과거 투표를 두 번 반영하지 않습니다.)
+    """
+    engine_name = settings.RATING_ENGINE
+    get_rating_engine()  # 알 수 없는 엔진이면 시작 시점에 실패
+
+    last_engine = await db.scalar(
+        select(RatingPeriod.engine).order_by(RatingPeriod.id.desc()).limit(1)
+    )
+    if last_engine == engine_name:
+        return
+
+    last_vote_id = await db.scalar(select(sql_func.coalesce(sql_func.max(Vote.id), 0)))
+    db.add(
+        RatingPeriod(
+            engine=engine_name,
+            last_vote_id=last_vote_id,
+            votes=0,
+            created_at=int(time.time() * 1000),
+        )
+    )
+    await db.commit()
+
+
+async def run_rating_period(db_factory) -> int:
+    """
+    [백그라운드 작업] Glicko-2 rating period
+    마지막 period 이후의 투표를 카테고리별로 모든 작품에 한 번에 반영하고
+    (대결이 없던 작품은 rd만 증가), 반영한 투표 수를 반환합니다.
+    새 투표가 없으면 period를 건너뜁니다.
+    """
+    engine = get_rating_engine()
+    if not engine.periodic:
+        return 0
+
+    n_cats = len(RATING_CATEGORIES)
+    columns = [
+        getattr(Anime, f"{prefix}_{cat}")
+        for prefix in ("rating", "rd", "volatility")
+        for cat in RATING_CATEGORIES
+    ]
+
+    async with rating_write_lock, db_factory() as db:
+        last_vote_id = await db.scalar(
+            select(RatingPeriod.last_vote_id).order_by(RatingPeriod.id.desc()).limit(1)
+        )
+        result = await db.execute(
+            select(
+                Vote.id, Vote.anime1_id, Vote.anime2_id, Vote.category, Vote.outcome
+            )
+            .where(Vote.id > (last_vote_id or 0))
+            .order_by(Vote.id)
+        )
+        votes = np.array(result.all(), dtype=np.int64).reshape(-1, 5)
+        if not len(votes):
+            return 0
+
+        result = await db.execute(select(Anime.id, *columns).order_by(Anime.id))
+        rows = result.all()
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        state = np.array([row[1:] for row in rows], dtype=np.float64)
+        state = state.reshape(len(rows), 3 * n_cats)
+
+        # 삭제된 작품이 포함된 투표는 건너뜁니다.
+        valid = np.isin(votes[:, 1], ids) & np.isin(votes[:, 2], ids)
+        pos_a = np.searchsorted(ids, votes[:, 1])
+        pos_b = np.searchsorted(ids, votes[:, 2])
+
+        new_state = state.copy()
+        for c in range(n_cats):
+            played = valid & (votes[:, 3] == c)
+            cols = [c, n_cats + c, 2 * n_cats + c]
+            rating, rd, volatility = engine.rate_period(
+                *(state[:, col] for col in cols),
+                pos_a[played],
+                pos_b[played],
+                votes[played, 4] / 2.0,
+            )
+            new_state[:, cols[0]], new_state[:, cols[1]] = rating, rd
+            new_state[:, cols[2]] = volatility
+
+        if rows:
+            names = [col.key for col in columns]
+            await db.execute(
+                RATING_PERIOD_STATEMENT,
+                [
+                    {"b_id": anime_id, **dict(zip(names, values))}
+                    for anime_id, values in zip(ids.tolist(), new_state.tolist())
+                ],
+            )
+        db.add(
+            RatingPeriod(
+                engine=settings.RATING_ENGINE,
+                last_vote_id=int(votes[-1, 0]),
+                votes=len(votes),
+                created_at=int(time.time() * 1000),
+            )
+        )
+        await db.commit()
+
+        # 락을 쥔 채로 반영해 투표 큐 flush가 이전 점수를 덮어쓰지 않도록 합니다.
+        for c, cat in enumerate(RATING_CATEGORIES):
+            rating_index.replace(cat, dict(zip(ids.tolist(), new_state[:, c].tolist())))
+        return len(votes)
+
+
+class RatingPeriodRunner(BackgroundTask):
+    """
+    periodic 엔진(RATING_ENGINE="glicko2")의 rating period를 interval초마다 실행합니다.
+    투표 요청은 로그만 남기므로, 점수 계산은 모두 이 작업에서 일괄 처리됩니다.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+
+    async def run_once(self) -> int:
+        try:
+            return await run_rating_period(AsyncSessionLocal)
+        except Exception as e:
+            # 기준점(rating_periods)이 그대로이므로 다음 period에서 다시 반영됩니다.
+            print(f"rating period 계산 중 오류 발생: {e}")
+            return 0
+
+    async def stop(self) -> bool:
+        """주기 실행을 멈추고 남은 투표를 반영합니다 (서버 종료 시)."""
+        if not await super().stop():
+            return False
+        await self.run_once()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+
+rating_period_runner = RatingPeriodRunner(interval=settings.GLICKO_PERIOD_SECONDS)
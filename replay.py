@@ -0,0 +1,426 @@
+"""
+투표 로그(votes) 오프라인 재계산 (replay).
+
+votes 테이블 전체를 NumPy 배열로 읽어 services.calculate_elo_update(_batch)로
+처음부터 다시 계산하고,
+여섯 개 카테고리 점수와 matches_played를 재구성합니다.
+ELO_K_MAX / ELO_K_MIN / ELO_DECAY_FACTOR를 바꿔 가며 결과를 비교하는 용도입니다.
+
+    python replay.py [--k-max 60] [--k-min 24] [--decay 100] [--write]
+
+--write는 결과를 animes 테이블에 기록합니다. 서버의 메모리 인덱스는 시작 시에만
+DB를 읽으므로, 서버를 멈춘 상태에서 실행한 뒤 재시작해야 합니다.
+
+계산 방식
+- 세대(generation) 배치: 각 투표의 세대를 "두 작품이 직전에 참여한 투표의 세대 중
+  큰 값 + 1"로 매기면, 같은 세대의 투표들은 서로 다른 작품만 다루므로 한 번의
+  벡터 연산으로 적용해도 로그 순서대로 하나씩 적용한 결과와 같습니다.
+- 시작 상태: 작품(또는 작품/카테고리)이 로그에 처음 등장할 때 기록된 투표 직전
+  점수/매치 수를 사용하고, 로그에 없는 값은 현재 DB 값을 그대로 둡니다.
+  그 밖의 행은 투표 직전 값을 읽지 않습니다.
+- 정규화(normalize_scores_task)도 세대마다 같은 기준으로 흉내 내어, 처음 등장하는
+  작품의 기록 점수와 재계산 점수의 기준점(평균)이 어긋나지 않게 합니다.
+  따라서 실제 DB 점수와는 정규화 임계값 정도의 차이가 날 수 있습니다.
+"""
+import argparse
+import math
+import sqlite3
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from models import RATING_CATEGORIES
+from services import calculate_elo_update, calculate_elo_update_batch
+
+N_CATEGORIES = len(RATING_CATEGORIES)
+
+# 이보다 작은 세대는 NumPy 호출 오버헤드가 더 크므로 파이썬 스칼라 연산으로 처리
+SCALAR_GENERATION_SIZE = 8
+
+# 한 행을 정수 하나로 묶어 읽습니다 (파이썬 튜플 생성 비용 절감).
+# anime id 24비트 x 2 | category 3비트 | outcome 2비트
+# 로그의 작품 id가 ID_BITS에 들어가지 않으면 열을 그대로 읽습니다 (VoteLog.read).
+ID_BITS = 24
+PACKED_VOTE = (
+    f"anime1_id | (anime2_id << {ID_BITS}) | (category << {2 * ID_BITS}) "
+    f"| (outcome << {2 * ID_BITS + 3})"
+)
+UNPACKED_VOTE = "anime1_id, anime2_id, category, outcome"
+
+
+class VoteLog:
+    """
+    votes 테이블을 열 단위 NumPy 배열로 담은 것 (id 순서).
+    투표 직전 값(before)은 첫 등장 행(seed_positions)에 대해서만 읽어 둡니다.
+    """
+
+    def __init__(
+        self,
+        vote_ids: np.ndarray,
+        anime1: np.ndarray,
+        anime2: np.ndarray,
+        category: np.ndarray,
+        outcome: np.ndarray,
+        seed_positions: np.ndarray,
+        seed_values: np.ndarray,
+    ) -> None:
+        self.vote_ids = vote_ids
+        self.anime1 = anime1
+        self.anime2 = anime2
+        self.category = category
+        self.outcome = outcome  # anime1 기준 실제 점수 (1.0 / 0.5 / 0.0)
+        # seed_values[i] = (rating1, rating2, matches1, matches2) of seed_positions[i]
+        self.seed_positions = seed_positions
+        self.seed_values = seed_values
+
+    def __len__(self) -> int:
+        return len(self.vote_ids)
+
+    @classmethod
+    def read(cls, conn: sqlite3.Connection, chunk_size: int = 500_000) -> "VoteLog":
+        """
+        id 키셋으로 chunk_size행씩 나눠 읽습니다.
+        청크마다 읽기 트랜잭션이 끝나므로 운영 중인 DB에서도 쓰기를 오래 막지 않습니다.
+        """
+        # 마지막 투표 id와 최대 작품 id를 함께 읽어, 그 시점까지의 로그만 재계산합니다.
+        # (각 MAX는 (anime_id, id) 인덱스 / 기본 키로 O(log n))
+        last_vote_id, max_anime_id = conn.execute(
+            "SELECT (SELECT MAX(id) FROM votes), MAX("
+            "(SELECT MAX(anime1_id) FROM votes), (SELECT MAX(anime2_id) FROM votes))"
+        ).fetchone()
+        packed_read = (max_anime_id or 0) < (1 << ID_BITS)
+        if packed_read:
+            columns = PACKED_VOTE
+            fields = [("packed", np.int64)]
+        else:
+            columns = UNPACKED_VOTE
+            fields = [(name, np.int64) for name in UNPACKED_VOTE.split(", ")]
+        dtype = np.dtype([("id", np.int64)] + fields)
+
+        chunks = []
+        last_id = 0
+        while last_id < (last_vote_id or 0):
+            cursor = conn.execute(
+                f"SELECT id, {columns} FROM votes WHERE id > ? AND id <= ? "
+                "ORDER BY id LIMIT ?",
+                (last_id, last_vote_id, chunk_size),
+            )
+            chunk = np.fromiter(cursor, dtype=dtype)
+            if not len(chunk):
+                break
+            chunks.append(chunk)
+            last_id = int(chunk["id"][-1])
+
+        rows = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+        if packed_read:
+            packed = rows["packed"]
+            id_mask = (1 << ID_BITS) - 1
+            anime1 = packed & id_mask
+            anime2 = (packed >> ID_BITS) & id_mask
+            category = (packed >> (2 * ID_BITS)) & 0b111
+            outcome = (packed >> (2 * ID_BITS + 3)) & 0b11
+        else:
+            anime1, anime2 = rows["anime1_id"], rows["anime2_id"]
+            category, outcome = rows["category"], rows["outcome"]
+
+        seed_positions = first_appearances(anime1, anime2, category)
+        seed_values = read_before(conn, rows["id"][seed_positions])
+
+        return cls(
+            vote_ids=rows["id"],
+            anime1=anime1,
+            anime2=anime2,
+            category=category,
+            outcome=outcome / 2.0,
+            seed_positions=seed_positions,
+            seed_values=seed_values,
+        )
+
+
+class ReplayResult:
+    """
+    재계산된 작품별 점수 (ratings[i, RATING_CATEGORIES 순서])와 매치 수.
+    record_from을 지정했다면 pre_ratings[j] = 로그의 record_from + j번째 투표 직전
+    두 작품의 점수 (예측 성능 평가용)
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        ratings: np.ndarray,
+        matches: np.ndarray,
+        pre_ratings: Optional[np.ndarray] = None,
+    ) -> None:
+        self.ids = ids
+        self.ratings = ratings
+        self.matches = matches
+        self.pre_ratings = pre_ratings
+
+
+def first_slots(keys: np.ndarray, size: int) -> np.ndarray:
+    """0..size-1 각 값이 keys에 처음 나오는 위치 (없으면 len(keys))"""
+    first = np.full(size, len(keys), dtype=np.int64)
+    np.minimum.at(first, keys, np.arange(len(keys), dtype=np.int64))
+    return first
+
+
+def first_appearances(
+    anime1: np.ndarray, anime2: np.ndarray, category: np.ndarray
+) -> np.ndarray:
+    """작품 또는 (작품, 카테고리)가 처음 등장하는 투표 위치 (정렬됨)"""
+    if not len(anime1):
+        return np.empty(0, dtype=np.int64)
+
+    slots = np.column_stack([anime1, anime2]).ravel()
+    keys = slots * N_CATEGORIES + np.repeat(category, 2)
+    firsts = np.concatenate(
+        [
+            first_slots(slots, int(slots.max()) + 1),
+            first_slots(keys, int(keys.max()) + 1),
+        ]
+    )
+    return np.unique(firsts[firsts < len(slots)] // 2)
+
+
+def read_before(conn: sqlite3.Connection, vote_ids: np.ndarray) -> np.ndarray:
+    """지정한 투표들의 (rating1, rating2, matches1, matches2) 직전 값"""
+    values = {}
+    ids = vote_ids.tolist()
+    for lo in range(0, len(ids), 500):
+        batch = ids[lo : lo + 500]
+        rows = conn.execute(
+            "SELECT id, rating1_before, rating2_before, matches1_before, "
+            f"matches2_before FROM votes WHERE id IN ({', '.join('?' * len(batch))})",
+            batch,
+        )
+        values.update((row[0], row[1:]) for row in rows)
+    return np.array([values[i] for i in ids], dtype=np.float64).reshape(-1, 4)
+
+
+def assign_generations(anime1: np.ndarray, anime2: np.ndarray, n: int) -> np.ndarray:
+    """각 투표의 세대 번호 (1부터). 로그 순서 의존성이 있어 순차 루프로 계산합니다."""
+    last = [0] * n
+    generations = []
+    append = generations.append
+    for x, y in zip(anime1.tolist(), anime2.tolist()):
+        gx, gy = last[x], last[y]
+        g = (gx if gx > gy else gy) + 1
+        last[x] = last[y] = g
+        append(g)
+    return np.array(generations, dtype=np.int64)
+
+
+def generation_order(generations: np.ndarray) -> np.ndarray:
+    """세대 순 안정 정렬. 16비트에 들어가면 NumPy가 기수 정렬을 사용합니다."""
+    if len(generations) and generations.max() < 2**16:
+        generations = generations.astype(np.uint16)
+    return np.argsort(generations, kind="stable")
+
+
+def replay(
+    log: VoteLog,
+    ids: np.ndarray,
+    ratings: np.ndarray,
+    matches: np.ndarray,
+    k_max: Optional[float] = None,
+    k_min: Optional[float] = None,
+    decay: Optional[float] = None,
+    record_from: Optional[int] = None,
+) -> ReplayResult:
+    """
+    투표 로그를 처음부터 다시 적용합니다.
+    ids/ratings/matches는 현재 animes 테이블 상태로, 로그에 없는 작품의 값으로 쓰입니다.
+    record_from을 주면 그 위치부터의 투표 직전 점수를 함께 반환합니다.
+    """
+    k_params = {"k_max": k_max, "k_min": k_min, "decay": decay}
+
+    # 작품 id -> 0..n-1 (삭제된 작품도 상대 점수 계산에 필요하므로 포함)
+    max_id = int(
+        max(ids.max(initial=0), log.anime1.max(initial=0), log.anime2.max(initial=0))
+    )
+    present = np.zeros(max_id + 1, dtype=bool)
+    present[ids] = present[log.anime1] = present[log.anime2] = True
+    all_ids = np.flatnonzero(present)
+    lookup = np.zeros(max_id + 1, dtype=np.int64)
+    lookup[all_ids] = np.arange(len(all_ids))
+
+    n, v = len(all_ids), len(log)
+    a, b, c = lookup[log.anime1], lookup[log.anime2], log.category
+
+    rep_ratings = np.full((n, N_CATEGORIES), settings.NORMALIZE_TARGET_MEAN)
+    rep_ratings[lookup[ids]] = ratings
+    rep_matches = np.zeros(n, dtype=np.int64)
+    rep_matches[lookup[ids]] = matches
+    flat = rep_ratings.reshape(-1)
+
+    # 첫 등장 슬롯(투표 위치 x 2 + 0/1)의 기록값으로 시작 상태를 채웁니다.
+    slots = np.column_stack([a, b]).ravel()
+    slot_keys = slots * N_CATEGORIES + np.repeat(c, 2)
+
+    def logged(slot_index: np.ndarray, column: int) -> np.ndarray:
+        rows = np.searchsorted(log.seed_positions, slot_index // 2)
+        return log.seed_values[rows, column + slot_index % 2]
+
+    first_anime = first_slots(slots, n)
+    first_anime = first_anime[first_anime < 2 * v]
+    rep_matches[slots[first_anime]] = logged(first_anime, 2)
+
+    # 점수의 첫 등장 슬롯 (정렬) -> 기록 점수. 그 사이 정규화 이동을 되돌리는 데 사용
+    seed_slots = np.sort(first_slots(slot_keys, n * N_CATEGORIES))
+    seed_slots = seed_slots[seed_slots < 2 * v]
+    seed_scores = logged(seed_slots, 0)
+    flat[slot_keys[seed_slots]] = seed_scores
+    seeded = np.zeros(2 * v, dtype=bool)
+    seeded[seed_slots] = True
+    del slots, slot_keys
+
+    def seed_score(slot_index):
+        return seed_scores[np.searchsorted(seed_slots, slot_index)]
+
+    # 세대 순으로 정렬해 세대마다 연속 구간으로 처리
+    generations = assign_generations(a, b, n)
+    order = generation_order(generations)
+    bounds = np.flatnonzero(np.diff(generations[order])) + 1
+    bounds = [0, *bounds.tolist(), v]
+
+    ga, gb, gc, gs = a[order], b[order], c[order], log.outcome[order]
+    gfa, gfb = seeded[0::2][order], seeded[1::2][order]
+    del seeded, generations
+
+    pre_ratings = None
+    if record_from is not None:
+        pre_ratings = np.empty((max(v - record_from, 0), 2))
+
+    sums = rep_ratings.sum(axis=0).tolist()
+    target = settings.NORMALIZE_TARGET_MEAN
+    threshold = settings.NORMALIZE_DRIFT_THRESHOLD
+
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi - lo < SCALAR_GENERATION_SIZE:
+            for i in range(lo, hi):
+                x, y, cat = int(ga[i]), int(gb[i]), int(gc[i])
+                key_a, key_b = x * N_CATEGORIES + cat, y * N_CATEGORIES + cat
+                stored_a, stored_b = float(flat[key_a]), float(flat[key_b])
+                ra = float(seed_score(2 * order[i])) if gfa[i] else stored_a
+                rb = float(seed_score(2 * order[i] + 1)) if gfb[i] else stored_b
+                ma, mb = int(rep_matches[x]), int(rep_matches[y])
+                s = float(gs[i])
+
+                new_a, new_b = calculate_elo_update(ra, rb, s, ma, mb, **k_params)
+
+                flat[key_a], flat[key_b] = new_a, new_b
+                rep_matches[x], rep_matches[y] = ma + 1, mb + 1
+                sums[cat] += (new_a - stored_a) + (new_b - stored_b)
+                if pre_ratings is not None and order[i] >= record_from:
+                    pre_ratings[order[i] - record_from] = (ra, rb)
+        else:
+            x, y, cat = ga[lo:hi], gb[lo:hi], gc[lo:hi]
+            key_a, key_b = x * N_CATEGORIES + cat, y * N_CATEGORIES + cat
+            stored_a, stored_b = flat[key_a], flat[key_b]
+            ra, rb = stored_a.copy(), stored_b.copy()
+            fa, fb = gfa[lo:hi], gfb[lo:hi]
+            if fa.any():
+                ra[fa] = seed_score(2 * order[lo:hi][fa])
+            if fb.any():
+                rb[fb] = seed_score(2 * order[lo:hi][fb] + 1)
+            ma, mb = rep_matches[x], rep_matches[y]
+            s = gs[lo:hi]
+
+            new_a, new_b = calculate_elo_update_batch(ra, rb, s, ma, mb, **k_params)
+
+            flat[key_a], flat[key_b] = new_a, new_b
+            rep_matches[x], rep_matches[y] = ma + 1, mb + 1
+            delta = np.bincount(
+                cat,
+                weights=(new_a - stored_a) + (new_b - stored_b),
+                minlength=N_CATEGORIES,
+            )
+            sums = [total + d for total, d in zip(sums, delta.tolist())]
+            if pre_ratings is not None:
+                positions = order[lo:hi] - record_from
+                recorded = positions >= 0
+                pre_ratings[positions[recorded], 0] = ra[recorded]
+                pre_ratings[positions[recorded], 1] = rb[recorded]
+
+        # normalize_scores_task와 같은 기준으로 평균 보정
+        for cat in range(N_CATEGORIES):
+            drift = sums[cat] / n - target
+            if abs(drift) > threshold:
+                rep_ratings[:, cat] -= drift
+                sums[cat] = math.fsum(rep_ratings[:, cat])
+
+    return ReplayResult(all_ids, rep_ratings, rep_matches, pre_ratings)
+
+
+def read_animes(conn: sqlite3.Connection) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """현재 animes 테이블의 (ids, ratings, matches_played)"""
+    columns = ", ".join(f"rating_{cat}" for cat in RATING_CATEGORIES)
+    rows = conn.execute(
+        f"SELECT id, matches_played, {columns} FROM animes ORDER BY id"
+    ).fetchall()
+    data = np.array(rows, dtype=np.float64).reshape(-1, N_CATEGORIES + 2)
+    return data[:, 0].astype(np.int64), data[:, 2:], data[:, 1].astype(np.int64)
+
+
+def write_result(conn: sqlite3.Connection, result: ReplayResult) -> int:
+    """재계산 결과를 현재 존재하는 작품에만 기록합니다 (total_score는 트리거가 갱신)."""
+    assignments = ", ".join(f"rating_{cat} = ?" for cat in RATING_CATEGORIES)
+    rows = [
+        (*ratings, matches, anime_id)
+        for anime_id, ratings, matches in zip(
+            result.ids.tolist(), result.ratings.tolist(), result.matches.tolist()
+        )
+    ]
+    with conn:
+        cursor = conn.executemany(
+            f"UPDATE animes SET {assignments}, matches_played = ?, "
+            f"version = version + 1 WHERE id = ?",
+            rows,
+        )
+    return cursor.rowcount
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="투표 로그로 Elo 점수를 재계산합니다.")
+    parser.add_argument("--db", default=settings.DB_PATH)
+    parser.add_argument("--k-max", type=float, default=settings.ELO_K_MAX)
+    parser.add_argument("--k-min", type=float, default=settings.ELO_K_MIN)
+    parser.add_argument("--decay", type=float, default=settings.ELO_DECAY_FACTOR)
+    parser.add_argument(
+        "--write", action="store_true", help="결과를 animes 테이블에 기록합니다"
+    )
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    start = time.perf_counter()
+    log = VoteLog.read(conn)
+    ids, ratings, matches = read_animes(conn)
+    loaded = time.perf_counter()
+
+    result = replay(log, ids, ratings, matches, args.k_max, args.k_min, args.decay)
+    done = time.perf_counter()
+    print(
+        f"{len(log):,} votes, {len(ids):,} animes: "
+        f"read {loaded - start:.2f}s, replay {done - loaded:.2f}s"
+    )
+
+    # 현재 DB 점수와의 차이 요약
+    diff = result.ratings[np.searchsorted(result.ids, ids)] - ratings
+    for i, cat in enumerate(RATING_CATEGORIES):
+        errors = np.abs(diff[:, i])
+        mean = errors.mean() if len(errors) else 0.0
+        print(
+            f"  {cat:<7} mean |diff|={mean:8.3f}  "
+            f"max |diff|={errors.max(initial=0.0):8.3f}"
+        )
+
+    if args.write:
+        updated = write_result(conn, result)
+        print(f"{updated:,} animes updated. 서버를 재시작해야 메모리 인덱스에 반영됩니다.")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
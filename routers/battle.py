@@ -1,116 +1,144 @@
 # routers/battle.py
-import random
-from typing import Annotated
-from fastapi import APIRouter, Depends, Request, Form, BackgroundTasks
+from typing import Annotated, Any, Dict, Optional
+from fastapi import APIRouter, Depends, Request, Form, Query, Response, BackgroundTasks
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, AsyncSessionLocal
-from models import Anime
-from schemas import VoteResponse
+from config import settings
+from database import get_db, get_read_db, AsyncSessionLocal
+from models import Anime, RATING_CATEGORIES
+from schemas import VoteResponse, MultiVoteResponse, BattleQueue, HeadToHead
+from vote_queue import vote_queue
+from matchup_pool import matchup_pool
+from pairwise import pairwise_store
 from services import (
     get_match_pair,
-    calculate_elo_update,
+    pick_category,
+    get_match_pairs,
+    apply_vote,
+    apply_votes,
+    VoteConflictError,
     normalize_scores_task,
-    get_match_probabilities,
-    get_anime_rank_info,
+    needs_normalization,
+    build_matchup,
+    matchmaking_stats,
 )
 
 router = APIRouter(prefix="/battle", tags=["battle"])
 templates = Jinja2Templates(directory="templates")
 
 SessionDep = Annotated[AsyncSession, Depends(get_db)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
+PrefetchQuery = Annotated[int, Query(ge=1, le=settings.BATTLE_PREFETCH_MAX_SIZE)]
 
-CATEGORIES = [
-    ("story", "스토리"),
-    ("visual", "작화"),
-    ("ost", "OST"),
-    ("voice", "성우"),
-    ("char", "캐릭터"),
-    ("fun", "종합적인 재미"),
-]
-
-
-@router.get("", response_class=HTMLResponse)
-async def get_battle(request: Request, db: SessionDep):
-    anime1, anime2 = await get_match_pair(db)
-
-    if not anime1 or not anime2:
-        return HTMLResponse(
-            content="""
+NO_DATA_HTML = """
             <div style='text-align:center; padding:50px;'>
                 <h2>데이터가 부족합니다.</h2>
                 <p>관리자 페이지에서 애니메이션을 추가해주세요.</p>
                 <a href='/manage'>관리 페이지로 이동</a>
             </div>
-            """,
-            status_code=200,
-        )
+            """
 
-    selected_category = random.choice(CATEGORIES)
-    category_key = selected_category[0]
 
-    # 점수 가져오기
-    r1 = getattr(anime1, f"rating_{category_key}")
-    r2 = getattr(anime2, f"rating_{category_key}")
+def matchup_of(anime1: Anime, anime2: Anime, category: str) -> Dict[str, Any]:
+    return build_matchup(anime1.id, anime1.name, anime2.id, anime2.name, category)
 
-    # 확률 및 등수 정보 계산
-    probs = get_match_probabilities(r1, r2)
-    rank1 = await get_anime_rank_info(db, category_key, r1)
-    rank2 = await get_anime_rank_info(db, category_key, r2)
+
+@router.get("", response_class=HTMLResponse)
+async def get_battle(request: Request, db: ReadSessionDep):
+    # 미리 만들어 둔 대결이 있으면 DB 접근 없이 바로 응답합니다.
+    matchup = matchup_pool.pop()
+    if matchup is None:
+        category = pick_category()
+        anime1, anime2 = await get_match_pair(db, category)
+        if not anime1 or not anime2:
+            return HTMLResponse(content=NO_DATA_HTML, status_code=200)
+        matchup = matchup_of(anime1, anime2, category)
 
     return templates.TemplateResponse(
         "battle.html",
         {
             "request": request,
-            "anime1": anime1,
-            "anime2": anime2,
-            "category_key": category_key,
-            "category_name": selected_category[1],
-            "probs": probs,
-            "rank1": rank1,
-            "rank2": rank2,
+            "prefetch_size": settings.BATTLE_PREFETCH_SIZE,
+            **matchup,
         },
     )
 
 
-@router.get("/focus/{anime_id}", response_class=HTMLResponse)
-async def focus_battle(anime_id: int, request: Request, db: SessionDep):
-    anime1, anime2 = await get_match_pair(db, focus_id=anime_id)
-
-    if not anime1:
-        return HTMLResponse("존재하지 않는 애니메이션입니다.", status_code=404)
-    if not anime2:
-        return HTMLResponse("상대할 애니메이션 데이터가 부족합니다.", status_code=200)
-
-    selected_category = random.choice(CATEGORIES)
-    category_key = selected_category[0]
+@router.get("/next", response_model=BattleQueue)
+async def next_battles(
+    response: Response,
+    db: ReadSessionDep,
+    n: PrefetchQuery = settings.BATTLE_PREFETCH_SIZE,
+    focus_id: Optional[int] = None,
+):
+    """
+    다음 대결 n개를 JSON으로 반환합니다 (battle.html의 대결 큐).
+    대결 풀에서 먼저 꺼내고, 모자란 만큼만 메모리 인덱스에서 한 번에 뽑아
+    작품 정보를 한 번의 SELECT로 읽습니다.
+    """
+    items = matchup_pool.pop_many(n, focus_id)
+    if len(items) < n:
+        pairs = await get_match_pairs(db, n - len(items), focus_id)
+        items.extend(matchup_of(*match) for match in pairs)
+    response.headers["Cache-Control"] = "no-store"
+    return {"items": items}
+
+
+@router.get("/stats")
+async def matchmaking_stats_summary():
+    """지금까지 투표된 대결의 기대 정보량(bits) 통계 (카테고리별)"""
+    return matchmaking_stats.summary()
+
+
+@router.get("/h2h/{anime1_id}/{anime2_id}", response_model=HeadToHead)
+async def head_to_head(anime1_id: int, anime2_id: int):
+    """두 작품의 카테고리별 상대 전적 (anime1 기준 승/무/패, 메모리 조회만)"""
+    records = []
+    for cat in RATING_CATEGORIES:
+        wins, draws, losses = pairwise_store.head_to_head(anime1_id, anime2_id, cat)
+        records.append(
+            {"category": cat, "wins": wins, "draws": draws, "losses": losses}
+        )
+    return {"a1_id": anime1_id, "a2_id": anime2_id, "records": records}
 
-    r1 = getattr(anime1, f"rating_{category_key}")
-    r2 = getattr(anime2, f"rating_{category_key}")
 
-    probs = get_match_probabilities(r1, r2)
-    rank1 = await get_anime_rank_info(db, category_key, r1)
-    rank2 = await get_anime_rank_info(db, category_key, r2)
+@router.get("/focus/{anime_id}", response_class=HTMLResponse)
+async def focus_battle(anime_id: int, request: Request, db: ReadSessionDep):
+    matchup = matchup_pool.pop(focus_id=anime_id)
+    if matchup is None:
+        category = pick_category()
+        anime1, anime2 = await get_match_pair(db, category, focus_id=anime_id)
+        if not anime1:
+            return HTMLResponse("존재하지 않는 애니메이션입니다.", status_code=404)
+        if not anime2:
+            return HTMLResponse(
+                "상대할 애니메이션 데이터가 부족합니다.", status_code=200
+            )
+        matchup = matchup_of(anime1, anime2, category)
 
     return templates.TemplateResponse(
         "battle.html",
         {
             "request": request,
-            "anime1": anime1,
-            "anime2": anime2,
-            "category_key": category_key,
-            "category_name": selected_category[1],
             "focus_mode": True,
             "focus_id": anime_id,
-            "probs": probs,
-            "rank1": rank1,
-            "rank2": rank2,
+            "prefetch_size": settings.BATTLE_PREFETCH_SIZE,
+            **matchup,
         },
     )
 
 
+def parse_winner(winner: str) -> float:
+    """폼의 winner 값("1", "2", 그 외 무승부)을 actual_score로 변환합니다."""
+    if winner == "1":
+        return 1.0
+    if winner == "2":
+        return 0.0
+    return 0.5
+
+
 @router.post("/vote", response_model=VoteResponse)
 async def vote(
     request: Request,
@@ -122,64 +150,99 @@ async def vote(
     winner: str = Form(...),
     redirect_to: str = Form(None),
 ):
-    a1 = await db.get(Anime, anime1_id)
-    a2 = await db.get(Anime, anime2_id)
+    if category not in RATING_CATEGORIES:
+        return JSONResponse({"error": "Invalid category"}, status_code=400)
 
-    if not a1 or not a2:
-        return JSONResponse({"error": "Anime not found"}, status_code=404)
+    actual_score = parse_winner(winner)
 
-    attr_name = f"rating_{category}"
-    old_r1 = getattr(a1, attr_name)
-    old_r2 = getattr(a2, attr_name)
+    if settings.VOTE_QUEUE_ENABLED:
+        # 메모리에 즉시 적용 후 응답, DB 기록은 큐가 묶어서 처리
+        result = vote_queue.submit(anime1_id, anime2_id, category, actual_score)
+    else:
+        # 조회 1회 + UPDATE ... RETURNING 1회 + 커밋, 등수는 메모리 인덱스에서 계산
+        try:
+            result = await apply_vote(
+                db, anime1_id, anime2_id, category, actual_score
+            )
+        except VoteConflictError:
+            return JSONResponse(
+                {"error": "Concurrent vote conflict, please retry"}, status_code=409
+            )
+    if result is None:
+        return JSONResponse({"error": "Anime not found"}, status_code=404)
+    matchmaking_stats.record(category, result)
 
-    # 1. 변경 전 등수 계산
-    info1_old = await get_anime_rank_info(db, category, old_r1)
-    info2_old = await get_anime_rank_info(db, category, old_r2)
+    # 투표마다 전체 테이블을 훑는 대신, 평균 드리프트가 임계값을 넘을 때만 정규화
+    if needs_normalization(category):
+        background_tasks.add_task(normalize_scores_task, AsyncSessionLocal)
 
-    # 2. 점수 업데이트 계산
-    if winner == "1":
-        actual_score = 1.0
-    elif winner == "2":
-        actual_score = 0.0
-    else:
-        actual_score = 0.5
+    response_data = {
+        **result,
+        "next_url": redirect_to if redirect_to else "/battle",
+    }
 
-    new_r1, new_r2 = calculate_elo_update(
-        old_r1, old_r2, actual_score, a1.matches_played, a2.matches_played
-    )
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return JSONResponse(response_data)
 
-    setattr(a1, attr_name, new_r1)
-    setattr(a2, attr_name, new_r2)
-    a1.matches_played += 1
-    a2.matches_played += 1
+    return RedirectResponse(url=response_data["next_url"], status_code=303)
 
-    await db.commit()
 
-    # 3. 변경 후 등수 계산 (주의: DB에 반영된 새 점수를 기준으로 재조회 필요)
-    # 다만 여기서는 count 쿼리이므로, 다른 애니메이션 점수는 그대로라고 가정하고
-    # a1, a2의 점수만 변동된 상태에서 쿼리를 날립니다.
-    # 이미 commit을 했으므로 DB에는 새 점수가 반영되어 있습니다.
+@router.post("/vote/multi", response_model=MultiVoteResponse)
+async def vote_multi(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: SessionDep,
+    anime1_id: int = Form(...),
+    anime2_id: int = Form(...),
+    redirect_to: str = Form(None),
+):
+    """
+    같은 대결에 대해 여러 카테고리를 한 번에 투표합니다.
+    폼 필드 winner_<category> (예: winner_story=1)가 있는 카테고리만 적용하며,
+    모든 카테고리를 하나의 트랜잭션으로 기록합니다.
+    """
+    form = await request.form()
+    outcomes = {
+        cat: parse_winner(form[f"winner_{cat}"])
+        for cat in RATING_CATEGORIES
+        if form.get(f"winner_{cat}")
+    }
+    if not outcomes:
+        return JSONResponse({"error": "No category outcomes"}, status_code=400)
 
-    info1_new = await get_anime_rank_info(db, category, new_r1)
-    info2_new = await get_anime_rank_info(db, category, new_r2)
+    if settings.VOTE_QUEUE_ENABLED:
+        results = vote_queue.submit_many(anime1_id, anime2_id, outcomes)
+    else:
+        try:
+            results = await apply_votes(db, anime1_id, anime2_id, outcomes)
+        except VoteConflictError:
+            return JSONResponse(
+                {"error": "Concurrent vote conflict, please retry"}, status_code=409
+            )
+    if results is None:
+        return JSONResponse({"error": "Anime not found"}, status_code=404)
+    for cat, result in results.items():
+        matchmaking_stats.record(cat, result)
 
-    background_tasks.add_task(normalize_scores_task, AsyncSessionLocal)
+    if any(needs_normalization(cat) for cat in results):
+        background_tasks.add_task(normalize_scores_task, AsyncSessionLocal)
 
+    first = next(iter(results.values()))
     response_data = {
-        "a1_id": a1.id,
-        "a2_id": a2.id,
-        "old_r1": round(old_r1),
-        "new_r1": round(new_r1),
-        "diff_r1": round(new_r1 - old_r1),
-        "old_r2": round(old_r2),
-        "new_r2": round(new_r2),
-        "diff_r2": round(new_r2 - old_r2),
-        # Rank Info
-        "old_rank_1": info1_old["rank"],
-        "new_rank_1": info1_new["rank"],
-        "old_rank_2": info2_old["rank"],
-        "new_rank_2": info2_new["rank"],
-        "total_animes": info1_old["total"],
+        "a1_id": anime1_id,
+        "a2_id": anime2_id,
+        "total_animes": first["total_animes"],
+        "results": [
+            {
+                "category": cat,
+                **{
+                    key: value
+                    for key, value in result.items()
+                    if key not in ("a1_id", "a2_id", "total_animes")
+                },
+            }
+            for cat, result in results.items()
+        ],
         "next_url": redirect_to if redirect_to else "/battle",
     }
 
@@ -1,23 +1,45 @@
 # routers/manage.py
-from typing import Annotated
+import csv
+import io
+from typing import Annotated, AsyncIterator, Optional
 from fastapi import APIRouter, Depends, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, or_
 
-from database import get_db
-from models import Anime
+from database import get_db, get_read_db, ReadSessionLocal
+from models import Anime, PairCount, RATING_CATEGORIES
+from rating_index import rating_index
+from matchup_pool import matchup_pool
+from pairwise import pairwise_store
+from services import stream_vote_history
 
 router = APIRouter(prefix="/manage", tags=["manage"])
 templates = Jinja2Templates(directory="templates")
 
 # Annotated Type Hint
 SessionDep = Annotated[AsyncSession, Depends(get_db)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
+
+HISTORY_COLUMNS = (
+    "id",
+    "created_at",
+    "anime1_id",
+    "anime2_id",
+    "category",
+    "outcome",
+    "rating1_before",
+    "rating2_before",
+    "matches1_before",
+    "matches2_before",
+)
+# 이 크기만큼 모이면 응답으로 내보냅니다.
+HISTORY_CHUNK_BYTES = 64 * 1024
 
 
 @router.get("", response_class=HTMLResponse)
-async def manage_page(request: Request, db: SessionDep):
+async def manage_page(request: Request, db: ReadSessionDep):
     result = await db.execute(select(Anime).order_by(Anime.name))
     animes = result.scalars().all()
     return templates.TemplateResponse(
@@ -33,13 +55,22 @@ async def add_anime(db: SessionDep, name: str = Form(...)):
     new_anime = Anime(name=name.strip())
     db.add(new_anime)
     await db.commit()
+    rating_index.add(new_anime)
     return RedirectResponse(url="/manage", status_code=303)
 
 
 @router.post("/delete")
 async def delete_anime(db: SessionDep, anime_id: int = Form(...)):
     await db.execute(delete(Anime).where(Anime.id == anime_id))
+    # 투표 로그(votes)는 이력으로 남기고, 쌍별 집계에서는 함께 지웁니다.
+    await db.execute(
+        delete(PairCount).where(
+            or_(PairCount.first_id == anime_id, PairCount.second_id == anime_id)
+        )
+    )
     await db.commit()
+    rating_index.remove(anime_id)
+    pairwise_store.remove(anime_id)
     return RedirectResponse(url="/manage", status_code=303)
 
 
@@ -53,4 +84,50 @@ async def edit_anime(
     stmt = update(Anime).where(Anime.id == anime_id).values(name=new_name.strip())
     await db.execute(stmt)
     await db.commit()
+    # 이름은 순위 인덱스에 없지만 랭킹 캐시와 미리 만든 대결은 무효화해야 합니다.
+    rating_index.bump_version()
+    matchup_pool.clear()
     return RedirectResponse(url="/manage", status_code=303)
+
+
+async def vote_history_csv(anime_id: Optional[int]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HISTORY_COLUMNS)
+    # 응답을 보내는 동안 열려 있어야 하므로 요청 세션 대신 직접 엽니다.
+    async with ReadSessionLocal() as db:
+        async for vote in stream_vote_history(db, anime_id):
+            writer.writerow(
+                [
+                    vote.id,
+                    vote.created_at,
+                    vote.anime1_id,
+                    vote.anime2_id,
+                    RATING_CATEGORIES[vote.category],
+                    vote.outcome,
+                    vote.rating1_before,
+                    vote.rating2_before,
+                    vote.matches1_before,
+                    vote.matches2_before,
+                ]
+            )
+            if buffer.tell() >= HISTORY_CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/history")
+async def export_vote_history(anime_id: Optional[int] = None):
+    """
+    투표 로그를 적용 순서대로 CSV로 내려받습니다 (재계산/감사용).
+    anime_id를 주면 (anime_id, id) 인덱스로 해당 작품의 이력만 읽습니다.
+    outcome은 anime1 기준 점수 x 2 (2: 1 승, 1: 무승부, 0: 2 승)입니다.
+    """
+    filename = "votes.csv" if anime_id is None else f"votes_{anime_id}.csv"
+    return StreamingResponse(
+        vote_history_csv(anime_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,98 +1,250 @@
 # routers/ranking.py
-from typing import Annotated
-from fastapi import APIRouter, Depends, Request
+from typing import Annotated, Optional, Dict, Any
+from fastapi import APIRouter, Request, Query, Response
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, cast, Integer
+from sqlalchemy.sql.expression import func as sql_func
 
-from database import get_db
-from models import Anime
+from config import settings
+from database import ReadSessionLocal
+from models import Anime, RATING_CATEGORIES
+from rating_index import rating_index
+from schemas import RankingPage
+from ranking_cache import ranking_cache
 
 router = APIRouter(prefix="/ranking", tags=["ranking"])
 templates = Jinja2Templates(directory="templates")
 
+DISTRIBUTION_BUCKET_SIZE = 50
 
-@router.get("", response_class=HTMLResponse)
-async def get_ranking(
-    request: Request,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    sort_by: str = "total",
-):
-    # 읽기 전용 트랜잭션 최적화
-    result = await db.execute(select(Anime))
-    animes = result.scalars().all()
+# 모든 응답은 ETag로 재검증 (If-None-Match → 304)
+REVALIDATE = "private, no-cache"
 
-    if not animes:
-        return templates.TemplateResponse(
-            "ranking.html",
-            {
-                "request": request,
-                "animes": [],
-                "sort_by": sort_by,
-                "chart_data": {"labels": [], "counts": [], "category": ""},
-            },
+LimitQuery = Annotated[int, Query(ge=1, le=settings.RANKING_MAX_PAGE_SIZE)]
+
+
+# 랭킹 점수 모델: elo (rating_*, total_score) / bt (Bradley–Terry 재적합, bt_*)
+RANKING_MODELS = ("elo", "bt")
+
+
+def score_attr(sort_by: str, model: str = "elo") -> str:
+    if model == "bt":
+        return f"bt_{sort_by}"
+    return "total_score" if sort_by == "total" else f"rating_{sort_by}"
+
+
+def get_sort_column(sort_by: str, model: str = "elo"):
+    return getattr(Anime, score_attr(sort_by, model))
+
+
+def normalize_sort_key(sort_by: str) -> str:
+    if sort_by != "total" and sort_by not in RATING_CATEGORIES:
+        return "total"
+    return sort_by
+
+
+def normalize_model(model: str) -> str:
+    return model if model in RANKING_MODELS else "elo"
+
+
+async def fetch_ranking_page(
+    db: AsyncSession,
+    sort_by: str,
+    limit: int,
+    after_score: Optional[float] = None,
+    after_id: Optional[int] = None,
+    model: str = "elo",
+) -> Dict[str, Any]:
+    """
+    (점수 DESC, id DESC) 순서의 키셋 페이지네이션.
+    커서 이후 limit개만 (점수, id) 복합 인덱스 범위 스캔으로 읽습니다.
+    """
+    sort_col = get_sort_column(sort_by, model)
+    sort_key = tuple_(sort_col, Anime.id)
+
+    query = select(Anime).order_by(sort_col.desc(), Anime.id.desc())
+    start_rank = 1
+
+    if after_score is not None and after_id is not None:
+        cursor = tuple_(after_score, after_id)
+        query = query.where(sort_key < cursor)
+
+        # 이전 페이지까지 보여준 행 수 = 커서 이상인 행 수
+        shown = await db.execute(
+            select(sql_func.count()).select_from(Anime).where(sort_key >= cursor)
         )
+        start_rank = shown.scalar() + 1
+
+    # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+    result = await db.execute(query.limit(limit + 1))
+    animes = result.scalars().all()
+    has_more = len(animes) > limit
+    animes = animes[:limit]
 
-    # Prepare list for template
-    ranked_list = []
-    for a in animes:
-        ranked_list.append(
+    items = []
+    for rank, a in enumerate(animes, start=start_rank):
+        items.append(
             {
+                "id": a.id,
+                "rank": rank,
                 "name": a.name,
-                "total": round(a.total_score, 1),
-                "story": round(a.rating_story, 1),
-                "visual": round(a.rating_visual, 1),
-                "ost": round(a.rating_ost, 1),
-                "voice": round(a.rating_voice, 1),
-                "char": round(a.rating_char, 1),
-                "fun": round(a.rating_fun, 1),
+                **{
+                    key: round(getattr(a, score_attr(key, model)), 1)
+                    for key in ("total", *RATING_CATEGORIES)
+                },
                 "matches": a.matches_played,
             }
         )
 
-    # Sorting Logic
-    ranked_list.sort(key=lambda x: x.get(sort_by, 0), reverse=True)
+    next_cursor = None
+    if has_more:
+        last = animes[-1]
+        next_cursor = {
+            "after_score": getattr(last, score_attr(sort_by, model)),
+            "after_id": last.id,
+        }
+
+    return {
+        "sort_by": sort_by,
+        "model": model,
+        "items": items,
+        "next_cursor": next_cursor,
+        "total_animes": len(rating_index),
+    }
+
 
-    # Chart Data Preparation (Histogram)
-    target_key = sort_by
-    scores = [x[target_key] for x in ranked_list]
+def chart_category_label(sort_by: str, model: str = "elo") -> str:
+    label = sort_by.upper() if sort_by != "total" else "종합 점수"
+    return f"{label} (Bradley–Terry)" if model == "bt" else label
 
-    # 동적 범위 설정 (데이터 분포에 따라)
-    min_s = math_floor(min(scores)) if scores else 800
-    max_s = math_ceil(max(scores)) if scores else 1800
-    # 50점 단위로 범주화
-    min_bucket = (min_s // 50) * 50
-    max_bucket = ((max_s // 50) + 1) * 50
 
-    labels = []
-    counts = []
+async def build_chart_data(
+    db: AsyncSession, sort_by: str, model: str = "elo"
+) -> Dict[str, Any]:
+    """
+    점수 분포 히스토그램 (50점 단위).
+    버킷 집계는 SQL GROUP BY로 처리하고, 빈 구간만 0으로 채웁니다.
+    """
+    bucket = cast(get_sort_column(sort_by, model) / DISTRIBUTION_BUCKET_SIZE, Integer)
+    result = await db.execute(
+        select(bucket.label("bucket"), sql_func.count())
+        .group_by("bucket")
+        .order_by("bucket")
+    )
+    bucket_counts = dict(result.all())
 
-    for i in range(min_bucket, max_bucket, 50):
-        labels.append(f"{i}")
-        count = sum(1 for s in scores if i <= s < i + 50)
-        counts.append(count)
+    if not bucket_counts:
+        return {"labels": [], "counts": [], "category": ""}
 
-    chart_data = {
-        "labels": labels,
-        "counts": counts,
-        "category": target_key.upper() if target_key != "total" else "종합 점수",
+    buckets = range(min(bucket_counts), max(bucket_counts) + 1)
+    return {
+        "labels": [f"{b * DISTRIBUTION_BUCKET_SIZE}" for b in buckets],
+        "counts": [bucket_counts.get(b, 0) for b in buckets],
+        "category": chart_category_label(sort_by, model),
     }
 
+
+async def run_read(fn, *args):
+    """캐시 계산용: 요청 세션과 분리된 읽기 세션에서 실행합니다."""
+    async with ReadSessionLocal() as db:
+        return await fn(db, *args)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+@router.get("", response_class=HTMLResponse)
+async def get_ranking(
+    request: Request,
+    sort_by: str = "total",
+    limit: LimitQuery = settings.RANKING_PAGE_SIZE,
+    after_score: Optional[float] = None,
+    after_id: Optional[int] = None,
+    model: str = "elo",
+):
+    # 캐시 조회 전에 ETag를 잡아야, 계산 도중 투표가 들어와도 오래된 태그가 남지 않습니다.
+    etag = ranking_cache.etag
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, REVALIDATE)
+
+    sort_by = normalize_sort_key(sort_by)
+    model = normalize_model(model)
+    page = await ranking_cache.get_or_compute(
+        ("page", model, sort_by, limit, after_score, after_id),
+        lambda: run_read(
+            fetch_ranking_page, sort_by, limit, after_score, after_id, model
+        ),
+    )
+
+    # 분포 차트는 /ranking/distribution 에서 별도로 받아옵니다.
     return templates.TemplateResponse(
         "ranking.html",
         {
             "request": request,
-            "animes": ranked_list,
+            "animes": page["items"],
+            "next_cursor": page["next_cursor"],
+            "limit": limit,
             "sort_by": sort_by,
-            "chart_data": chart_data,
+            "model": model,
+            "chart_category": chart_category_label(sort_by, model),
         },
+        headers={"ETag": etag, "Cache-Control": REVALIDATE},
     )
 
 
-def math_floor(x):
-    return int(x)
+@router.get("/page", response_model=RankingPage)
+async def get_ranking_page(
+    request: Request,
+    response: Response,
+    sort_by: str = "total",
+    limit: LimitQuery = settings.RANKING_PAGE_SIZE,
+    after_score: Optional[float] = None,
+    after_id: Optional[int] = None,
+    model: str = "elo",
+):
+    """프론트엔드(무한 스크롤)용 JSON 페이지"""
+    etag = ranking_cache.etag
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, REVALIDATE)
+
+    sort_by = normalize_sort_key(sort_by)
+    model = normalize_model(model)
+    response.headers.update({"ETag": etag, "Cache-Control": REVALIDATE})
+    return await ranking_cache.get_or_compute(
+        ("page", model, sort_by, limit, after_score, after_id),
+        lambda: run_read(
+            fetch_ranking_page, sort_by, limit, after_score, after_id, model
+        ),
+    )
 
 
-def math_ceil(x):
-    return int(x) + 1
+@router.get("/distribution")
+async def get_distribution(
+    request: Request, response: Response, category: str = "total", model: str = "elo"
+):
+    """점수 분포 차트 데이터 (JSON, 브라우저 캐시 가능)"""
+    cache_control = f"private, max-age={settings.RANKING_DISTRIBUTION_MAX_AGE}"
+    etag = ranking_cache.etag
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, cache_control)
+
+    category = normalize_sort_key(category)
+    model = normalize_model(model)
+    response.headers.update({"ETag": etag, "Cache-Control": cache_control})
+    return await ranking_cache.get_or_compute(
+        ("distribution", model, category),
+        lambda: run_read(build_chart_data, category, model),
+    )
@@ -25,3 +25,113 @@ class VoteResponse(BaseModel):
     next_url: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CategoryVoteResult(BaseModel):
+    category: str
+
+    # 점수 정보
+    old_r1: int
+    new_r1: int
+    diff_r1: int
+    old_r2: int
+    new_r2: int
+    diff_r2: int
+
+    # 등수 정보
+    old_rank_1: int
+    new_rank_1: int
+    old_rank_2: int
+    new_rank_2: int
+
+
+class MultiVoteResponse(BaseModel):
+    a1_id: int
+    a2_id: int
+    total_animes: int
+
+    # RATING_CATEGORIES 순서대로 적용된 카테고리별 결과
+    results: list[CategoryVoteResult]
+
+    next_url: str
+
+
+class BattleAnime(BaseModel):
+    id: int
+    name: str
+    # 대결 카테고리 점수 (반올림)
+    rating: int
+
+
+class RankInfo(BaseModel):
+    rank: int
+    total: int
+    top_percent: float
+
+
+class MatchProbabilities(BaseModel):
+    win_a: float
+    draw: float
+    win_b: float
+
+
+class BattleMatchup(BaseModel):
+    category: str
+    category_name: str
+    anime1: BattleAnime
+    anime2: BattleAnime
+    probs: MatchProbabilities
+    rank1: RankInfo
+    rank2: RankInfo
+    # 승/무/패 예측 분포의 엔트로피 (bits)
+    info_gain: float
+
+
+class BattleQueue(BaseModel):
+    items: list[BattleMatchup]
+
+
+class HeadToHeadRecord(BaseModel):
+    category: str
+    # anime1 기준
+    wins: int
+    draws: int
+    losses: int
+
+
+class HeadToHead(BaseModel):
+    a1_id: int
+    a2_id: int
+    # RATING_CATEGORIES 순서
+    records: list[HeadToHeadRecord]
+
+
+class RankingItem(BaseModel):
+    id: int
+    rank: int
+    name: str
+
+    # 점수 정보 (소수점 1자리 반올림)
+    total: float
+    story: float
+    visual: float
+    ost: float
+    voice: float
+    char: float
+    fun: float
+    matches: int
+
+
+class RankingCursor(BaseModel):
+    # 정렬 컬럼의 원본 점수 (반올림 전 값이어야 키셋 비교가 정확합니다)
+    after_score: float
+    after_id: int
+
+
+class RankingPage(BaseModel):
+    sort_by: str
+    # 점수 모델 (elo / bt)
+    model: str = "elo"
+    items: list[RankingItem]
+    next_cursor: Optional[RankingCursor] = None
+    total_animes: int
@@ -1,28 +1,173 @@
 # services.py
+import asyncio
 import math
 import random
 import os
+import time
+from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
-from typing import Tuple, Dict, Optional, Any
+from typing import Tuple, Dict, List, Optional, Any, AsyncIterator, Iterable, Type
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, update, insert, case, and_, or_, bindparam
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.sql.expression import func as sql_func
 
-from models import Anime
-from config import settings
+import glicko2
+from models import Anime, Vote, RATING_CATEGORIES
+from config import settings, on_settings_reload
+from rating_index import RatingIndex, rating_index
+from pairwise import PAIR_COUNT_UPSERT, pair_count_rows, pairwise_store
+
+# 대결 카테고리와 화면 표시 이름
+CATEGORIES = [
+    ("story", "스토리"),
+    ("visual", "작화"),
+    ("ost", "OST"),
+    ("voice", "성우"),
+    ("char", "캐릭터"),
+    ("fun", "종합적인 재미"),
+]
+CATEGORY_NAMES = dict(CATEGORIES)
 
 
 # --- Elo Calculation Logic ---
+# 스칼라 함수와 배열(_batch) 함수는 같은 순서의 사칙연산을 쓰고, 거듭제곱/지수는
+# 둘 다 같은 libm 함수(10.0 ** x, math.exp)로 계산하므로 결과가 비트 단위로 같습니다.
+# NumPy의 SIMD pow/exp는 libm과 마지막 비트가 다를 수 있어 배열 경로에서도 쓰지 않습니다
+# (benchmarks/check_elo_batch.py).
+
+_pow10 = (10.0).__pow__  # 10.0 ** x 와 같은 계산
+
 
+def _libm(func, x: np.ndarray) -> np.ndarray:
+    """스칼라 경로와 같은 libm 함수를 원소마다 적용합니다."""
+    x = np.asarray(x, dtype=np.float64)
+    values = np.fromiter(map(func, x.ravel().tolist()), np.float64, x.size)
+    return values.reshape(x.shape)
+
+
+class KFactorTable:
+    """
+    matches_played -> K-Factor 조회표.
+    K는 정수인 매치 수로만 정해지므로 한 번 계산해 두고, 스칼라/배열 경로가 함께 씁니다.
+    필요한 매치 수까지 두 배씩 늘리며, K가 k_min과 정확히 같아지는 지점 이후는
+    마지막 값(k_min)을 그대로 사용합니다.
+    """
 
-def get_dynamic_k_factor(matches_played: int) -> float:
+    INITIAL_SIZE = 1024
+
+    def __init__(self, k_max: float, k_min: float, decay: float) -> None:
+        self.key = (k_max, k_min, decay)
+        self._values: List[float] = []
+        self._array = np.empty(0)
+        self.saturated = False
+        self.extend(self.INITIAL_SIZE)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def extend(self, size: int) -> None:
+        k_max, k_min, decay = self.key
+        k_diff = k_max - k_min
+        for matches in range(len(self._values), size):
+            k = k_min + k_diff * math.exp(-matches / decay)
+            self._values.append(k)
+            if k == k_min:
+                self.saturated = True
+                break
+        self._array = np.array(self._values)
+
+    def get(self, matches_played: int) -> float:
+        # 투표마다 호출되므로 범위 안이면 리스트 인덱싱 한 번으로 끝냅니다.
+        try:
+            return self._values[matches_played]
+        except IndexError:
+            return self._get_beyond(matches_played)
+
+    def _get_beyond(self, matches_played: int) -> float:
+        if not self.saturated:
+            self.extend(max(matches_played + 1, 2 * len(self._values)))
+        if matches_played >= len(self._values):  # 포화 (확장 중 포함)
+            return self._values[-1]
+        return self._values[matches_played]
+
+    def lookup(self, matches_played: np.ndarray) -> np.ndarray:
+        matches_played = np.asarray(matches_played)
+        if not matches_played.size:
+            return np.empty(matches_played.shape)
+
+        top = int(matches_played.max())
+        if top >= len(self._values) and not self.saturated:
+            self.extend(max(top + 1, 2 * len(self._values)))
+        return self._array[np.minimum(matches_played, len(self._values) - 1)]
+
+
+# 현재 settings 기준 조회표 (설정을 다시 읽으면 다음 조회 때 새로 만듭니다)
+_current_k_factor_table: Optional[KFactorTable] = None
+
+# settings와 다른 상수 조합(재계산/스윕)의 조회표는 몇 개까지 따로 보관합니다.
+_k_factor_tables: Dict[Tuple[float, float, float], KFactorTable] = {}
+MAX_K_FACTOR_TABLES = 16
+
+
+@on_settings_reload
+def _reset_k_factor_tables() -> None:
+    global _current_k_factor_table
+    _current_k_factor_table = None
+    _k_factor_tables.clear()
+
+
+def get_k_factor_table(
+    k_max: Optional[float] = None,
+    k_min: Optional[float] = None,
+    decay: Optional[float] = None,
+) -> KFactorTable:
+    """상수 조합에 맞는 K 조회표. 지정하지 않은 상수는 현재 settings 값을 사용합니다."""
+    global _current_k_factor_table
+    if k_max is None and k_min is None and decay is None:
+        if _current_k_factor_table is None:
+            _current_k_factor_table = KFactorTable(
+                settings.ELO_K_MAX, settings.ELO_K_MIN, settings.ELO_DECAY_FACTOR
+            )
+        return _current_k_factor_table
+
+    key = (
+        settings.ELO_K_MAX if k_max is None else k_max,
+        settings.ELO_K_MIN if k_min is None else k_min,
+        settings.ELO_DECAY_FACTOR if decay is None else decay,
+    )
+    table = _k_factor_tables.get(key)
+    if table is None:
+        if len(_k_factor_tables) >= MAX_K_FACTOR_TABLES:
+            del _k_factor_tables[next(iter(_k_factor_tables))]
+        table = _k_factor_tables[key] = KFactorTable(*key)
+    return table
+
+
+def get_dynamic_k_factor(
+    matches_played: int,
+    k_max: Optional[float] = None,
+    k_min: Optional[float] = None,
+    decay: Optional[float] = None,
+) -> float:
     """
     매치 횟수에 따라 K-Factor를 동적으로 계산합니다 (Logistic Decay).
     Formula: K = K_min + (K_max - K_min) * exp(-matches / decay)
+    상수를 지정하지 않으면 settings 값을 사용합니다 (재계산/스윕용).
+    값은 미리 계산된 조회표(KFactorTable)에서 읽습니다.
     """
-    k_diff = settings.ELO_K_MAX - settings.ELO_K_MIN
-    decay = math.exp(-matches_played / settings.ELO_DECAY_FACTOR)
-    return settings.ELO_K_MIN + k_diff * decay
+    return get_k_factor_table(k_max, k_min, decay).get(matches_played)
+
+
+def get_dynamic_k_factor_batch(
+    matches_played: np.ndarray,
+    k_max: Optional[float] = None,
+    k_min: Optional[float] = None,
+    decay: Optional[float] = None,
+) -> np.ndarray:
+    """get_dynamic_k_factor의 배열 버전"""
+    return get_k_factor_table(k_max, k_min, decay).lookup(matches_played)
 
 
 def calculate_expected_score(rating_a: float, rating_b: float) -> float:
@@ -33,15 +178,23 @@ def calculate_expected_score(rating_a: float, rating_b: float) -> float:
     return 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
 
 
-def get_match_probabilities(rating_a: float, rating_b: float) -> Dict[str, float]:
-    """
-    UI 표시용: 두 점수 차이에 기반하여 승리(A), 무승부, 패배(B승리) 확률을 계산합니다.
-    """
+def calculate_expected_score_batch(
+    rating_a: np.ndarray, rating_b: np.ndarray
+) -> np.ndarray:
+    """calculate_expected_score의 배열 버전"""
+    diff = np.asarray(rating_b, dtype=np.float64) - rating_a
+    return 1.0 / (1.0 + _libm(_pow10, diff / 400.0))
+
+
+def _match_probabilities(
+    rating_a: float, rating_b: float
+) -> Tuple[float, float, float]:
+    """승리(A), 무승부, 패배(B승리) 확률 (합계 1, 반올림 전)"""
     expected_a = calculate_expected_score(rating_a, rating_b)
-    delta = abs(rating_a - rating_b)
+    delta = abs(rating_a - rating_b) / settings.ELO_DRAW_SCALE
 
     # 무승부 확률 추정
-    p_draw = settings.ELO_DRAW_MAX * math.exp(-((delta / settings.ELO_DRAW_SCALE) ** 2))
+    p_draw = settings.ELO_DRAW_MAX * math.exp(-(delta * delta))
 
     # 승리/패배 확률 분리
     p_win_a = max(0.0, expected_a - 0.5 * p_draw)
@@ -52,12 +205,63 @@ def get_match_probabilities(rating_a: float, rating_b: float) -> Dict[str, float
     # 정규화
     total_prob = p_win_a + p_draw + p_win_b
     if total_prob == 0:
-        return {"win_a": 0.0, "draw": 100.0, "win_b": 0.0}
+        return 0.0, 1.0, 0.0
+
+    return p_win_a / total_prob, p_draw / total_prob, p_win_b / total_prob
 
+
+def get_match_probabilities(rating_a: float, rating_b: float) -> Dict[str, float]:
+    """
+    UI 표시용: 두 점수 차이에 기반하여 승리(A), 무승부, 패배(B승리) 확률을 계산합니다.
+    """
+    p_win_a, p_draw, p_win_b = _match_probabilities(rating_a, rating_b)
     return {
-        "win_a": round((p_win_a / total_prob) * 100, 1),
-        "draw": round((p_draw / total_prob) * 100, 1),
-        "win_b": round((p_win_b / total_prob) * 100, 1),
+        "win_a": round(p_win_a * 100, 1),
+        "draw": round(p_draw * 100, 1),
+        "win_b": round(p_win_b * 100, 1),
+    }
+
+
+def expected_information_gain(rating_a: float, rating_b: float) -> float:
+    """
+    대결 1회의 기대 정보량 (bits): 승/무/패 예측 분포의 Shannon 엔트로피.
+    결과가 거의 확실한 대결(점수 차가 큰 경우)은 0에 가깝고,
+    실력이 비슷해 결과를 예측하기 어려울수록 커집니다 (최대 log2(3)).
+    """
+    probs = _match_probabilities(rating_a, rating_b)
+    return -sum(p * math.log2(p) for p in probs if p > 0)
+
+
+def get_match_probabilities_batch(
+    rating_a: np.ndarray,
+    rating_b: np.ndarray,
+    draw_max: Optional[float] = None,
+    draw_scale: Optional[float] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    get_match_probabilities의 배열 버전 (퍼센트).
+    표시용 반올림(round(x, 1))은 하지 않으므로 필요하면 호출하는 쪽에서 적용합니다.
+    """
+    draw_max = settings.ELO_DRAW_MAX if draw_max is None else draw_max
+    draw_scale = settings.ELO_DRAW_SCALE if draw_scale is None else draw_scale
+
+    expected_a = calculate_expected_score_batch(rating_a, rating_b)
+    delta = np.abs(np.asarray(rating_a, dtype=np.float64) - rating_b) / draw_scale
+
+    p_draw = draw_max * _libm(math.exp, -(delta * delta))
+    p_win_a = np.maximum(0.0, expected_a - 0.5 * p_draw)
+
+    expected_b = 1.0 - expected_a
+    p_win_b = np.maximum(0.0, expected_b - 0.5 * p_draw)
+
+    total_prob = p_win_a + p_draw + p_win_b
+    empty = total_prob == 0
+    total_prob = np.where(empty, 1.0, total_prob)
+
+    return {
+        "win_a": np.where(empty, 0.0, (p_win_a / total_prob) * 100),
+        "draw": np.where(empty, 100.0, (p_draw / total_prob) * 100),
+        "win_b": np.where(empty, 0.0, (p_win_b / total_prob) * 100),
     }
 
 
@@ -67,15 +271,48 @@ def calculate_elo_update(
     actual_score: float,  # 1.0 (Win), 0.5 (Draw), 0.0 (Lose)
     matches_a: int,
     matches_b: int,
+    **k_params: Optional[float],
 ) -> Tuple[float, float]:
     """
     Elo Rating 업데이트 계산 (K-Factor 적용)
+    k_params(k_max, k_min, decay)로 K 조회표의 상수를 바꿀 수 있습니다.
     """
-    expected_a = calculate_expected_score(rating_a, rating_b)
-    expected_b = calculate_expected_score(rating_b, rating_a)
+    # calculate_expected_score 두 번과 같은 계산 (함수 호출 없이 인라인)
+    expected_a = 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
+    expected_b = 1.0 / (1.0 + 10.0 ** ((rating_a - rating_b) / 400.0))
+
+    # 상수를 바꾸지 않는 투표 경로는 현재 조회표를 바로 씁니다.
+    k_table = None if k_params else _current_k_factor_table
+    if k_table is None:
+        k_table = get_k_factor_table(**k_params)
+    k_a = k_table.get(matches_a)
+    k_b = k_table.get(matches_b)
+
+    new_rating_a = rating_a + k_a * (actual_score - expected_a)
+    new_rating_b = rating_b + k_b * ((1.0 - actual_score) - expected_b)
+
+    return new_rating_a, new_rating_b
 
-    k_a = get_dynamic_k_factor(matches_a)
-    k_b = get_dynamic_k_factor(matches_b)
+
+def calculate_elo_update_batch(
+    rating_a: np.ndarray,
+    rating_b: np.ndarray,
+    actual_score: np.ndarray,
+    matches_a: np.ndarray,
+    matches_b: np.ndarray,
+    **k_params: Optional[float],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    calculate_elo_update의 배열 버전.
+    각 원소를 독립적으로 계산하므로, 같은 작품이 두 번 이상 나오면
+    순차 적용 결과와 다릅니다 (replay.py의 세대 배치 참고).
+    """
+    expected_a = calculate_expected_score_batch(rating_a, rating_b)
+    expected_b = calculate_expected_score_batch(rating_b, rating_a)
+
+    k_table = get_k_factor_table(**k_params)
+    k_a = k_table.lookup(matches_a)
+    k_b = k_table.lookup(matches_b)
 
     new_rating_a = rating_a + k_a * (actual_score - expected_a)
     new_rating_b = rating_b + k_b * ((1.0 - actual_score) - expected_b)
@@ -83,37 +320,338 @@ def calculate_elo_update(
     return new_rating_a, new_rating_b
 
 
+# --- Rating Engines ---
+
+
+class RatingEngine(ABC):
+    """
+    투표가 점수에 반영되는 방식 (RATING_ENGINE 설정).
+    periodic 엔진은 투표 시점에는 점수를 바꾸지 않고 로그(votes)만 남기며,
+    run_rating_period가 그동안 쌓인 투표를 모든 작품에 한 번에 반영합니다.
+    """
+
+    periodic = False
+
+    @abstractmethod
+    def update(
+        self,
+        rating_a: float,
+        rating_b: float,
+        actual_score: float,
+        matches_a: int,
+        matches_b: int,
+    ) -> Tuple[float, float]:
+        """투표 1건 직후의 두 점수"""
+
+
+class EloEngine(RatingEngine):
+    """투표마다 동적 K-Factor Elo로 즉시 갱신 (calculate_elo_update)"""
+
+    def update(
+        self,
+        rating_a: float,
+        rating_b: float,
+        actual_score: float,
+        matches_a: int,
+        matches_b: int,
+    ) -> Tuple[float, float]:
+        return calculate_elo_update(
+            rating_a, rating_b, actual_score, matches_a, matches_b
+        )
+
+
+class Glicko2Engine(RatingEngine):
+    """
+    Glicko-2 (glicko2.py). 카테고리별 rd/volatility를 함께 저장하고,
+    GLICKO_PERIOD_SECONDS마다 한 period의 투표를 NumPy로 일괄 계산합니다.
+    """
+
+    periodic = True
+
+    def update(
+        self,
+        rating_a: float,
+        rating_b: float,
+        actual_score: float,
+        matches_a: int,
+        matches_b: int,
+    ) -> Tuple[float, float]:
+        # 다음 rating period에서 반영합니다.
+        return rating_a, rating_b
+
+    def rate_period(
+        self,
+        rating: np.ndarray,
+        rd: np.ndarray,
+        volatility: np.ndarray,
+        player_a: np.ndarray,
+        player_b: np.ndarray,
+        score_a: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return glicko2.rate_period(
+            rating,
+            rd,
+            volatility,
+            player_a,
+            player_b,
+            score_a,
+            tau=settings.GLICKO_TAU,
+            max_rd=settings.GLICKO_MAX_RD,
+            center=settings.NORMALIZE_TARGET_MEAN,
+        )
+
+
+RATING_ENGINES: Dict[str, Type[RatingEngine]] = {
+    "elo": EloEngine,
+    "glicko2": Glicko2Engine,
+}
+
+_rating_engine: Optional[RatingEngine] = None
+
+
+@on_settings_reload
+def _reset_rating_engine() -> None:
+    global _rating_engine
+    _rating_engine = None
+
+
+def get_rating_engine() -> RatingEngine:
+    """RATING_ENGINE 설정의 엔진"""
+    global _rating_engine
+    if _rating_engine is None:
+        engine = RATING_ENGINES.get(settings.RATING_ENGINE)
+        if engine is None:
+            raise ValueError(
+                f"unknown RATING_ENGINE {settings.RATING_ENGINE!r} "
+                f"(available: {', '.join(RATING_ENGINES)})"
+            )
+        _rating_engine = engine()
+    return _rating_engine
+
+
 # --- Database Services ---
 
 
-async def get_anime_rank_info(
-    db: AsyncSession, category: str, score: float
-) -> Dict[str, Any]:
+def get_anime_rank_info(category: str, score: float) -> Dict[str, Any]:
     """
     특정 카테고리 점수를 기준으로 해당 점수의 등수와 상위 퍼센트를 계산합니다.
+    DB 대신 메모리 순위 인덱스(rating_index)를 사용하므로 O(log n)입니다.
+    """
+    return rating_index.rank_info(category, score)
+
+
+class VoteConflictError(Exception):
+    """동시 투표 충돌로 재시도 횟수를 모두 소진한 경우"""
+
+
+async def apply_vote(
+    db: AsyncSession,
+    anime1_id: int,
+    anime2_id: int,
+    category: str,
+    actual_score: float,  # 1.0 (1 승), 0.5 (무승부), 0.0 (2 승)
+) -> Optional[Dict[str, Any]]:
+    """투표 1건을 적용합니다 (apply_votes 참고). 작품이 없으면 None을 반환합니다."""
+    results = await apply_votes(db, anime1_id, anime2_id, {category: actual_score})
+    return None if results is None else results[category]
+
+
+async def apply_votes(
+    db: AsyncSession,
+    anime1_id: int,
+    anime2_id: int,
+    outcomes: Dict[str, float],  # 카테고리 -> actual_score
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    같은 두 작품에 대한 한 개 이상의 카테고리 투표를 하나의 트랜잭션으로 적용합니다.
+
+    1. 두 작품의 현재 점수/매치 수/버전을 한 번의 SELECT로 조회
+    2. outcomes 순서대로 카테고리별 점수 계산 (RATING_ENGINE)
+       (카테고리마다 매치 수가 1씩 늘어나므로 연속된 단일 투표와 결과가 같습니다)
+    3. CASE 식을 쓴 한 번의 UPDATE ... RETURNING으로 두 행을 함께 갱신하되,
+       읽은 버전이 그대로인 행만 갱신 (compare-and-swap)
+    4. 투표 로그(votes)를 카테고리마다 1행씩, 쌍별 집계(pair_counts)를
+       UPSERT로 같은 트랜잭션에 기록
+    다른 요청이 먼저 같은 작품을 갱신했거나 쓰기 잠금을 얻지 못했다면
+    잠시 대기 후 처음부터 다시 시도하며,
+    VOTE_MAX_RETRIES회 모두 실패하면 VoteConflictError를 발생시킵니다.
+    등수는 메모리 인덱스에서 계산하므로 추가 쿼리가 없습니다.
+    카테고리별 응답 데이터를 반환하고, 작품이 없으면 None을 반환합니다.
     """
-    # 전체 개수
-    total_query = select(sql_func.count(Anime.id))
-    total_result = await db.execute(total_query)
-    total_count = total_result.scalar() or 1  # 0 나누기 방지
+    if anime1_id == anime2_id or not outcomes:
+        return None
+
+    categories = list(outcomes)
+    engine = get_rating_engine()
+    rating_cols = [getattr(Anime, f"rating_{cat}") for cat in categories]
+
+    for attempt in range(settings.VOTE_MAX_RETRIES):
+        result = await db.execute(
+            select(Anime.id, Anime.matches_played, Anime.version, *rating_cols).where(
+                Anime.id.in_((anime1_id, anime2_id))
+            )
+        )
+        rows = {row[0]: row for row in result}
+        if anime1_id not in rows or anime2_id not in rows:
+            await db.rollback()
+            return None
+
+        _, matches1, version1, *old_r1s = rows[anime1_id]
+        _, matches2, version2, *old_r2s = rows[anime2_id]
+
+        new_ratings = []
+        log_rows = []
+        for i, (cat, old_r1, old_r2) in enumerate(zip(categories, old_r1s, old_r2s)):
+            actual_score = outcomes[cat]
+            new_ratings.append(
+                engine.update(old_r1, old_r2, actual_score, matches1 + i, matches2 + i)
+            )
+            log_rows.append(
+                vote_log_row(
+                    anime1_id,
+                    anime2_id,
+                    cat,
+                    actual_score,
+                    old_r1,
+                    old_r2,
+                    matches1 + i,
+                    matches2 + i,
+                )
+            )
+
+        stmt = (
+            update(Anime)
+            .where(
+                or_(
+                    and_(Anime.id == anime1_id, Anime.version == version1),
+                    and_(Anime.id == anime2_id, Anime.version == version2),
+                )
+            )
+            .values(
+                {
+                    **{
+                        col: case((Anime.id == anime1_id, new_r1), else_=new_r2)
+                        for col, (new_r1, new_r2) in zip(rating_cols, new_ratings)
+                    },
+                    Anime.matches_played: Anime.matches_played + len(categories),
+                    Anime.version: Anime.version + 1,
+                }
+            )
+            .returning(Anime.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            updated = (await db.execute(stmt)).scalars().all()
+            if len(updated) == 2:
+                await db.execute(insert(Vote), log_rows)
+                await db.execute(PAIR_COUNT_UPSERT, pair_count_rows(log_rows))
+                await db.commit()
+                break
+        except OperationalError as e:
+            # 다른 커넥션/프로세스가 쓰기 잠금을 오래 쥐고 있으면 충돌과 같이 재시도
+            if "locked" not in str(e):
+                raise
+
+        # 한쪽이라도 버전이 바뀌었으면 부분 갱신을 되돌리고 다시 읽습니다.
+        await db.rollback()
+        await asyncio.sleep(random.uniform(0, 0.005) * (attempt + 1))
+    else:
+        raise VoteConflictError(
+            f"vote on {anime1_id} vs {anime2_id} conflicted "
+            f"{settings.VOTE_MAX_RETRIES} times"
+        )
+
+    # 커밋이 성공한 뒤에만 메모리 순위 인덱스에 새 점수를 반영합니다.
+    # (커밋 직후 await 없이 반영하므로 인덱스 갱신 순서는 커밋 순서와 같습니다.)
+    for row in log_rows:
+        pairwise_store.record(row)
+    return {
+        cat: record_vote_in_index(
+            anime1_id, anime2_id, cat, old_r1, old_r2, new_r1, new_r2
+        )
+        for cat, old_r1, old_r2, (new_r1, new_r2) in zip(
+            categories, old_r1s, old_r2s, new_ratings
+        )
+    }
 
-    # 나보다 점수가 높은 항목의 개수 (Standard Competition Ranking: 1 2 2 4...)
-    # getattr(Anime, f"rating_{category}") 대신 동적 컬럼 매핑이 필요하나,
-    # SQLAlchemy Core 레벨에서는 리터럴 컬럼명 사용이 복잡하므로 로직으로 처리.
-    # 여기서는 단순화를 위해 모든 항목을 가져오는 대신 SQL count를 사용합니다.
 
-    target_col = getattr(Anime, f"rating_{category}")
-    rank_query = select(sql_func.count(Anime.id)).where(target_col > score)
-    rank_result = await db.execute(rank_query)
-    higher_rank_count = rank_result.scalar()
+def vote_log_row(
+    anime1_id: int,
+    anime2_id: int,
+    category: str,
+    actual_score: float,
+    old_r1: float,
+    old_r2: float,
+    matches1: int,
+    matches2: int,
+) -> Dict[str, Any]:
+    """투표 로그(votes) 1행. 카테고리/결과는 정수로 인코딩합니다."""
+    return {
+        "anime1_id": anime1_id,
+        "anime2_id": anime2_id,
+        "category": RATING_CATEGORIES.index(category),
+        "outcome": round(actual_score * 2),
+        "rating1_before": old_r1,
+        "rating2_before": old_r2,
+        "matches1_before": matches1,
+        "matches2_before": matches2,
+        "created_at": int(time.time() * 1000),
+    }
+
 
-    current_rank = higher_rank_count + 1
-    percentile = (current_rank / total_count) * 100.0
+async def stream_vote_history(
+    db: AsyncSession, anime_id: Optional[int] = None, chunk_size: int = 1000
+) -> AsyncIterator[Vote]:
+    """
+    투표 로그를 적용 순서(id)대로 chunk_size개씩 나눠 읽습니다.
+    anime_id를 주면 (anime_id, id) 인덱스로 해당 작품의 이력만 읽습니다.
+    """
+    stmt = select(Vote).order_by(Vote.id).execution_options(yield_per=chunk_size)
+    if anime_id is not None:
+        stmt = stmt.where(or_(Vote.anime1_id == anime_id, Vote.anime2_id == anime_id))
+
+    result = await db.stream_scalars(stmt)
+    async for vote in result:
+        yield vote
+
+
+def record_vote_in_index(
+    anime1_id: int,
+    anime2_id: int,
+    category: str,
+    old_r1: float,
+    old_r2: float,
+    new_r1: float,
+    new_r2: float,
+) -> Dict[str, Any]:
+    """
+    투표 결과를 메모리 인덱스에 반영하고, 전후 점수/등수 응답 데이터를 만듭니다.
+    (VoteResponse에서 next_url을 제외한 필드)
+    """
+    info1_old = rating_index.rank_info(category, old_r1)
+    info2_old = rating_index.rank_info(category, old_r2)
+    rating_index.update(anime1_id, category, new_r1)
+    rating_index.update(anime2_id, category, new_r2)
+    rating_index.record_match(anime1_id)
+    rating_index.record_match(anime2_id)
+    info1_new = rating_index.rank_info(category, new_r1)
+    info2_new = rating_index.rank_info(category, new_r2)
 
     return {
-        "rank": current_rank,
-        "total": total_count,
-        "top_percent": round(percentile, 1),
+        "a1_id": anime1_id,
+        "a2_id": anime2_id,
+        "old_r1": round(old_r1),
+        "new_r1": round(new_r1),
+        "diff_r1": round(new_r1 - old_r1),
+        "old_r2": round(old_r2),
+        "new_r2": round(new_r2),
+        "diff_r2": round(new_r2 - old_r2),
+        # Rank Info
+        "old_rank_1": info1_old["rank"],
+        "new_rank_1": info1_new["rank"],
+        "old_rank_2": info2_old["rank"],
+        "new_rank_2": info2_new["rank"],
+        "total_animes": info1_old["total"],
     }
 
 
@@ -145,81 +683,309 @@ async def load_initial_data(db: AsyncSession) -> None:
             print(f"데이터 로드 중 오류 발생: {e}")
 
 
-async def normalize_scores_task(db_factory) -> None:
-    """[백그라운드 작업] 점수 인플레이션 방지 (Mean Reversion)"""
-    async with db_factory() as db:
-        categories = ["story", "visual", "ost", "voice", "char", "fun"]
-        is_modified = False
+def get_mean_drift(category: str) -> float:
+    """카테고리 평균 점수가 기준점에서 벗어난 정도. 메모리 합계를 사용하므로 O(1)"""
+    return rating_index.mean(category) - settings.NORMALIZE_TARGET_MEAN
+
+
+def needs_normalization(category: str) -> bool:
+    return abs(get_mean_drift(category)) > settings.NORMALIZE_DRIFT_THRESHOLD
 
-        result = await db.execute(select(Anime))
-        animes = result.scalars().all()
 
-        if not animes:
+# 동시에 예약된 정규화 작업이 같은 드리프트를 두 번 보정하지 않도록 직렬화합니다.
+# 투표 큐(vote_queue.py)의 flush도 이 락을 잡아, 정규화의 DB UPDATE와
+# 인덱스 shift 사이에 인덱스 값을 DB에 덮어쓰지 않도록 합니다.
+rating_write_lock = asyncio.Lock()
+
+
+async def normalize_scores_task(db_factory) -> None:
+    """
+    [백그라운드 작업] 점수 인플레이션 방지 (Mean Reversion)
+    드리프트가 임계값을 넘은 카테고리만 전체 UPDATE로 보정합니다.
+    """
+    async with rating_write_lock, db_factory() as db:
+        if not len(rating_index):
             return
 
-        for cat in categories:
+        shifts = {}
+        for cat in RATING_CATEGORIES:
+            if not needs_normalization(cat):
+                continue
+
             attr_name = f"rating_{cat}"
-            total_val = sum(getattr(a, attr_name) for a in animes)
-            current_avg = total_val / len(animes)
-            diff = current_avg - 1200.0
-
-            if abs(diff) > 1.0:
-                is_modified = True
-                await db.execute(
-                    update(Anime).values({attr_name: getattr(Anime, attr_name) - diff})
+            diff = get_mean_drift(cat)
+            await db.execute(
+                update(Anime).values(
+                    {
+                        attr_name: getattr(Anime, attr_name) - diff,
+                        # 보정 전 점수로 계산 중인 투표가 CAS에서 걸러지도록 버전 증가
+                        Anime.version: Anime.version + 1,
+                    }
                 )
+            )
+            shifts[cat] = diff
 
-        if is_modified:
+        if shifts:
             await db.commit()
+            for cat, diff in shifts.items():
+                rating_index.shift(cat, -diff)
+
+
+def anime_bulk_update(columns: Iterable[str], bump_version: bool = False):
+    """
+    작품 여러 개를 한 번의 executemany로 갱신하는 UPDATE 문.
+    파라미터는 {"b_id": 작품 id, <컬럼>: 값, ...}이며, bump_version이면
+    점수가 바뀐 것으로 보고 version을 올립니다 (apply_votes의 compare-and-swap).
+    """
+    animes = Anime.__table__
+    values: Dict[str, Any] = {column: bindparam(column) for column in columns}
+    if bump_version:
+        values["version"] = animes.c.version + 1
+    return update(animes).where(animes.c.id == bindparam("b_id")).values(values)
+
+
+def pick_category() -> str:
+    """대결 카테고리를 무작위로 고릅니다 (상대 선정보다 먼저)."""
+    return random.choice(CATEGORIES)[0]
+
+
+class MatchmakingStrategy(ABC):
+    """
+    대결 상대 선정 전략. 카테고리는 호출 측(pick_category)에서 먼저 정하고,
+    전략은 anime1과 그 카테고리의 상대를 고릅니다.
+    새 전략은 이 클래스를 상속해 MATCHMAKING_STRATEGIES에 등록한 뒤
+    MATCH_STRATEGY 설정으로 선택합니다.
+    """
+
+    def __init__(self, index: RatingIndex) -> None:
+        self.index = index
+
+    def pick_anime(self) -> Optional[int]:
+        return self.index.random_id()
+
+    @abstractmethod
+    def pick_rival(self, anime1_id: int, category: str) -> Optional[int]:
+        """anime1의 category 대결 상대. 후보가 없으면 None"""
+
+
+class RandomStrategy(MatchmakingStrategy):
+    """완전 무작위 매칭 (비교 기준)"""
+
+    def pick_rival(self, anime1_id: int, category: str) -> Optional[int]:
+        return self.index.random_other(anime1_id)
+
+
+class SmartRandomStrategy(MatchmakingStrategy):
+    """
+    MATCH_SMART_RATE 확률로 해당 카테고리 점수가 ±MATCH_SCORE_RANGE 이내인 상대
+    (정렬 배열 이분 탐색), 그 외(또는 후보가 없으면) 무작위.
+    """
+
+    def pick_rival(self, anime1_id: int, category: str) -> Optional[int]:
+        anime2_id = None
+        if random.random() < settings.MATCH_SMART_RATE:
+            anime2_id = self.index.random_rival(
+                anime1_id, category, settings.MATCH_SCORE_RANGE
+            )
+
+        if anime2_id is None:
+            anime2_id = self.index.random_other(anime1_id)
+        return anime2_id
+
+
+class ActiveLearningStrategy(MatchmakingStrategy):
+    """
+    적은 투표로 순위를 수렴시키기 위한 능동 학습 전략.
+
+    - anime1: 점수 불확실도(매치 수가 적을수록 큼)에 비례해 추출 (O(log n))
+    - 상대: ±MATCH_SCORE_RANGE 이내 후보 MATCH_ACTIVE_CANDIDATES개 중
+      결과 예측이 어렵고(기대 정보량) 불확실도 합이 큰 상대
+    """
+
+    def pick_anime(self) -> Optional[int]:
+        return self.index.random_uncertain_id()
+
+    def pick_rival(self, anime1_id: int, category: str) -> Optional[int]:
+        candidates = {
+            self.index.random_rival(anime1_id, category, settings.MATCH_SCORE_RANGE)
+            for _ in range(settings.MATCH_ACTIVE_CANDIDATES)
+        }
+        candidates.discard(None)
+        if not candidates:
+            return self.index.random_other(anime1_id)
+
+        rating1 = self.index.get(anime1_id, category)
+        uncertainty1 = self.index.uncertainty(anime1_id)
+
+        def score(anime2_id: int) -> float:
+            information = expected_information_gain(
+                rating1, self.index.get(anime2_id, category)
+            )
+            return information * (uncertainty1 + self.index.uncertainty(anime2_id))
+
+        return max(candidates, key=score)
+
+
+MATCHMAKING_STRATEGIES: Dict[str, Type[MatchmakingStrategy]] = {
+    "random": RandomStrategy,
+    "smart": SmartRandomStrategy,
+    "active": ActiveLearningStrategy,
+}
+
+_matchmaking_strategy: Optional[MatchmakingStrategy] = None
+
+
+@on_settings_reload
+def _reset_matchmaking_strategy() -> None:
+    global _matchmaking_strategy
+    _matchmaking_strategy = None
+
+
+def get_matchmaking_strategy() -> MatchmakingStrategy:
+    """MATCH_STRATEGY 설정의 전략 (서버 전역 rating_index 기준)"""
+    global _matchmaking_strategy
+    if _matchmaking_strategy is None:
+        strategy = MATCHMAKING_STRATEGIES.get(settings.MATCH_STRATEGY)
+        if strategy is None:
+            raise ValueError(
+                f"unknown MATCH_STRATEGY {settings.MATCH_STRATEGY!r} "
+                f"(available: {', '.join(MATCHMAKING_STRATEGIES)})"
+            )
+        _matchmaking_strategy = strategy(rating_index)
+    return _matchmaking_strategy
 
 
 async def get_match_pair(
-    db: AsyncSession, focus_id: Optional[int] = None
+    db: AsyncSession, category: str, focus_id: Optional[int] = None
 ) -> Tuple[Optional[Anime], Optional[Anime]]:
-    """대결 상대를 선정합니다 (Smart Match + Random)."""
+    """
+    category 대결의 두 작품을 선정합니다 (MATCH_STRATEGY).
+    후보 선정은 메모리 인덱스에서 O(log n)에 처리하고, DB는 PK 조회만 합니다.
+    """
+    strategy = get_matchmaking_strategy()
     if focus_id:
         anime1 = await db.get(Anime, focus_id)
-        if not anime1:
-            return None, None
     else:
-        query = select(Anime).order_by(sql_func.random()).limit(1)
-        result = await db.execute(query)
-        anime1 = result.scalar()
+        anime1_id = strategy.pick_anime()
+        anime1 = await db.get(Anime, anime1_id) if anime1_id is not None else None
 
     if not anime1:
         return None, None
 
-    use_smart_match = random.random() < settings.MATCH_SMART_RATE
-    anime2 = None
+    anime2_id = strategy.pick_rival(anime1.id, category)
+    anime2 = await db.get(Anime, anime2_id) if anime2_id is not None else None
+    return anime1, anime2
 
-    if use_smart_match:
-        target_score = anime1.rating_fun
-        min_score = target_score - settings.MATCH_SCORE_RANGE
-        max_score = target_score + settings.MATCH_SCORE_RANGE
 
-        query = (
-            select(Anime)
-            .where(
-                and_(
-                    Anime.id != anime1.id,
-                    Anime.rating_fun >= min_score,
-                    Anime.rating_fun <= max_score,
-                )
-            )
-            .order_by(sql_func.random())
-            .limit(1)
-        )
-        result = await db.execute(query)
-        anime2 = result.scalar()
-
-    if not anime2:
-        query = (
-            select(Anime)
-            .where(Anime.id != anime1.id)
-            .order_by(sql_func.random())
-            .limit(1)
+def sample_match_ids(
+    n: int, focus_id: Optional[int] = None
+) -> List[Tuple[int, int, str]]:
+    """
+    대결 n개의 (anime1_id, anime2_id, category)를 메모리 인덱스에서만 뽑습니다.
+    카테고리를 먼저 고르고 그 카테고리 점수로 상대를 찾습니다.
+    focus_id를 지정하면 anime1은 항상 해당 작품입니다.
+    """
+    if focus_id and focus_id not in rating_index:
+        return []
+
+    strategy = get_matchmaking_strategy()
+    matches = []
+    for _ in range(n):
+        category = pick_category()
+        anime1_id = focus_id or strategy.pick_anime()
+        if anime1_id is None:
+            break
+        anime2_id = strategy.pick_rival(anime1_id, category)
+        if anime2_id is None:
+            break
+        matches.append((anime1_id, anime2_id, category))
+    return matches
+
+
+async def get_match_pairs(
+    db: AsyncSession, n: int, focus_id: Optional[int] = None
+) -> List[Tuple[Anime, Anime, str]]:
+    """
+    대결 n개를 한 번에 선정합니다 (/battle/next 미리 받기용).
+    모든 후보 id를 메모리 인덱스에서 먼저 뽑고, 필요한 작품은 한 번의 SELECT로 읽습니다.
+    """
+    matches = sample_match_ids(n, focus_id)
+    if not matches:
+        return []
+
+    ids = {anime_id for a, b, _ in matches for anime_id in (a, b)}
+    result = await db.execute(select(Anime).where(Anime.id.in_(ids)))
+    animes = {anime.id: anime for anime in result.scalars()}
+    # 인덱스와 DB 사이에 삭제된 작품이 섞인 대결은 건너뜁니다.
+    return [
+        (animes[a], animes[b], category)
+        for a, b, category in matches
+        if a in animes and b in animes
+    ]
+
+
+def build_matchup(
+    anime1_id: int,
+    anime1_name: str,
+    anime2_id: int,
+    anime2_name: str,
+    category: str,
+) -> Dict[str, Any]:
+    """
+    대결 1개의 확률/등수/기대 정보량을 계산합니다 (BattleMatchup).
+    점수는 메모리 인덱스에서 읽으므로 DB 접근이 없습니다.
+    """
+    r1 = rating_index.get(anime1_id, category)
+    r2 = rating_index.get(anime2_id, category)
+
+    return {
+        "category": category,
+        "category_name": CATEGORY_NAMES[category],
+        "anime1": {"id": anime1_id, "name": anime1_name, "rating": round(r1)},
+        "anime2": {"id": anime2_id, "name": anime2_name, "rating": round(r2)},
+        "probs": get_match_probabilities(r1, r2),
+        "rank1": get_anime_rank_info(category, r1),
+        "rank2": get_anime_rank_info(category, r2),
+        "info_gain": expected_information_gain(r1, r2),
+    }
+
+
+class MatchmakingStats:
+    """
+    실제로 투표된 대결의 기대 정보량 누적 (/battle/stats).
+    미리 받아 두고 표시하지 않은 대결(/battle/next)이 섞이지 않도록 투표 시점에
+    투표 직전 점수로 계산합니다.
+    평균이 최대값(log2(3))에 가까울수록 투표 1건이 순위 수렴에 더 많이 기여합니다.
+    """
+
+    def __init__(self) -> None:
+        self.voted: Dict[str, int] = {cat: 0 for cat in RATING_CATEGORIES}
+        self.info_gain: Dict[str, float] = {cat: 0.0 for cat in RATING_CATEGORIES}
+
+    def record(self, category: str, result: Dict[str, Any]) -> None:
+        """투표 1건의 결과(apply_votes / vote_queue.submit의 카테고리별 결과)를 반영합니다."""
+        self.voted[category] += 1
+        self.info_gain[category] += expected_information_gain(
+            result["old_r1"], result["old_r2"]
         )
-        result = await db.execute(query)
-        anime2 = result.scalar()
 
-    return anime1, anime2
+    def summary(self) -> Dict[str, Any]:
+        def mean(total: float, count: int) -> float:
+            return round(total / count, 4) if count else 0.0
+
+        voted = sum(self.voted.values())
+        return {
+            "voted": voted,
+            "mean_info_gain": mean(sum(self.info_gain.values()), voted),
+            "max_info_gain": round(math.log2(3), 4),
+            "categories": {
+                cat: {
+                    "voted": self.voted[cat],
+                    "mean_info_gain": mean(self.info_gain[cat], self.voted[cat]),
+                }
+                for cat in RATING_CATEGORIES
+            },
+        }
+
+
+matchmaking_stats = MatchmakingStats()
@@ -0,0 +1,187 @@
+"""
+Elo 상수 파라미터 스윕.
+
+ELO_K_MAX / ELO_K_MIN / ELO_DECAY_FACTOR / ELO_DRAW_MAX / ELO_DRAW_SCALE 후보 격자의
+모든 조합에 대해 투표 로그를 재계산(replay.py)하고, 마지막 --holdout 비율의 투표를
+얼마나 잘 예측하는지 log-loss로 비교합니다. 운영 서버와 별도로 빌드 머신의
+모든 코어에서 (ProcessPoolExecutor) 실행하는 용도입니다.
+
+    python sweep.py --k-max 60 80 100 --k-min 20 30 --decay 50 100 \\
+        --draw-max 0.25 0.33 --draw-scale 200 300 [--holdout 0.2] [--workers 8]
+
+지정하지 않은 상수는 현재 설정값 하나만 사용합니다.
+
+평가 방식 (prequential)
+- 앞부분 투표로 점수를 만들고, 보류 구간의 투표는 각 투표 직전 점수로 예측한 뒤 반영합니다.
+- expected: calculate_expected_score를 무승부 = 0.5 목표값에 대한 이진 교차 엔트로피로 평가
+- 3-way: get_match_probabilities의 승/무/패 확률에 대한 log-loss (UI용 반올림 전 값)
+K 조합마다 재계산은 한 번만 하고, 무승부 상수는 같은 직전 점수로 함께 평가합니다.
+"""
+import argparse
+import itertools
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from replay import VoteLog, read_animes, replay
+from services import calculate_expected_score_batch, get_match_probabilities_batch
+
+# log(0) 방지
+EPSILON = 1e-12
+
+# 워커 프로세스마다 한 번 전달받는 로그/작품 상태 (_init_worker)
+_log: Optional[VoteLog] = None
+_animes: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+def expected_log_loss(
+    rating_a: np.ndarray, rating_b: np.ndarray, outcome: np.ndarray
+) -> float:
+    expected = calculate_expected_score_batch(rating_a, rating_b)
+    expected = np.clip(expected, EPSILON, 1.0 - EPSILON)
+    return float(
+        -np.mean(outcome * np.log(expected) + (1.0 - outcome) * np.log1p(-expected))
+    )
+
+
+def outcome_log_loss(
+    rating_a: np.ndarray,
+    rating_b: np.ndarray,
+    outcome: np.ndarray,
+    draw_max: float,
+    draw_scale: float,
+) -> float:
+    probs = get_match_probabilities_batch(rating_a, rating_b, draw_max, draw_scale)
+    p = np.select(
+        [outcome == 1.0, outcome == 0.5], [probs["win_a"], probs["draw"]], probs["win_b"]
+    )
+    return float(-np.mean(np.log(np.maximum(p / 100.0, EPSILON))))
+
+
+def _init_worker(log: VoteLog, animes: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+    global _log, _animes
+    _log, _animes = log, animes
+
+
+def evaluate(
+    k_max: float,
+    k_min: float,
+    decay: float,
+    draws: Sequence[Tuple[float, float]],
+    record_from: int,
+) -> List[Dict[str, Any]]:
+    """K 조합 하나를 재계산하고, 모든 무승부 상수 조합의 log-loss를 구합니다."""
+    result = replay(_log, *_animes, k_max, k_min, decay, record_from=record_from)
+    rating_a, rating_b = result.pre_ratings[:, 0], result.pre_ratings[:, 1]
+    outcome = _log.outcome[record_from:]
+
+    binary = expected_log_loss(rating_a, rating_b, outcome)
+    return [
+        {
+            "k_max": k_max,
+            "k_min": k_min,
+            "decay": decay,
+            "draw_max": draw_max,
+            "draw_scale": draw_scale,
+            "expected": binary,
+            "three_way": outcome_log_loss(
+                rating_a, rating_b, outcome, draw_max, draw_scale
+            ),
+        }
+        for draw_max, draw_scale in draws
+    ]
+
+
+def baseline_log_loss(outcome: np.ndarray) -> float:
+    """점수를 보지 않고 승/무/패 비율만으로 예측할 때의 log-loss (비교 기준)"""
+    frequencies = np.array([np.mean(outcome == s) for s in (1.0, 0.5, 0.0)])
+    p = np.select(
+        [outcome == 1.0, outcome == 0.5], frequencies[:2], frequencies[2]
+    )
+    return float(-np.mean(np.log(np.maximum(p, EPSILON))))
+
+
+def is_current(row: Dict[str, Any]) -> bool:
+    return (
+        row["k_max"] == settings.ELO_K_MAX
+        and row["k_min"] == settings.ELO_K_MIN
+        and row["decay"] == settings.ELO_DECAY_FACTOR
+        and row["draw_max"] == settings.ELO_DRAW_MAX
+        and row["draw_scale"] == settings.ELO_DRAW_SCALE
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Elo 상수 후보를 투표 로그로 비교합니다.")
+    parser.add_argument("--db", default=settings.DB_PATH)
+    parser.add_argument("--k-max", type=float, nargs="+", default=[settings.ELO_K_MAX])
+    parser.add_argument("--k-min", type=float, nargs="+", default=[settings.ELO_K_MIN])
+    parser.add_argument(
+        "--decay", type=float, nargs="+", default=[settings.ELO_DECAY_FACTOR]
+    )
+    parser.add_argument(
+        "--draw-max", type=float, nargs="+", default=[settings.ELO_DRAW_MAX]
+    )
+    parser.add_argument(
+        "--draw-scale", type=float, nargs="+", default=[settings.ELO_DRAW_SCALE]
+    )
+    parser.add_argument(
+        "--holdout", type=float, default=0.2, help="평가에 쓸 마지막 투표 비율"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=20, help="출력할 상위 조합 수")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    log = VoteLog.read(conn)
+    animes = read_animes(conn)
+    conn.close()
+
+    record_from = int(len(log) * (1.0 - args.holdout))
+    if record_from >= len(log):
+        parser.error("평가할 투표가 없습니다 (--holdout 또는 로그 크기 확인).")
+
+    k_grid = list(itertools.product(args.k_max, args.k_min, args.decay))
+    draws = list(itertools.product(args.draw_max, args.draw_scale))
+    print(
+        f"{len(log):,} votes ({len(log) - record_from:,} held out), "
+        f"{len(k_grid) * len(draws):,} combinations on {args.workers} workers"
+    )
+
+    start = time.perf_counter()
+    rows: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(log, animes)
+    ) as pool:
+        futures = [
+            pool.submit(evaluate, k_max, k_min, decay, draws, record_from)
+            for k_max, k_min, decay in k_grid
+        ]
+        for future in futures:
+            rows.extend(future.result())
+    print(f"done in {time.perf_counter() - start:.1f}s")
+    baseline = baseline_log_loss(log.outcome[record_from:])
+    print(f"baseline (outcome frequencies only) 3-way={baseline:.5f}")
+
+    rows.sort(key=lambda row: row["three_way"])
+    print(
+        f"  {'k_max':>7} {'k_min':>7} {'decay':>7} {'draw_max':>8} "
+        f"{'draw_scale':>10} {'3-way':>9} {'expected':>9}"
+    )
+    for row in rows[: args.top]:
+        marker = "*" if is_current(row) else " "
+        print(
+            f"{marker} {row['k_max']:7g} {row['k_min']:7g} {row['decay']:7g} "
+            f"{row['draw_max']:8g} {row['draw_scale']:10g} "
+            f"{row['three_way']:9.5f} {row['expected']:9.5f}"
+        )
+    print("* 현재 설정")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import insert
+
+from background import BackgroundTask
+from config import settings
+from database import AsyncSessionLocal
+from models import Vote, RATING_CATEGORIES
+from pairwise import PAIR_COUNT_UPSERT, pair_count_rows, pairwise_store
+from rating_index import rating_index
+from services import (
+    anime_bulk_update,
+    get_rating_engine,
+    record_vote_in_index,
+    vote_log_row,
+    rating_write_lock,
+)
+
+FLUSH_STATEMENT = anime_bulk_update(
+    [f"rating_{cat}" for cat in RATING_CATEGORIES] + ["matches_played"],
+    bump_version=True,
+)
+
+
+class VoteQueue(BackgroundTask):
+    """
+    Write-behind 투표 큐.
+
+    submit()은 메모리 인덱스의 최신 점수/매치 수로 새 점수(RATING_ENGINE)를 계산해
+    즉시 반영하므로 (await 없이 동기 실행) 도착 순서대로 순차 Elo가 보장됩니다.
+    DB에는 변경된 작품(dirty)의 최종 상태와 그동안의 투표 로그/쌍별 집계를
+    주기적으로 한 트랜잭션에 기록합니다.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._dirty: Set[int] = set()
+        # 아직 기록되지 않은 투표 로그 (도착 순서)
+        self._log: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+
+    @property
+    def pending_votes(self) -> int:
+        return len(self._log)
+
+    def submit(
+        self, anime1_id: int, anime2_id: int, category: str, actual_score: float
+    ) -> Optional[Dict[str, Any]]:
+        """투표를 메모리에 적용하고 예상 결과를 반환합니다. 작품이 없으면 None."""
+        if (
+            anime1_id == anime2_id
+            or anime1_id not in rating_index
+            or anime2_id not in rating_index
+        ):
+            return None
+
+        old_r1 = rating_index.get(anime1_id, category)
+        old_r2 = rating_index.get(anime2_id, category)
+        matches1 = rating_index.matches(anime1_id)
+        matches2 = rating_index.matches(anime2_id)
+        new_r1, new_r2 = get_rating_engine().update(
+            old_r1, old_r2, actual_score, matches1, matches2
+        )
+        result = record_vote_in_index(
+            anime1_id, anime2_id, category, old_r1, old_r2, new_r1, new_r2
+        )
+
+        log_row = vote_log_row(
+            anime1_id,
+            anime2_id,
+            category,
+            actual_score,
+            old_r1,
+            old_r2,
+            matches1,
+            matches2,
+        )
+        pairwise_store.record(log_row)
+        self._dirty.update((anime1_id, anime2_id))
+        self._log.append(log_row)
+        if len(self._log) >= self.batch_size:
+            self._wakeup.set()
+
+        return result
+
+    def submit_many(
+        self, anime1_id: int, anime2_id: int, outcomes: Dict[str, float]
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        같은 두 작품에 대한 여러 카테고리 투표를 순서대로 적용합니다.
+        await 없이 연속 실행되므로 모두 같은 flush 트랜잭션에 기록됩니다.
+        """
+        if (
+            not outcomes
+            or anime1_id == anime2_id
+            or anime1_id not in rating_index
+            or anime2_id not in rating_index
+        ):
+            return None
+        return {
+            cat: self.submit(anime1_id, anime2_id, cat, actual_score)
+            for cat, actual_score in outcomes.items()
+        }
+
+    async def flush(self) -> None:
+        """대기 중인 변경을 하나의 트랜잭션으로 DB에 기록합니다."""
+        async with rating_write_lock:
+            if not self._dirty:
+                return
+
+            dirty, self._dirty = self._dirty, set()
+            log, self._log = self._log, []
+            # 삭제된 작품은 건너뜁니다.
+            rows = [
+                {"b_id": i, **rating_index.snapshot(i)}
+                for i in dirty
+                if i in rating_index
+            ]
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    if rows:
+                        # executemany 한 번으로 기록 (버전도 함께 증가)
+                        await db.execute(FLUSH_STATEMENT, rows)
+                    await db.execute(insert(Vote), log)
+                    # 그 사이 삭제된 작품의 쌍은 집계에 다시 만들지 않습니다.
+                    pairs = pair_count_rows(
+                        row
+                        for row in log
+                        if row["anime1_id"] in rating_index
+                        and row["anime2_id"] in rating_index
+                    )
+                    if pairs:
+                        await db.execute(PAIR_COUNT_UPSERT, pairs)
+                    await db.commit()
+            except Exception as e:
+                # 인덱스 상태를 통째로 기록하므로 다음 flush에서 그대로 재시도됩니다.
+                # 로그는 순서를 유지하도록 그 사이 들어온 투표 앞에 되돌립니다.
+                self._dirty |= dirty
+                self._log = log + self._log
+                print(f"투표 큐 기록 중 오류 발생: {e}")
+                return
+
+        # DB가 인덱스를 따라잡았으므로, 그 사이 DB에서 계산된 랭킹 캐시를 무효화
+        rating_index.bump_version()
+
+    async def stop(self) -> bool:
+        """백그라운드 flush를 멈추고 남은 투표를 모두 기록합니다 (서버 종료 시)."""
+        running = await super().stop()
+        await self.flush()
+        return running
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # stop()이 기록 도중에 취소해도 꺼내 둔 변경을 잃지 않도록 끝까지 실행합니다.
+            # (stop()의 마지막 flush는 rating_write_lock에서 이 flush를 기다립니다.)
+            await asyncio.shield(self.flush())
+
+
+vote_queue = VoteQueue(
+    batch_size=settings.VOTE_QUEUE_BATCH_SIZE,
+    flush_interval=settings.VOTE_QUEUE_FLUSH_INTERVAL_MS / 1000.0,
+)